@@ -0,0 +1,150 @@
+"""
+Headless batch runner: sends every prompt in a file to one or more Ollama models,
+runs the Python code extracted from each answer and writes one JSON line per
+(prompt, model) pair with latencies and exit codes.
+
+    python OllamaBatch.py prompts.txt --model qwen2.5-coder:3b --concurrency 4 --output results.jsonl
+
+The prompts file is either plain text (one prompt per line, lines starting with #
+are skipped) or JSONL with a "prompt" field and optional "id", "context" and
+"stdin" fields.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.core import build_messages, stream_chat, extract_python_code, run_code, DEFAULT_SYSTEM_MESSAGE
+from utils.ollama_api import OllamaClient, DEFAULT_KEEP_ALIVE
+from utils.sandbox import SandboxLimits
+
+def load_prompts(path: str) -> list:
+    """Reads prompts from a plain text or JSONL file into dicts with id, prompt, context and stdin."""
+    prompts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if path.endswith(".jsonl"):
+                entry = json.loads(line)
+            else:
+                entry = {"prompt": line}
+            entry.setdefault("id", str(line_number))
+            entry.setdefault("context", "")
+            prompts.append(entry)
+    return prompts
+
+def run_job(client: OllamaClient, entry: dict, model: str, args, limits) -> dict:
+    """Queries one model with one prompt, runs the extracted code and returns the result record."""
+    result = {"id": entry["id"], "model": model, "prompt": entry["prompt"]}
+    payload = {
+        "model": model,
+        "messages": build_messages(args.system, entry.get("context") or args.context, entry["prompt"]),
+        "options": {
+            "temperature": args.temperature,
+            "num_ctx": args.num_ctx
+        },
+        "stream": True
+    }
+    try:
+        query = stream_chat(client, payload)
+    except Exception as e:
+        result["error"] = f"query failed: {e}"
+        return result
+
+    code = extract_python_code(query["response"])
+    result.update({
+        "response": query["response"],
+        "code": code,
+        "time_to_first_token": query["time_to_first_token"],
+        "total_time": query["total_time"],
+        "prompt_eval_count": query["prompt_eval_count"],
+        "prompt_eval_duration": query["prompt_eval_duration"],
+        "eval_count": query["eval_count"],
+        "eval_duration": query["eval_duration"],
+        "tokens_per_second": query["eval_count"] / query["eval_duration"] if query["eval_count"] and query["eval_duration"] else None
+    })
+    if not code or args.no_execute:
+        return result
+
+    output = {None: [], "stderr": []}
+    try:
+        report = run_code(
+            code,
+            on_output=lambda text, tag: output[tag].append(text),
+            limits=limits,
+            stdin_text=entry.get("stdin", ""), # Closed stdin so input() fails instead of hanging
+            isolate=True
+        )
+    except Exception as e:
+        result["error"] = f"execution failed: {e}"
+        return result
+    result.update({
+        "exit_code": report.returncode,
+        "exit_reason": report.exit_reason,
+        "run_wall_time": report.wall_time,
+        "cpu_time": report.cpu_time,
+        "peak_rss_mb": report.peak_rss_mb,
+        "stdout": "".join(output[None])[-args.max_output_chars:],
+        "stderr": "".join(output["stderr"])[-args.max_output_chars:]
+    })
+    return result
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run prompts against Ollama models and execute the generated code.")
+    parser.add_argument("prompts", help="Prompts file (.txt with one prompt per line, or .jsonl)")
+    parser.add_argument("-m", "--model", action="append", required=True, help="Model to query; repeat for several models")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="JSONL file to write results to")
+    parser.add_argument("-c", "--concurrency", type=int, default=2, help="Number of prompts processed at the same time")
+    parser.add_argument("--url", default="http://localhost:11434", help="Ollama server URL")
+    parser.add_argument("--system", default=DEFAULT_SYSTEM_MESSAGE, help="System message")
+    parser.add_argument("--context", default="", help="Context used for prompts that don't define their own")
+    parser.add_argument("--temperature", type=float, default=0)
+    parser.add_argument("--num-ctx", type=int, default=4096)
+    parser.add_argument("--keep-alive", default=DEFAULT_KEEP_ALIVE)
+    parser.add_argument("--no-execute", action="store_true", help="Only query the models, don't run the extracted code")
+    parser.add_argument("--no-sandbox", action="store_true", help="Run code without resource limits")
+    parser.add_argument("--timeout", type=float, default=30, help="Wall-clock limit per run in seconds")
+    parser.add_argument("--cpu-time", type=int, default=20, help="CPU-time limit per run in seconds")
+    parser.add_argument("--memory-mb", type=int, default=2048, help="Address-space limit per run in MB")
+    parser.add_argument("--output-kb", type=int, default=1024, help="Output limit per run in KB")
+    parser.add_argument("--max-output-chars", type=int, default=4000, help="Characters of stdout/stderr kept per result")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    prompts = load_prompts(args.prompts)
+    jobs = [(entry, model) for entry in prompts for model in args.model]
+    if not jobs:
+        print("No prompts found.", file=sys.stderr)
+        return 1
+
+    limits = None if args.no_sandbox else SandboxLimits(args.timeout, args.cpu_time, args.memory_mb, args.output_kb)
+    client = OllamaClient(args.url, pool_size=max(1, args.concurrency), keep_alive=args.keep_alive)
+    write_lock = threading.Lock()
+    start_time = time.perf_counter()
+    successes = 0
+
+    with open(args.output, "w", encoding="utf-8") as output_file, \
+            ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+        futures = [executor.submit(run_job, client, entry, model, args, limits) for entry, model in jobs]
+        for done_count, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            with write_lock:
+                output_file.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output_file.flush() # Keep partial results if the batch is interrupted
+            if result.get("exit_code") == 0:
+                successes += 1
+            status = result.get("error") or result.get("exit_reason") or ("no code" if not result.get("code") else "not executed")
+            print(f"[{done_count}/{len(jobs)}] {result['model']} #{result['id']}: {status} "
+                  f"({result.get('total_time') or 0:.1f}s)", file=sys.stderr)
+
+    client.close()
+    print(f"{len(jobs)} jobs in {time.perf_counter() - start_time:.1f}s, {successes} ran cleanly. Results: {args.output}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,51 @@
+import time
+STARTUP_BEGAN = time.perf_counter() # Before the imports below, so the startup timing includes them
+
 import tkinter as tk
-from tkinter import filedialog
 from tkinter import ttk, scrolledtext, messagebox
+import asyncio
 import threading
-import queue
-import os # Added for file cleanup
+import sqlite3
+import sys
+import json
+
+from utils.ollama_api import fetch_ollama_models, update_model_list, query_single_model, warm_model, replay_request, get_ollama_client, get_async_client, DEFAULT_KEEP_ALIVE
+from utils.code_execution import execute_code_task, show_code_result
+from utils.code_runs import RunManager, DEFAULT_MAX_RUNS
+from utils.run_view import RunView
+from utils.test_harness import run_tests, TestResultCache, DEFAULT_TEST_TIMEOUT
+from utils.async_engine import AsyncEngine
+from utils.job_queue import JobScheduler, PRIORITIES, DEFAULT_PRIORITY
+from utils.queue_view import QueueView
+from utils.endpoints import EndpointPool, parse_endpoint_urls
+from utils.endpoint_view import EndpointView
+from utils.telemetry import MetricsLog, make_record
+from utils.metrics_view import MetricsView
+from utils.core import extract_python_code, extract_python_blocks, DEFAULT_SYSTEM_MESSAGE
+from utils.code_blocks import CodeBlockParser
+from utils.file_operations import save_script_function, load_script_function, save_output_function, view_output_function
+from utils.stream_renderer import StreamRenderer
+from utils.transcript_view import TranscriptView
+from utils.context_manager import ConversationContext
+from utils.multi_model import start_fan_out, DEFAULT_MAX_PARALLEL
+from utils.response_cache import ResponseCache
+from utils.worker_pool import WarmWorkerPool, DEFAULT_PRELOAD_MODULES
+from utils.sandbox import SandboxLimits
+from utils.precheck import ModuleIndex, precheck_code, build_repair_prompt
+from utils.auto_fix import auto_fix, DEFAULT_MAX_ATTEMPTS, DEFAULT_CANDIDATES
+from utils.session_store import SessionStore
+from utils.history_view import HistoryView
+from utils.retrieval import index_turn, DEFAULT_EMBED_MODEL, DEFAULT_TOP_K
+from utils.project_view import ProjectView
+from utils.settings import load_settings, save_settings
+from utils.app_log import setup_logging, shutdown_logging, get_logger, DEFAULT_LEVEL
+from utils.log_view import LogView
+
+IMPORTS_DONE = time.perf_counter()
 
-from utils.ollama_api import fetch_ollama_models, query_single_model
-from utils.code_execution import execute_code_task
-from utils.file_operations import save_script_function, load_script_function
+log = get_logger("app")
+
+MAX_REPAIR_ROUNDS = 1 # Automatic repair queries per user question
 
 class OllamaMultiModelGUI:
     def __init__(self, root):
@@ -15,23 +53,173 @@ class OllamaMultiModelGUI:
         self.root.title("Ollama Pthon Assistant")
         self.root.geometry("1000x800") # Increased width for new elements
         
-        # Default values
-        self.default_system_message = "You are a helpful coding assistant specializing in Python. You can generate code snippets, explain them, and provide examples. You always adhere to Python best practices and conventions. You are friendly and approachable, and will be helpful to users. If the user requests code, you should provide it in a clear and concise manner. If the user asks for explanations, you should provide them in a way that is easy for a novice programmer to understand. You should also provide examples and test cases to help the user verify the code. If the user asks for code that violates Python best practices, you should politely suggest improvements. If the user asks a question about a specific aspect of Python or coding in general, you should provide a helpful and informative answer."
+        # Default values, overridden by the settings saved at the last close
+        self.settings = load_settings()
+        self.log_level_var = tk.StringVar(value=self.settings.get("log_level", DEFAULT_LEVEL))
+        self.log_trace_var = tk.BooleanVar(value=self.settings.get("log_trace", False))
+        setup_logging(self.log_level_var.get(), self.log_trace_var.get()) # JSONL files in the data directory, written off the Tk thread
+        self.default_system_message = self.settings.get("system_message", DEFAULT_SYSTEM_MESSAGE)
         self.default_context = ""
         self.default_question = "write a simple python script"
-        self.default_temperature = 0
-        self.default_max_tokens = 4096
-        self.ollama_url = "http://localhost:11434"
+        self.default_temperature = self.settings.get("temperature", 0)
+        self.default_max_tokens = self.settings.get("max_tokens", 4096)
+        self.default_ollama_urls = self.settings.get("ollama_urls", "http://localhost:11434")
+        self.ollama_url = (parse_endpoint_urls(self.default_ollama_urls) or ["http://localhost:11434"])[0]
         self.chat_history = [] # To store prompts and responses
-        self.available_models = [] # To store models fetched from Ollama
-        self.stop_event = threading.Event() # Event to signal stopping generation
-        self.stop_code_event = threading.Event() # Event to signal stopping code execution
-        self.current_code_process = None # To hold the subprocess for code execution
-        self.code_input_queue = queue.Queue() # Queue for sending input to the running code
+        self.session_store = SessionStore() # Persistent, searchable history of all sessions
+        self.session = {"id": None} # Current session; its id is set by the worker that stores its first turn
+        self.session_lock = threading.Lock() # Turns stored at the same time must not create two sessions
+        self.conversation_context = ConversationContext() # Keeps the prompt within the num_ctx budget
+        self.last_query_stats = {} # Prompt size and eval timings of the most recent query
+        self.metrics_log = MetricsLog() # Timings of every query, shown in the Metrics tab
+        self._pending_metrics = None # (model, stats) of the shown query, recorded once its answer is drawn
+        self.compare_runs = [] # ModelRun objects of the current multi-model comparison
+        self.model_digests = self.settings.get("model_digests", {}) # Model name -> digest from /api/tags, part of the cache key
+        self.response_cache = ResponseCache() # On-disk cache of deterministic answers
+        self.use_cache_var = tk.BooleanVar(value=True)
+        self.replay_stream_var = tk.BooleanVar(value=False)
+        self.preload_modules_var = tk.StringVar(value=self.settings.get("preload_modules", " ".join(DEFAULT_PRELOAD_MODULES)))
+        self.worker_pool = WarmWorkerPool(preload_modules=self.preload_modules_var.get().replace(",", " ").split()) # Started by the first run
+        self.use_worker_pool_var = tk.BooleanVar(value=True)
+        self.run_latencies = {"warm": [], "cold": []} # Seconds per run, with and without the pool
+        default_limits = SandboxLimits()
+        self.sandbox_var = tk.BooleanVar(value=False)
+        self.sandbox_wall_time_var = tk.StringVar(value=str(default_limits.wall_time))
+        self.sandbox_cpu_time_var = tk.StringVar(value=str(default_limits.cpu_time))
+        self.sandbox_memory_var = tk.StringVar(value=str(default_limits.memory_mb))
+        self.sandbox_output_var = tk.StringVar(value=str(default_limits.output_kb))
+        self.available_models = self.settings.get("models", []) # Last known list until the servers answer
+        self.models_discovered = False # Set once a server has listed its models
         self.code_input_var = tk.StringVar() # Variable for the code input entry
+        self.keep_alive_var = tk.StringVar(value=self.settings.get("keep_alive", DEFAULT_KEEP_ALIVE)) # keep_alive hint sent with every request
+        self.ollama_clients = {} # Server URL -> pooled HTTP client, created on first use by utils.ollama_api
+        self.endpoint_pool = EndpointPool(parse_endpoint_urls(self.default_ollama_urls) or [self.ollama_url]) # Servers the async engine streams from, with failover
+        self.engine = AsyncEngine(self.root) # Owns network and subprocess I/O; reports back through root.after
+        self.auto_fix_operation = None # Running auto-fix session, cancelled by Stop
+        self.job_scheduler = JobScheduler(self.engine, self._start_job, self._on_job_finished, self._on_jobs_changed,
+                                          capacity=lambda server: self.endpoint_pool.capacity(),
+                                          on_limit=lambda limit: self.engine.call_soon(self.endpoint_pool.set_limit, limit))
+        self.endpoint_pool.limit_per_endpoint = self.job_scheduler.limit_per_server # Nothing is in flight yet
+        self.shown_job = None # Job whose answer the Results and Generated Code tabs show
+        self.priority_var = tk.StringVar(value=self.settings.get("priority", DEFAULT_PRIORITY))
+        self.run_manager = RunManager(self.engine, execute_code_task, lambda run, error: show_code_result(self, run, error),
+                                      self._on_run_changed, self.settings.get("max_parallel_runs", DEFAULT_MAX_RUNS))
+        self.max_runs_var = tk.StringVar(value=str(self.run_manager.max_running))
+        self.test_cache = TestResultCache() # Test reports by code hash
+        self.test_timeout_var = tk.StringVar(value=str(self.settings.get("test_timeout", DEFAULT_TEST_TIMEOUT)))
+        self.live_code_blocks = [] # Python blocks parsed so far from the streaming answer
+        self.live_code_default = 0 # Index of the block shown unless the user picks another
+        self.live_code_runnable = False # A Python block has closed, so Run can be offered early
+        self.live_code_active = False # Live updates of the Generated Code tab are wanted
+        self._live_code_scheduled = False
+        self.code_blocks = [] # Python blocks of the shown answer; the selected one is in the Generated Code tab
+        self.code_block_index = 0
+        self.code_block_picked = False # The user chose a block while the answer was streaming
+        self.code_block_var = tk.StringVar()
+        self.module_index = ModuleIndex() # Cached names of importable modules for the pre-check
+        self.precheck_var = tk.BooleanVar(value=True)
+        self.auto_repair_var = tk.BooleanVar(value=False)
+        self.repair_rounds_left = 0
+        self.auto_fix_attempts_var = tk.StringVar(value=str(DEFAULT_MAX_ATTEMPTS))
+        self.auto_fix_candidates_var = tk.StringVar(value=str(DEFAULT_CANDIDATES))
+        self.snippet_index = None # Vector index of earlier snippets, loaded on first use by utils.retrieval
+        self.snippet_index_lock = threading.Lock()
+        self.retrieval_var = tk.BooleanVar(value=False)
+        self.retrieval_k_var = tk.StringVar(value=str(DEFAULT_TOP_K))
+        self.embed_model_var = tk.StringVar(value=self.settings.get("embed_model", DEFAULT_EMBED_MODEL))
+        for name, var in self._option_vars().items():
+            if name in self.settings.get("options", {}):
+                var.set(self.settings["options"][name])
         
         self.create_widgets()
-        self._fetch_ollama_models() # Fetch models on startup
+        self._show_known_models()
+        widgets_built = time.perf_counter()
+        # Nothing below waits for the network: models are discovered by the first health check
+        self.engine.submit_blocking(self.module_index.load)
+        self.engine.submit(self.endpoint_pool.monitor(lambda: self.engine.call_ui(self._on_endpoints_checked))) # Periodic health checks
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.startup_timings = {"imports": IMPORTS_DONE - STARTUP_BEGAN, "window": widgets_built - IMPORTS_DONE}
+        self.root.after_idle(self._on_window_ready)
+
+    def _option_vars(self) -> dict:
+        """Checkbox options saved in the settings."""
+        return {
+            "use_cache": self.use_cache_var,
+            "replay_as_stream": self.replay_stream_var,
+            "use_worker_pool": self.use_worker_pool_var,
+            "sandbox": self.sandbox_var,
+            "precheck": self.precheck_var,
+            "auto_repair": self.auto_repair_var,
+            "retrieval": self.retrieval_var
+        }
+
+    def _show_known_models(self):
+        """Offers the models saved at the last close until the servers have answered."""
+        self.model_combobox['values'] = self.available_models
+        self.compare_models_listbox.delete(0, tk.END)
+        for model in self.available_models:
+            self.compare_models_listbox.insert(tk.END, model)
+        last_model = self.settings.get("model")
+        if last_model in self.available_models:
+            self.model_combobox.set(last_model)
+        elif self.available_models:
+            self.model_combobox.set(self.available_models[0])
+        if self.available_models:
+            self.status_var.set("Checking the Ollama servers (showing the last known models)...")
+        else:
+            self.status_var.set("Fetching models from Ollama...")
+
+    def _on_window_ready(self):
+        """First idle moment after the window was drawn: reports how long startup took."""
+        self.startup_timings["ready"] = time.perf_counter() - STARTUP_BEGAN
+        timings = self.startup_timings
+        text = f"Started in {timings['ready']:.2f}s (imports {timings['imports']:.2f}s, window {timings['window']:.2f}s)"
+        previous = self.settings.get("startup_seconds")
+        if previous:
+            text += f", previous start {previous:.2f}s"
+        log.info(text, extra={"data": {"event": "startup", **self.startup_timings}})
+        if not self.models_discovered:
+            self.status_var.set(f"{self.status_var.get()} {text}.")
+
+    def _save_settings(self):
+        """Stores the server URLs, model, model list and options for the next start."""
+        try:
+            temperature = float(self.temperature_entry.get())
+            max_tokens = int(self.max_tokens_entry.get())
+        except ValueError:
+            temperature, max_tokens = self.default_temperature, self.default_max_tokens
+        model = self.model_combobox.get()
+        save_settings({
+            "ollama_urls": self.ollama_url_entry.get().strip(),
+            "model": model if model in self.available_models else self.settings.get("model"),
+            "models": self.available_models,
+            "model_digests": self.model_digests,
+            "system_message": self.system_message_text.get("1.0", tk.END).strip(),
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "keep_alive": self.keep_alive_var.get().strip() or DEFAULT_KEEP_ALIVE,
+            "priority": self.priority_var.get(),
+            "embed_model": self.embed_model_var.get().strip() or DEFAULT_EMBED_MODEL,
+            "options": {name: var.get() for name, var in self._option_vars().items()},
+            "max_parallel_runs": self.run_manager.max_running,
+            "preload_modules": self.preload_modules_var.get().strip(),
+            "test_timeout": self.test_timeout_var.get(),
+            "log_level": self.log_level_var.get(),
+            "log_trace": self.log_trace_var.get(),
+            "startup_seconds": self.startup_timings.get("ready")
+        })
+
+    def on_close(self):
+        """Saves the settings and stops background workers before closing the window."""
+        self._save_settings()
+        self.engine.shutdown()
+        self.worker_pool.shutdown()
+        self.run_view.close_all()
+        self.results_text.close()
+        self.session_store.close()
+        self.project_view.close()
+        shutdown_logging()
+        self.root.destroy()
         
     def create_widgets(self):
         # Create notebook (tabs)
@@ -49,6 +237,9 @@ class OllamaMultiModelGUI:
         self.model_combobox.set("Loading models...") # Initial text
         self.refresh_models_button = ttk.Button(input_frame, text="Refresh Models", command=self._fetch_ollama_models)
         self.refresh_models_button.grid(row=0, column=2, padx=5, pady=5, sticky=tk.W)
+        self.warm_model_button = ttk.Button(input_frame, text="Warm Model", command=self.warm_selected_model)
+        self.warm_model_button.grid(row=0, column=3, padx=5, pady=5, sticky=tk.W)
+        self.model_combobox.bind("<<ComboboxSelected>>", lambda event: self.warm_selected_model())
         
         # System Message
         ttk.Label(input_frame, text="System Message:").grid(row=1, column=0, sticky=tk.NW, padx=5, pady=5)
@@ -84,32 +275,129 @@ class OllamaMultiModelGUI:
         self.max_tokens_entry.grid(row=5, column=1, sticky=tk.W, padx=5, pady=5)
         self.max_tokens_entry.insert(0, str(self.default_max_tokens))
         
-        ttk.Label(input_frame, text="Ollama URL:").grid(row=6, column=0, sticky=tk.W, padx=5, pady=5)
+        ttk.Label(input_frame, text="Ollama URLs:").grid(row=6, column=0, sticky=tk.W, padx=5, pady=5)
         self.ollama_url_entry = ttk.Entry(input_frame, width=80)
         self.ollama_url_entry.grid(row=6, column=1, sticky=tk.W, padx=5, pady=5)
-        self.ollama_url_entry.insert(0, self.ollama_url)
+        self.ollama_url_entry.insert(0, self.default_ollama_urls) # Several servers, separated by commas, are load balanced
+
+        ttk.Label(input_frame, text="Keep Alive:").grid(row=7, column=0, sticky=tk.W, padx=5, pady=5)
+        self.keep_alive_entry = ttk.Entry(input_frame, textvariable=self.keep_alive_var, width=10)
+        self.keep_alive_entry.grid(row=7, column=1, sticky=tk.W, padx=5, pady=5)
+
+        # Response Cache Options
+        ttk.Label(input_frame, text="Response Cache:").grid(row=8, column=0, sticky=tk.W, padx=5, pady=5)
+        cache_options_frame = ttk.Frame(input_frame)
+        cache_options_frame.grid(row=8, column=1, sticky=tk.W, padx=5, pady=5)
+        ttk.Checkbutton(cache_options_frame, text="Use cached answers (temperature 0 only)", variable=self.use_cache_var).pack(side=tk.LEFT)
+        ttk.Checkbutton(cache_options_frame, text="Replay as stream", variable=self.replay_stream_var).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Button(cache_options_frame, text="Clear Cache", command=self.clear_response_cache).pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Retrieval Options (relevant earlier snippets instead of all previous code)
+        ttk.Label(input_frame, text="Retrieval:").grid(row=9, column=0, sticky=tk.W, padx=5, pady=5)
+        retrieval_frame = ttk.Frame(input_frame)
+        retrieval_frame.grid(row=9, column=1, sticky=tk.W, padx=5, pady=5)
+        ttk.Checkbutton(retrieval_frame, text="Add relevant earlier snippets", variable=self.retrieval_var).pack(side=tk.LEFT)
+        ttk.Label(retrieval_frame, text="Top k:").pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Spinbox(retrieval_frame, from_=1, to=20, textvariable=self.retrieval_k_var, width=4).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Label(retrieval_frame, text="Embedding model:").pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Entry(retrieval_frame, textvariable=self.embed_model_var, width=25).pack(side=tk.LEFT, padx=(5, 0))
+
+        # Auto-fix Options (generate, run and repair until the code runs cleanly)
+        ttk.Label(input_frame, text="Auto-fix:").grid(row=10, column=0, sticky=tk.W, padx=5, pady=5)
+        auto_fix_frame = ttk.Frame(input_frame)
+        auto_fix_frame.grid(row=10, column=1, sticky=tk.W, padx=5, pady=5)
+        ttk.Label(auto_fix_frame, text="Attempts:").pack(side=tk.LEFT)
+        ttk.Spinbox(auto_fix_frame, from_=1, to=10, textvariable=self.auto_fix_attempts_var, width=4).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Label(auto_fix_frame, text="Parallel candidates:").pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Spinbox(auto_fix_frame, from_=1, to=8, textvariable=self.auto_fix_candidates_var, width=4).pack(side=tk.LEFT, padx=(5, 0))
+        self.auto_fix_button = ttk.Button(auto_fix_frame, text="Generate && Run", command=self.auto_fix_threaded)
+        self.auto_fix_button.pack(side=tk.LEFT, padx=(10, 0))
         
         # Submit and Stop Buttons
-        self.submit_button = ttk.Button(input_frame, text="Query Model", command=self.query_model_threaded)
-        self.submit_button.grid(row=7, column=1, sticky=tk.E, padx=5, pady=10)
+        submit_frame = ttk.Frame(input_frame)
+        submit_frame.grid(row=11, column=1, sticky=tk.E, padx=5, pady=10)
+        ttk.Label(submit_frame, text="Priority:").pack(side=tk.LEFT)
+        ttk.Combobox(submit_frame, textvariable=self.priority_var, values=list(PRIORITIES), state="readonly", width=8).pack(side=tk.LEFT, padx=(5, 10))
+        self.submit_button = ttk.Button(submit_frame, text="Query Model", command=self.query_model_threaded) # Queues the prompt; it never waits for a running one
+        self.submit_button.pack(side=tk.LEFT)
         self.stop_button = ttk.Button(input_frame, text="Stop Generation", command=self.stop_generation, state=tk.DISABLED)
-        self.stop_button.grid(row=7, column=0, sticky=tk.W, padx=5, pady=10)
+        self.stop_button.grid(row=11, column=0, sticky=tk.W, padx=5, pady=10)
         
         # Results Frame
         self.results_frame = ttk.Frame(notebook)
         notebook.add(self.results_frame, text="Results")
         
         # Results Text
-        self.results_text = scrolledtext.ScrolledText(self.results_frame, width=110, height=20) # Reduced height
+        self.results_text = TranscriptView(self.results_frame, width=110, height=20) # Only the lines near the view are in the widget
         self.results_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.stream_renderer = StreamRenderer(self.root, self.results_text) # Batches streamed tokens into results_text
+        self.stream_renderer.on_finished = self._on_stream_rendered
+
+        # Queue Frame
+        self.queue_frame = ttk.Frame(notebook)
+        notebook.add(self.queue_frame, text="Queue")
+
+        self.queue_view = QueueView(self.queue_frame, self.job_scheduler, on_show=self.show_job)
+
+        # Servers Frame
+        self.servers_frame = ttk.Frame(notebook)
+        notebook.add(self.servers_frame, text="Servers")
+
+        self.endpoint_view = EndpointView(self.servers_frame, self.endpoint_pool, on_check=self.check_endpoints)
+
+        # Metrics Frame
+        self.metrics_frame = ttk.Frame(notebook)
+        notebook.add(self.metrics_frame, text="Metrics")
+
+        self.metrics_view = MetricsView(self.metrics_frame, self.metrics_log)
+
+        # Logs Frame
+        self.logs_frame = ttk.Frame(notebook)
+        notebook.add(self.logs_frame, text="Logs")
+
+        self.log_view = LogView(self.logs_frame, self.root, self.log_level_var, self.log_trace_var, on_replay=self.replay_logged_request)
+        notebook.bind("<<NotebookTabChanged>>", lambda event: self._on_tab_changed(notebook))
+
+        # Compare Models Frame
+        self.compare_frame = ttk.Frame(notebook)
+        notebook.add(self.compare_frame, text="Compare Models")
+
+        compare_controls_frame = ttk.Frame(self.compare_frame)
+        compare_controls_frame.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Label(compare_controls_frame, text="Models:").pack(side=tk.LEFT, anchor=tk.N)
+        self.compare_models_listbox = tk.Listbox(compare_controls_frame, selectmode=tk.MULTIPLE, height=5, width=50, exportselection=False)
+        self.compare_models_listbox.pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Label(compare_controls_frame, text="Max Parallel:").pack(side=tk.LEFT, anchor=tk.N, padx=(10, 0))
+        self.max_parallel_var = tk.IntVar(value=DEFAULT_MAX_PARALLEL)
+        ttk.Spinbox(compare_controls_frame, from_=1, to=8, width=4, textvariable=self.max_parallel_var).pack(side=tk.LEFT, anchor=tk.N, padx=(5, 0))
+        self.compare_button = ttk.Button(compare_controls_frame, text="Query Selected Models", command=self.query_selected_models)
+        self.compare_button.pack(side=tk.LEFT, anchor=tk.N, padx=(10, 0))
+        self.stop_compare_button = ttk.Button(compare_controls_frame, text="Stop All", command=self.stop_generation, state=tk.DISABLED)
+        self.stop_compare_button.pack(side=tk.LEFT, anchor=tk.N, padx=(5, 0))
+
+        # One streaming pane per model, side by side
+        self.compare_panes = ttk.PanedWindow(self.compare_frame, orient=tk.HORIZONTAL)
+        self.compare_panes.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        compare_columns = ("model", "status", "ttft", "tokens_per_second", "total", "tokens", "code")
+        self.compare_tree = ttk.Treeview(self.compare_frame, columns=compare_columns, show="headings", height=5)
+        for column, heading in zip(compare_columns, ("Model", "Status", "First Token", "Tokens/s", "Total Time", "Tokens", "Code")):
+            self.compare_tree.heading(column, text=heading)
+            self.compare_tree.column(column, width=100)
+        self.compare_tree.pack(fill=tk.X, padx=5, pady=5)
 
         # Chat History Frame
         self.chat_history_frame = ttk.Frame(notebook)
         notebook.add(self.chat_history_frame, text="Chat History")
 
-        self.chat_history_text = scrolledtext.ScrolledText(self.chat_history_frame, width=110, height=40)
-        self.chat_history_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        self.chat_history_text.config(state=tk.DISABLED) # Make it read-only
+        self.history_view = HistoryView(self.chat_history_frame, self.session_store, on_continue=self.continue_session)
+        self.history_view.reload()
+
+        # Project Frame
+        self.project_frame = ttk.Frame(notebook)
+        notebook.add(self.project_frame, text="Project")
+
+        self.project_view = ProjectView(self.project_frame, self.engine) # Attached files are added to the context of each query
 
         # Generated Code Frame
         self.generated_code_frame = ttk.Frame(notebook)
@@ -120,8 +408,14 @@ class OllamaMultiModelGUI:
         code_controls_frame.pack(fill=tk.X, padx=5, pady=5)
 
         ttk.Label(code_controls_frame, text="Generated Python Code:").pack(side=tk.LEFT)
+        ttk.Label(code_controls_frame, text="Block:").pack(side=tk.LEFT, padx=(10, 0))
+        self.code_block_combobox = ttk.Combobox(code_controls_frame, textvariable=self.code_block_var, state=tk.DISABLED, width=8)
+        self.code_block_combobox.pack(side=tk.LEFT, padx=(5, 0))
+        self.code_block_combobox.bind("<<ComboboxSelected>>", lambda event: self.show_code_block(self.code_block_combobox.current()))
         self.run_code_button = ttk.Button(code_controls_frame, text="Run Code", command=self.run_generated_code)
         self.run_code_button.pack(side=tk.RIGHT)
+        self.run_tests_button = ttk.Button(code_controls_frame, text="Run Tests", command=self.run_generated_tests)
+        self.run_tests_button.pack(side=tk.RIGHT, padx=(5, 0))
         self.stop_code_button = ttk.Button(code_controls_frame, text="Stop Code", command=self.stop_code_execution, state=tk.DISABLED)
         self.stop_code_button.pack(side=tk.RIGHT, padx=(5, 0))
         self.edit_code_button = ttk.Button(code_controls_frame, text="Edit Code", command=self.enable_code_editing)
@@ -131,15 +425,46 @@ class OllamaMultiModelGUI:
         self.load_code_button = ttk.Button(code_controls_frame, text="Load Code", command=lambda: load_script_function(self))
         self.load_code_button.pack(side=tk.RIGHT, padx=(5, 0))
 
+        # Warm worker pool options
+        worker_pool_frame = ttk.Frame(self.generated_code_frame)
+        worker_pool_frame.pack(fill=tk.X, padx=5)
+        ttk.Checkbutton(worker_pool_frame, text="Use warm workers", variable=self.use_worker_pool_var).pack(side=tk.LEFT)
+        ttk.Label(worker_pool_frame, text="Preload modules:").pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Entry(worker_pool_frame, textvariable=self.preload_modules_var, width=40).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Label(worker_pool_frame, text="Parallel runs:").pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Entry(worker_pool_frame, textvariable=self.max_runs_var, width=4).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Label(worker_pool_frame, text="Test timeout (s):").pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Entry(worker_pool_frame, textvariable=self.test_timeout_var, width=5).pack(side=tk.LEFT, padx=(5, 0))
+
+        # Sandbox options (limits are applied by the OS on Linux/macOS)
+        sandbox_frame = ttk.Frame(self.generated_code_frame)
+        sandbox_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+        ttk.Checkbutton(sandbox_frame, text="Sandbox", variable=self.sandbox_var).pack(side=tk.LEFT)
+        for label, variable in (("Timeout (s):", self.sandbox_wall_time_var), ("CPU (s):", self.sandbox_cpu_time_var),
+                                ("Memory (MB):", self.sandbox_memory_var), ("Output (KB):", self.sandbox_output_var)):
+            ttk.Label(sandbox_frame, text=label).pack(side=tk.LEFT, padx=(10, 0))
+            ttk.Entry(sandbox_frame, textvariable=variable, width=7).pack(side=tk.LEFT, padx=(5, 0))
+
+        # Pre-check options (syntax and imports are checked without launching anything)
+        precheck_frame = ttk.Frame(self.generated_code_frame)
+        precheck_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+        ttk.Checkbutton(precheck_frame, text="Pre-check before running", variable=self.precheck_var).pack(side=tk.LEFT)
+        ttk.Checkbutton(precheck_frame, text="Ask the model to fix problems", variable=self.auto_repair_var).pack(side=tk.LEFT, padx=(10, 0))
+
         self.generated_code_text = scrolledtext.ScrolledText(self.generated_code_frame, width=110, height=20)
         self.generated_code_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.generated_code_text.tag_config("precheck_error", background="#ffd6d6", underline=True)
         self.generated_code_text.config(state=tk.DISABLED) # Make it read-only
 
         # Output for generated code execution
-        ttk.Label(self.generated_code_frame, text="Code Execution Output:").pack(fill=tk.X, padx=5, pady=5)
-        self.code_output_text = scrolledtext.ScrolledText(self.generated_code_frame, width=110, height=10)
-        self.code_output_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        self.code_output_text.config(state=tk.DISABLED) # Make it read-only
+        code_output_label_frame = ttk.Frame(self.generated_code_frame)
+        code_output_label_frame.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Label(code_output_label_frame, text="Code Execution Output:").pack(side=tk.LEFT)
+        ttk.Button(code_output_label_frame, text="Close Tab", command=self.close_run_tab).pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Button(code_output_label_frame, text="Save Full Output", command=lambda: save_output_function(self)).pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Button(code_output_label_frame, text="View Full Output", command=lambda: view_output_function(self)).pack(side=tk.RIGHT, padx=(5, 0))
+        self.run_view = RunView(self.generated_code_frame, self.root) # One output tab per run
+        self.run_view.notebook.bind("<<NotebookTabChanged>>", lambda event: self._update_run_controls())
 
         # Input for generated code execution
         code_input_frame = ttk.Frame(self.generated_code_frame)
@@ -149,6 +474,7 @@ class OllamaMultiModelGUI:
         self.code_input_entry.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=(5, 0))
         self.send_code_input_button = ttk.Button(code_input_frame, text="Send Input", command=self.send_code_input, state=tk.DISABLED)
         self.send_code_input_button.pack(side=tk.LEFT, padx=(5, 0))
+        self.code_input_entry.bind("<Return>", lambda event: self.send_code_input())
         
         # Status Bar
         self.status_var = tk.StringVar()
@@ -157,9 +483,57 @@ class OllamaMultiModelGUI:
         status_bar.pack(fill=tk.X)
 
     def _fetch_ollama_models(self):
-        """Fetches available models from the Ollama API and populates the combobox."""
+        """Checks the servers in the background; the model list is updated when they answer."""
         fetch_ollama_models(self)
+
+    def warm_selected_model(self):
+        """Preloads the model selected in the combobox on the async engine."""
+        model = self.model_combobox.get()
+        if model not in self.available_models:
+            return
+        keep_alive = self.keep_alive_var.get().strip() or DEFAULT_KEEP_ALIVE
+        self.status_var.set(f"Warming up {model}...")
+        self.engine.submit(warm_model(self, model, keep_alive), lambda result, error: self._on_model_warmed(model, result, error))
+
+    def _on_model_warmed(self, model: str, result, error):
+        if error is None:
+            url, seconds = result
+            self.status_var.set(f"Model {model} loaded on {url} in {seconds:.1f}s.")
+        elif not isinstance(error, asyncio.CancelledError):
+            self.status_var.set(f"Error warming up {model}: {str(error)}")
     
+    def set_endpoint_urls(self, urls: list, check: bool = True):
+        """Points the endpoint pool at the servers in the URL field, checking any new ones."""
+        self.ollama_url = urls[0]
+        if urls != [endpoint.url for endpoint in self.endpoint_pool.endpoints]:
+            self.engine.call_soon(self.endpoint_pool.set_urls, urls)
+            if check:
+                self.check_endpoints()
+
+    def check_endpoints(self):
+        """Health-checks every server now instead of waiting for the background check."""
+        self.engine.submit(self.endpoint_pool.check_all(), lambda result, error: self._on_endpoints_checked())
+
+    def _on_endpoints_checked(self, warm: bool = False):
+        """
+        Refreshes the Servers tab and the model list after a health check. The first
+        time models are found (or after Refresh Models) the chosen model is warmed up.
+        """
+        self.endpoint_view.refresh()
+        changed = update_model_list(self)
+        if changed:
+            self.compare_models_listbox.delete(0, tk.END)
+            for model in self.available_models:
+                self.compare_models_listbox.insert(tk.END, model)
+        if self.endpoint_pool.models() and (warm or not self.models_discovered):
+            self.models_discovered = True
+            self.status_var.set(f"Models loaded ({len(self.available_models)} on {sum(1 for e in self.endpoint_pool.endpoints if e.healthy)} server(s)).")
+            self.warm_selected_model()
+
+    def _on_jobs_changed(self):
+        self.queue_view.refresh()
+        self.endpoint_view.refresh() # Requests in flight per server
+
     def get_input_values(self):
         """Get all input values from the GUI"""
         try:
@@ -170,10 +544,17 @@ class OllamaMultiModelGUI:
 
             system_message = self.system_message_text.get("1.0", tk.END).strip()
             context = self.context_text.get("1.0", tk.END).strip() # Get current context from GUI
+            project_context = self.project_view.attachments_context() # Read now, so edits to the files are picked up
+            if project_context:
+                context = f"{context}\n\n{project_context}" if context else project_context
             question = self.question_text.get("1.0", tk.END).strip()
             temperature = float(self.temperature_entry.get())
             max_tokens = int(self.max_tokens_entry.get())
-            ollama_url = self.ollama_url_entry.get().strip()
+            urls = parse_endpoint_urls(self.ollama_url_entry.get())
+            if not urls:
+                raise ValueError("enter at least one Ollama URL")
+            self.set_endpoint_urls(urls)
+            ollama_url = urls[0] # Queue key; the endpoint pool picks the server per request
             
             return {
                 "model": model,
@@ -182,47 +563,132 @@ class OllamaMultiModelGUI:
                 "question": question,
                 "temperature": temperature,
                 "max_tokens": max_tokens,
-                "ollama_url": ollama_url
+                "ollama_url": ollama_url,
+                "use_cache": self.use_cache_var.get(),
+                "replay_as_stream": self.replay_stream_var.get(),
+                "retrieval_k": int(self.retrieval_k_var.get()) if self.retrieval_var.get() else 0,
+                "embed_model": self.embed_model_var.get().strip() or DEFAULT_EMBED_MODEL,
+                "keep_alive": self.keep_alive_var.get().strip() or DEFAULT_KEEP_ALIVE
             }
         except ValueError as e:
             messagebox.showerror("Input Error", f"Invalid input value: {str(e)}")
             return None
     
     def query_model_threaded(self):
-        """Starts the model query in a separate thread to keep GUI responsive."""
+        """Queues the prompt; the scheduler runs it on the async engine when a slot is free."""
         inputs = self.get_input_values()
         if inputs is None:
             return
-        
-        self.stop_event.clear() # Clear the stop event for a new query
-        self.submit_button.config(state=tk.DISABLED)
+        self.repair_rounds_left = MAX_REPAIR_ROUNDS
+        self._start_query(inputs, self.priority_var.get())
+
+    def _start_query(self, inputs, priority: str = DEFAULT_PRIORITY):
+        """Adds a query to the job queue."""
+        job = self.job_scheduler.submit(inputs, priority)
+        if job.status == "queued":
+            self.status_var.set(f"Prompt #{job.id} queued ({len(self.job_scheduler.queued())} waiting).")
+
+    def _start_job(self, job):
+        """
+        Scheduler callback when a job is dispatched: the newest job takes over the Results
+        and Generated Code tabs (unless auto-fix is using them). Returns the job's task.
+        """
+        if self.auto_fix_operation is None:
+            self._show_running_job(job)
+        return self._query_model_task(job)
+
+    def _show_running_job(self, job):
+        """Resets the result widgets and streams the running job's answer into them."""
+        if self.shown_job is not None:
+            self.shown_job.detach() # Keeps streaming into its own buffer
+        self._flush_pending_metrics() # The last answer may not have been drawn completely
+        self.shown_job = job
         self.stop_button.config(state=tk.NORMAL) # Enable stop button
         self.run_code_button.config(state=tk.DISABLED) # Disable run button during query
         self.edit_code_button.config(state=tk.DISABLED) # Disable edit button during query
-        self.code_input_entry.config(state=tk.DISABLED) # Disable code input during query
-        self.send_code_input_button.config(state=tk.DISABLED) # Disable send input button during query
-        self.status_var.set("Querying model...")
-        self.root.update()
+        self.status_var.set(f"Querying model (prompt #{job.id})...")
         
         # Clear previous results and generated code
         self.results_text.delete("1.0", tk.END)
+        self.stream_renderer.start()
         self.generated_code_text.config(state=tk.NORMAL)
         self.generated_code_text.delete("1.0", tk.END)
         self.generated_code_text.config(state=tk.DISABLED)
-        self.code_output_text.config(state=tk.NORMAL)
-        self.code_output_text.delete("1.0", tk.END)
-        self.code_output_text.config(state=tk.DISABLED)
 
-        # Start the query in a new thread
-        threading.Thread(target=self._query_model_task, args=(inputs,)).start()
+        self.set_code_blocks([])
+        self.live_code_blocks = []
+        self.live_code_default = 0
+        self.code_block_picked = False
+        self.live_code_runnable = False
+        self.live_code_active = True
+        job.attach(self.stream_renderer)
+
+    def show_job(self, job):
+        """Queue view action: shows a job's answer (so far) in the Results tab."""
+        if job is self.shown_job and not job.is_finished():
+            return
+        if job.status == "running":
+            self._show_running_job(job)
+            return
+        if job.status == "queued":
+            self.status_var.set(f"Prompt #{job.id} hasn't started yet.")
+            return
+        if self.shown_job is not None:
+            self.shown_job.detach()
+        self._flush_pending_metrics()
+        self.shown_job = job
+        self.live_code_active = False
+        self.results_text.delete("1.0", tk.END)
+        self.stream_renderer.start()
+        job.attach(self.stream_renderer)
+        job.detach()
+        self.stream_renderer.finish()
+        self._show_generated_code(job.code, *extract_python_blocks(job.response))
+        self.stop_button.config(state=tk.DISABLED)
+        self.status_var.set(f"Showing prompt #{job.id} ({job.status}).")
+
+    def query_selected_models(self):
+        """Queries every model selected in the Compare Models list concurrently."""
+        models = [self.compare_models_listbox.get(index) for index in self.compare_models_listbox.curselection()]
+        if not models:
+            messagebox.showerror("Input Error", "Please select at least one model to compare.")
+            return
+        inputs = self.get_input_values()
+        if inputs is None:
+            return
+        try:
+            max_parallel = int(self.max_parallel_var.get())
+        except (ValueError, tk.TclError):
+            max_parallel = DEFAULT_MAX_PARALLEL
+
+        self.compare_button.config(state=tk.DISABLED)
+        self.stop_compare_button.config(state=tk.NORMAL)
+        self.status_var.set(f"Querying {len(models)} models...")
+        self.compare_runs = start_fan_out(self, models, inputs, max_parallel)
+
+    def _on_fan_out_finished(self, runs):
+        """Re-enables the comparison controls and reports the fastest model with compiling code."""
+        self.compare_button.config(state=tk.NORMAL)
+        self.stop_compare_button.config(state=tk.DISABLED)
+        for run in runs:
+            run.stop_button.config(state=tk.DISABLED)
+        candidates = [run for run in runs if run.status == "done" and run.code_status == "compiles"]
+        if candidates:
+            best = min(candidates, key=lambda run: run.stats["wall_time"])
+            self.status_var.set(f"Comparison completed. Fastest model with compiling code: {best.model} ({best.stats['wall_time']:.2f}s)")
+        else:
+            self.status_var.set("Comparison completed. No model produced compiling code.")
 
     def stop_generation(self):
-        """Sets the stop event to signal the generation process to stop."""
-        self.stop_event.set()
+        """Cancels the shown query (or auto-fix session, or model comparison); the connection is closed at once."""
+        if self.shown_job is not None:
+            self.job_scheduler.cancel(self.shown_job)
+        if self.auto_fix_operation is not None:
+            self.auto_fix_operation.cancel()
+        for run in self.compare_runs:
+            run.stop()
         self.status_var.set("Stopping generation...")
         self.stop_button.config(state=tk.DISABLED)
-        self.submit_button.config(state=tk.NORMAL)
-        self.root.update_idletasks()
 
     def enable_code_editing(self):
         """Enables editing of the generated code text area."""
@@ -231,189 +697,520 @@ class OllamaMultiModelGUI:
         messagebox.showinfo("Edit Code", "You can now edit the generated code. Click 'Run Code' to execute your modified code.")
 
     def stop_code_execution(self):
-        """Sets the stop event to signal the code execution process to stop."""
-        self.stop_code_event.set()
-        if self.current_code_process and self.current_code_process.poll() is None:
-            print("Stop code execution event detected. Terminating process.")
-            self.current_code_process.terminate() # Send SIGTERM
-            try:
-                self.current_code_process.wait(timeout=5) # Wait for process to terminate
-            except subprocess.TimeoutExpired:
-                if self.current_code_process.poll() is None: # If still running, force kill
-                    self.current_code_process.kill() # Send SIGKILL
-        self.status_var.set("Stopping code execution...")
+        """
+        Stops the run shown in the selected output tab. The engine terminates the
+        process, so the GUI never waits for it to exit.
+        """
+        tab = self.run_view.selected()
+        if tab is None:
+            return
+        if tab.run is not None and not tab.run.is_finished():
+            self.run_manager.stop(tab.run)
+        elif tab.operation is not None and not tab.operation.done():
+            tab.operation.cancel()
+        else:
+            return
+        self.status_var.set(f"Stopping {tab.title}...")
         self.stop_code_button.config(state=tk.DISABLED)
-        self.run_code_button.config(state=tk.NORMAL)
-        self.code_input_entry.config(state=tk.DISABLED) # Disable code input
-        self.send_code_input_button.config(state=tk.DISABLED) # Disable send input button
-        self.root.update_idletasks()
+
+    def close_run_tab(self):
+        """Closes the selected output tab, stopping its program if it is still running."""
+        tab = self.run_view.selected()
+        if tab is None:
+            return
+        if tab.run is not None:
+            self.run_manager.remove(tab.run)
+        if tab.operation is not None:
+            tab.operation.cancel()
+        self.run_view.close(tab)
+        self._update_run_controls()
+
+    def _on_run_changed(self, run):
+        """Run manager callback: redraws the run's tab and the controls for the selected run."""
+        self.run_view.update_run(run)
+        self._update_run_controls()
+
+    def _update_run_controls(self):
+        """Stop Code and the input box act on the run in the selected output tab."""
+        tab = self.run_view.selected()
+        running = tab is not None and tab.run is not None and not tab.run.is_finished()
+        testing = tab is not None and tab.operation is not None and not tab.operation.done()
+        self.stop_code_button.config(state=tk.NORMAL if running or testing else tk.DISABLED)
+        self.code_input_entry.config(state=tk.NORMAL if running else tk.DISABLED)
+        self.send_code_input_button.config(state=tk.NORMAL if running else tk.DISABLED)
+
+    def clear_response_cache(self):
+        """Deletes all cached model answers."""
+        self.response_cache.clear()
+        self.status_var.set("Response cache cleared.")
 
     def clear_context(self):
         """Clears the context text area and resets it to the default context, and clears chat history."""
         self.context_text.delete("1.0", tk.END)
         self.context_text.insert(tk.INSERT, self.default_context)
         self.chat_history = [] # Clear the chat history list
-        self.chat_history_text.config(state=tk.NORMAL)
-        self.chat_history_text.delete("1.0", tk.END) # Clear the chat history display
-        self.chat_history_text.config(state=tk.DISABLED)
+        self.conversation_context.reset()
+        self.session = {"id": None} # The next question starts a new session; stored sessions are kept
         self.status_var.set("Context and chat history cleared.")
         messagebox.showinfo("Context Cleared", "The context input field and chat history have been reset to their default values.")
 
     def send_code_input(self):
-        """Sends the content of the code input entry to the running subprocess."""
+        """Sends the content of the code input entry to the run in the selected output tab."""
         input_text = self.code_input_var.get()
-        if input_text:
-            self.code_input_queue.put(input_text + "\n") # Add newline for input()
+        run = self.run_view.selected_run()
+        if not input_text:
+            messagebox.showwarning("Empty Input", "Please enter some text to send as input.")
+        elif run is None or not run.send_input(input_text + "\n"): # Add newline for input()
+            self.status_var.set("The selected program has ended or closed its input.")
+        else:
             self.code_input_var.set("") # Clear the input entry
-            self.code_output_text.config(state=tk.NORMAL)
-            self.code_output_text.insert(tk.END, f"> {input_text}\n") # Show user's input in output
-            self.code_output_text.see(tk.END)
-            self.code_output_text.config(state=tk.DISABLED)
-            self.root.update_idletasks()
-            
-            # Attempt to write to stdin immediately if process is running
-            if self.current_code_process and self.current_code_process.stdin:
-                try:
-                    # Get the input from the queue (it should be there from the put call above)
-                    input_to_send = self.code_input_queue.get_nowait()
-                    self.current_code_process.stdin.write(input_to_send)
-                    self.current_code_process.stdin.flush()
-                    print(f"Sent input to subprocess: {input_to_send.strip()}") # Debugging log
-                except queue.Empty:
-                    pass # Should not happen
-                except BrokenPipeError:
-                    print("BrokenPipeError: Subprocess stdin pipe is closed. Process might have exited.")
-                except Exception as e:
-                    print(f"Error sending input to subprocess: {e}")
+            run.renderer.push(f"> {input_text}\n") # Show user's input in output, in order with the program's output
+
+    async def _query_model_task(self, job):
+        """Engine task: queries the model, stores the turn and returns (response, generated code)."""
+        inputs = job.inputs
+        model = inputs["model"]
+        job.push(f"\n=== Querying {model} ===\n", count_as_token=False)
+        code_parser = CodeBlockParser(on_code_changed=lambda parser: self._on_code_streamed(job, parser))
+        
+        response_content = await query_single_model(
+            self,
+            model=model,
+            system_message=inputs["system_message"],
+            context=inputs["context"], # Use the current content of the context_text
+            question=inputs["question"],
+            temperature=inputs["temperature"],
+            max_tokens=inputs["max_tokens"],
+            ollama_url=inputs["ollama_url"],
+            renderer=job, # Buffered by the job and mirrored to the Results tab while it is shown
+            stats=job.stats,
+            use_cache=inputs["use_cache"],
+            replay_as_stream=inputs["replay_as_stream"],
+            on_chunk=code_parser.feed, # Fills the Generated Code tab while the answer streams
+            retrieval_k=inputs["retrieval_k"],
+            embed_model=inputs["embed_model"],
+            keep_alive=inputs["keep_alive"]
+        )
+        job.push("\n" + "="*50 + "\n", count_as_token=False)
+
+        # Attempt to generate Python code
+        generated_code = self._extract_python_code(response_content)
+
+        # Store in chat history (without generated code in history entry itself); the list belongs to the Tk thread
+        self.engine.call_ui(lambda: self._add_to_chat_history(
+            inputs["question"],
+            response_content,
+            model=model,
+            code=generated_code,
+            options={"temperature": inputs["temperature"], "num_ctx": inputs["max_tokens"]},
+            stats=job.stats
+        ))
+        return response_content, generated_code
+
+    def _on_job_finished(self, job, result, error):
+        """Scheduler callback on the Tk thread: records the answer and, if the job is shown, updates the widgets."""
+        if result is not None:
+            job.response, job.code = result
+            inputs = job.inputs
+            if job.code and not inputs["retrieval_k"]: # With retrieval, relevant code is looked up per question instead
+                # Append generated code to the context text area
+                self.context_text.insert(tk.END, f"\n\n```python\n{job.code}\n```\n")
+                self.context_text.see(tk.END)
+            if inputs["retrieval_k"]: # Embed this turn's snippets for later questions
+                client = get_ollama_client(self, self.endpoint_pool.pick(inputs["embed_model"]).url, inputs["keep_alive"])
+                self.engine.submit_blocking(index_turn, self, client, inputs["embed_model"], inputs["question"], job.response)
+        if job is not self.shown_job:
+            if error is None:
+                self.record_query_metrics("query", job.inputs["model"], job.stats)
+            if error is not None and not isinstance(error, asyncio.CancelledError):
+                self.status_var.set(f"Prompt #{job.id} failed: {error}")
+            return
+
+        job.detach()
+        self.last_query_stats = job.stats
+        self.live_code_active = False
+        self.stream_renderer.finish() # Let the main loop flush the remaining chunks
+        self.stop_button.config(state=tk.DISABLED) # Disable stop button after completion or stop
+        if isinstance(error, asyncio.CancelledError):
+            self.status_var.set("Generation stopped by user.")
+            return
+        if error is not None:
+            messagebox.showerror("Error", f"An error occurred: {str(error)}")
+            self.status_var.set("Error occurred")
+            return
+
+        self._pending_metrics = (job.inputs["model"], job.stats) # Recorded with the render lag in _on_stream_rendered
+        blocks, index = extract_python_blocks(job.response)
+        if self.code_block_picked and self.code_block_index < len(blocks):
+            index = self.code_block_index # Keep the block chosen while the answer streamed
+        self._show_generated_code(blocks[index] if blocks else "", blocks, index)
+        self.status_var.set(f"Query completed - {self._format_query_stats()}")
+        if blocks:
+            self.precheck_generated_code(blocks[index]) # Flag problems before the user clicks Run
+
+    def _show_generated_code(self, generated_code: str, blocks: list = None, index: int = 0):
+        """
+        Shows extracted code in the Generated Code tab and enables Run and Edit when there
+        is some. blocks are all Python blocks of the answer, generated_code being blocks[index].
+        """
+        self.set_code_blocks(blocks if blocks is not None else [generated_code] if generated_code else [], index)
+        self.generated_code_text.config(state=tk.NORMAL)
+        self.generated_code_text.delete("1.0", tk.END) # Clear previous code
+        if generated_code:
+            self.generated_code_text.insert(tk.END, generated_code)
+            self.generated_code_text.config(state=tk.DISABLED)
+            self.generated_code_text.see(tk.END)
+            self.run_code_button.config(state=tk.NORMAL) # Enable run button
+            self.edit_code_button.config(state=tk.NORMAL) # Enable edit button
         else:
-            messagebox.showwarning("Empty Input", "Please enter some text to send as input.")
+            self.generated_code_text.insert(tk.END, "No executable Python code detected in response.")
+            self.generated_code_text.config(state=tk.DISABLED)
+            self.run_code_button.config(state=tk.DISABLED) # Disable run button if no code
+            self.edit_code_button.config(state=tk.DISABLED) # Disable edit button if no code
 
-    def _query_model_task(self, inputs):
-        """Task to query a single model and update GUI."""
-        try:
-            model = inputs["model"]
-            self.results_text.insert(tk.END, f"\n=== Querying {model} ===\n")
-            self.root.update()
-            
-            response_content = query_single_model(
-                self,
-                model=model,
-                system_message=inputs["system_message"],
-                context=inputs["context"], # Use the current content of the context_text
-                question=inputs["question"],
-                temperature=inputs["temperature"],
-                max_tokens=inputs["max_tokens"],
-                ollama_url=inputs["ollama_url"]
-            )
-            
-            if not self.stop_event.is_set(): # Only update if not stopped
-                self.results_text.insert(tk.END, f"\nResponse from {model}:\n")
-                self.results_text.insert(tk.END, response_content)
-                self.results_text.insert(tk.END, "\n" + "="*50 + "\n")
-                self.results_text.see(tk.END)
-                self.root.update()
-
-                # Store in chat history (without generated code in history entry itself)
-                self._add_to_chat_history(inputs["question"], response_content)
-
-                # Attempt to generate Python code
-                generated_code = self._extract_python_code(response_content)
-                if generated_code:
-                    self.generated_code_text.config(state=tk.NORMAL)
-                    self.generated_code_text.delete("1.0", tk.END) # Clear previous code
-                    self.generated_code_text.insert(tk.END, generated_code)
-                    self.generated_code_text.config(state=tk.DISABLED)
-                    self.generated_code_text.see(tk.END)
-                    self.run_code_button.config(state=tk.NORMAL) # Enable run button
-                    self.edit_code_button.config(state=tk.NORMAL) # Enable edit button
-                    self.root.update()
-
-                    # Append generated code to the context text area
-                    self.context_text.insert(tk.END, f"\n\n```python\n{generated_code}\n```\n")
-                    self.context_text.see(tk.END)
-                    self.root.update_idletasks()
-
-                else:
-                    self.generated_code_text.config(state=tk.NORMAL)
-                    self.generated_code_text.delete("1.0", tk.END)
-                    self.generated_code_text.insert(tk.END, "No executable Python code detected in response.")
-                    self.generated_code_text.config(state=tk.DISABLED)
-                    self.run_code_button.config(state=tk.DISABLED) # Disable run button if no code
-                    self.edit_code_button.config(state=tk.DISABLED) # Disable edit button if no code
-                
-                self.status_var.set("Query completed")
-            else:
-                self.status_var.set("Generation stopped by user.")
-            
-        except Exception as e:
-            if not self.stop_event.is_set(): # Only show error if not stopped by user
-                messagebox.showerror("Error", f"An error occurred: {str(e)}")
-                self.status_var.set("Error occurred")
-            else:
-                self.status_var.set("Generation stopped by user.")
-        finally:
-            self.submit_button.config(state=tk.NORMAL)
-            self.stop_button.config(state=tk.DISABLED) # Disable stop button after completion or stop
-            self.root.update()
-
-    def _add_to_chat_history(self, prompt: str, response: str):
-        """Adds the prompt and response to the chat history."""
+    def _on_code_streamed(self, job, parser):
+        """Parser callback on the engine's loop: queues a refresh of the Generated Code tab."""
+        if job is not self.shown_job:
+            return # Another job's code is on screen
+        self.live_code_blocks = parser.python_codes()
+        self.live_code_default = parser.default_index()
+        self.live_code_runnable = parser.has_runnable_code()
+        if not self._live_code_scheduled: # Coalesce bursts of lines into one widget update
+            self._live_code_scheduled = True
+            self.engine.call_ui(self._show_live_code)
+
+    def _show_live_code(self):
+        """Shows the code streamed so far and enables Run once a complete block is available."""
+        self._live_code_scheduled = False
+        if not self.live_code_active:
+            return
+        blocks = self.live_code_blocks
+        index = self.code_block_index if self.code_block_picked and self.code_block_index < len(blocks) else self.live_code_default
+        self.set_code_blocks(blocks, index)
+        self.generated_code_text.config(state=tk.NORMAL)
+        self.generated_code_text.delete("1.0", tk.END)
+        self.generated_code_text.insert(tk.END, blocks[index] if blocks else "")
+        self.generated_code_text.config(state=tk.DISABLED)
+        self.generated_code_text.see(tk.END)
+        if self.live_code_runnable and str(self.run_code_button.cget("state")) == tk.DISABLED:
+            self.run_code_button.config(state=tk.NORMAL)
+            self.status_var.set("Querying model... A code block is complete and can be run now.")
+
+    def set_code_blocks(self, blocks: list, index: int = 0):
+        """Fills the block selector; it is only active when the answer has several Python blocks."""
+        self.code_blocks = blocks
+        self.code_block_index = index
+        self.code_block_combobox.config(values=[f"{number} of {len(blocks)}" for number in range(1, len(blocks) + 1)],
+                                        state="readonly" if len(blocks) > 1 else tk.DISABLED)
+        self.code_block_var.set(f"{index + 1} of {len(blocks)}" if blocks else "")
+
+    def show_code_block(self, index: int):
+        """Block selector action: shows another block of the answer; Run Code runs the block shown."""
+        if not 0 <= index < len(self.code_blocks):
+            return
+        self.code_block_index = index
+        if self.live_code_active: # Still streaming: keep this block on screen as more code arrives
+            self.code_block_picked = True
+        self.generated_code_text.config(state=tk.NORMAL)
+        self.generated_code_text.delete("1.0", tk.END)
+        self.generated_code_text.insert(tk.END, self.code_blocks[index])
+        self.generated_code_text.config(state=tk.DISABLED)
+        if not self.live_code_active:
+            self.precheck_generated_code(self.code_blocks[index])
+        self.status_var.set(f"Showing code block {index + 1} of {len(self.code_blocks)}.")
+
+    def _format_query_stats(self) -> str:
+        """Describes the prompt size and evaluation time of the last query."""
+        stats = self.last_query_stats
+        if stats.get("cache_hit"):
+            return f"served from {self.response_cache.stats_text()}"
+        prompt_tokens = stats.get("prompt_eval_count") or stats.get("prompt_tokens_estimate", 0)
+        text = f"prompt {prompt_tokens} tokens, prompt eval {stats.get('prompt_eval_duration', 0):.2f}s"
+        if stats.get("turns_summarized"):
+            text += f", {stats['turns_summarized']} old turns summarized"
+        elif stats.get("turns_dropped"):
+            text += f", {stats['turns_dropped']} old turns dropped"
+        if stats.get("retrieval_error"):
+            text += ", snippet retrieval failed"
+        elif "snippets_retrieved" in stats:
+            text += f", {stats['snippets_retrieved']} snippets retrieved"
+        if stats.get("code_blocks_deduplicated"):
+            text += f", {stats['code_blocks_deduplicated']} duplicate code blocks skipped"
+        return f"{text}, {self.response_cache.stats_text()}"
+
+    def record_query_metrics(self, source: str, model: str, stats: dict, renderer=None):
+        """Adds a finished query's server and client timings to the Metrics tab."""
+        self.metrics_view.add(make_record(source, model, stats, renderer))
+
+    def _flush_pending_metrics(self, renderer=None):
+        if self._pending_metrics is not None:
+            model, stats = self._pending_metrics
+            self._pending_metrics = None
+            self.record_query_metrics("query", model, stats, renderer)
+
+    def _on_stream_rendered(self):
+        """Records the shown query's metrics and appends the streaming throughput and render-lag counters to the status bar."""
+        self._flush_pending_metrics(self.stream_renderer)
+        if self.stream_renderer.chunks_received:
+            self.status_var.set(f"{self.status_var.get()} ({self.stream_renderer.summary()})")
+
+    def _add_to_chat_history(self, prompt: str, response: str, model: str = "", code: str = "", options: dict = None, stats: dict = None):
+        """Adds the prompt and response to the chat history (on the Tk thread) and stores them in the session store on a worker thread."""
         self.chat_history.append({"prompt": prompt, "response": response})
-        self.chat_history_text.config(state=tk.NORMAL)
-        self.chat_history_text.insert(tk.END, f"User: {prompt}\n")
-        self.chat_history_text.insert(tk.END, f"Model: {response}\n\n")
-        self.chat_history_text.see(tk.END)
-        self.chat_history_text.config(state=tk.DISABLED)
+        self.engine.submit_blocking(self._save_chat_turn, self.session, prompt, response, model, code, options, stats)
+
+    def _save_chat_turn(self, session: dict, prompt: str, response: str, model: str, code: str, options: dict, stats: dict):
+        """Worker thread: writes a turn to the session store, creating the session with its first turn."""
+        try:
+            with self.session_lock:
+                if session["id"] is None:
+                    session["id"] = self.session_store.new_session()
+                self.session_store.add_turn(session["id"], prompt, response, model, code, options, stats)
+        except sqlite3.Error as e:
+            log.warning(f"Could not save the chat turn: {e}") # The answer itself is still shown
+            return
+        self.engine.call_ui(self.history_view.turn_added)
+
+    def continue_session(self, session_id: int):
+        """Makes a stored session the current conversation, so new questions build on it."""
+        turns = self.session_store.session_turns(session_id)
+        self.chat_history = [{"prompt": turn["prompt"], "response": turn["response"]} for turn in turns]
+        self.conversation_context.reset()
+        self.session = {"id": session_id}
+        self.status_var.set(f"Continuing a session with {len(turns)} earlier turns.")
 
     def _extract_python_code(self, model_response: str) -> str:
+        """Attempts to extract Python code from the model's response (see utils.core)."""
+        return extract_python_code(model_response)
+    
+    def _get_sandbox_limits(self) -> SandboxLimits:
+        """Sandbox limits from the Generated Code tab; raises ValueError for invalid entries."""
+        return SandboxLimits(
+            wall_time=float(self.sandbox_wall_time_var.get()),
+            cpu_time=int(self.sandbox_cpu_time_var.get()),
+            memory_mb=int(self.sandbox_memory_var.get()),
+            output_kb=int(self.sandbox_output_var.get())
+        )
+
+    def auto_fix_threaded(self):
+        """Starts the generate -> run -> repair loop on the async engine."""
+        inputs = self.get_input_values()
+        if inputs is None:
+            return
+        try:
+            max_attempts = int(self.auto_fix_attempts_var.get())
+            candidates = int(self.auto_fix_candidates_var.get())
+            limits = self._get_sandbox_limits() # Unattended runs always get limits, so a hung program can't stall the loop
+        except ValueError as e:
+            messagebox.showerror("Input Error", f"Invalid auto-fix setting: {str(e)}")
+            return
+
+        self.submit_button.config(state=tk.DISABLED)
+        self.auto_fix_button.config(state=tk.DISABLED)
+        self.stop_button.config(state=tk.NORMAL)
+        self.run_code_button.config(state=tk.DISABLED)
+        self.edit_code_button.config(state=tk.DISABLED)
+        self.status_var.set(f"Auto-fix: up to {max_attempts} attempts with {candidates} candidate(s) each...")
+        self.results_text.delete("1.0", tk.END)
+        self._flush_pending_metrics()
+        self.stream_renderer.start()
+        self.auto_fix_operation = self.engine.submit(
+            self._auto_fix_task(inputs, max_attempts, candidates, limits),
+            lambda result, error: self._on_auto_fix_finished(inputs, result, error)
+        )
+
+    async def _auto_fix_task(self, inputs, max_attempts: int, candidates: int, limits):
+        """Engine task running the auto-fix loop; progress is logged to the Results tab."""
+        self.stream_renderer.push(f"\n=== Auto-fix with {inputs['model']} ===\n", count_as_token=False)
+        result = await auto_fix(
+            get_async_client(self, inputs["model"]), # Stays on one server for the whole session
+            model=inputs["model"],
+            system_message=inputs["system_message"],
+            context=inputs["context"],
+            question=inputs["question"],
+            options={"temperature": inputs["temperature"], "num_ctx": inputs["max_tokens"]},
+            max_attempts=max_attempts,
+            candidates=candidates,
+            limits=limits,
+            module_index=self.module_index if self.precheck_var.get() else None,
+            on_event=self._on_auto_fix_event,
+            keep_alive=inputs["keep_alive"]
+        )
+        self.stream_renderer.push(f"\nAuto-fix: {result.summary()}\n", count_as_token=False)
+        return result
+
+    def _on_auto_fix_finished(self, inputs, result, error):
+        """Engine callback on the Tk thread: shows the outcome and resets the controls."""
+        self.auto_fix_operation = None
+        if error is not None and not isinstance(error, asyncio.CancelledError):
+            self.stream_renderer.push(f"\n--- Error ---\n{str(error)}\n", count_as_token=False)
+            self.status_var.set("Error occurred")
+        self.stream_renderer.finish()
+        self.submit_button.config(state=tk.NORMAL)
+        self.auto_fix_button.config(state=tk.NORMAL)
+        self.stop_button.config(state=tk.DISABLED)
+        if result is not None:
+            self._show_auto_fix_result(inputs, result)
+
+    def _on_auto_fix_event(self, attempt):
+        """Logs an auto-fix attempt's progress; called on the engine's loop."""
+        line = f"[{attempt.label()}] {attempt.status}"
+        if attempt.status == "running":
+            line += f" (generated in {attempt.generation_time:.1f}s)"
+        elif attempt.status in ("passed", "failed"):
+            line += f" - {attempt.exit_reason}, ran {attempt.run_time:.2f}s"
+        if attempt.status in ("failed", "precheck", "error") and attempt.error.strip():
+            line += f"\n    {attempt.error.strip().splitlines()[-1]}"
+        self.stream_renderer.push(line + "\n", count_as_token=False)
+
+    def _show_auto_fix_result(self, inputs, result):
+        """Shows the winning (or last) candidate's code and output."""
+        shown = result.winner or next((attempt for attempt in reversed(result.attempts) if attempt.code), None)
+        if shown is not None:
+            self._add_to_chat_history(
+                inputs["question"],
+                shown.response,
+                model=inputs["model"],
+                code=shown.code,
+                options={"temperature": inputs["temperature"], "num_ctx": inputs["max_tokens"]},
+                stats={"total_time": result.wall_time, "auto_fix": result.summary()}
+            )
+            self.generated_code_text.config(state=tk.NORMAL)
+            self.generated_code_text.delete("1.0", tk.END)
+            self.generated_code_text.insert(tk.END, shown.code)
+            self.generated_code_text.config(state=tk.DISABLED)
+            self.set_code_blocks([shown.code])
+            self.run_code_button.config(state=tk.NORMAL)
+            self.edit_code_button.config(state=tk.NORMAL)
+            self.run_view.add_output("Auto-fix", shown.stdout, shown.error, f"Exit: {shown.exit_reason or shown.status}")
+        if result.stopped:
+            self.status_var.set(f"Auto-fix stopped by user: {result.summary()}")
+        else:
+            self.status_var.set(f"Auto-fix: {result.summary()}")
+
+    def precheck_generated_code(self, code: str, on_passed=None):
         """
-        Attempts to extract and format Python code from the model's response.
-        Looks for markdown code blocks.
+        Compiles the code and checks its imports on the engine's thread pool (the module
+        index may still be loading), then highlights the offending lines and, if enabled,
+        asks the model for a fixed version. on_passed() is called when nothing was found.
         """
-        code_start_marker = "```python"
-        code_end_marker = "```"
-        
-        start_index = model_response.find(code_start_marker)
-        if start_index != -1:
-            start_index += len(code_start_marker)
-            end_index = model_response.find(code_end_marker, start_index)
-            if end_index != -1:
-                return model_response[start_index:end_index].strip()
-            else:
-                # If no end marker, assume rest is code
-                return model_response[start_index:].strip()
-        return "" # Return empty string if no code block found
-    
+        self.generated_code_text.tag_remove("precheck_error", "1.0", tk.END)
+        if not self.precheck_var.get():
+            if on_passed is not None:
+                on_passed()
+            return
+        self.engine.submit_blocking(
+            precheck_code, code, self.module_index,
+            on_done=lambda problems, error: self._on_precheck_done(code, problems, error, on_passed)
+        )
+
+    def _on_precheck_done(self, code: str, problems: list, error, on_passed):
+        """Engine callback on the Tk thread: shows the pre-check result unless other code is on screen by now."""
+        if code != self.generated_code_text.get("1.0", "end-1c"):
+            return # Another block or answer was shown meanwhile; its own pre-check reports on it
+        if error is not None:
+            log.warning(f"Pre-check failed to run: {error}") # Best effort: don't block the run
+            problems = []
+        for problem in problems:
+            self.generated_code_text.tag_add("precheck_error", f"{problem.line}.0", f"{problem.line}.end")
+        if not problems:
+            if on_passed is not None:
+                on_passed()
+            return
+        self.generated_code_text.see(f"{problems[0].line}.0")
+        summary = "; ".join(str(problem) for problem in problems[:3])
+        if self.auto_repair_var.get() and self.repair_rounds_left > 0 and self.auto_fix_operation is None:
+            self.repair_rounds_left -= 1
+            inputs = self.get_input_values()
+            if inputs is not None:
+                inputs["question"] = build_repair_prompt(code, problems)
+                self._start_query(inputs, "High") # The fix goes ahead of other queued prompts
+                self.status_var.set(f"Pre-check failed ({summary}). Asking the model for a fix...")
+                return
+        self.status_var.set(f"Pre-check failed: {summary}. Fix the code or untick Pre-check to run it anyway.")
+
     def run_generated_code(self):
         """Executes the Python code displayed in the generated_code_text widget."""
-        code_to_run = self.generated_code_text.get("1.0", tk.END).strip()
-        if not code_to_run:
+        code_to_run = self.generated_code_text.get("1.0", "end-1c") # Exactly the text shown, so pre-check lines match the widget
+        if not code_to_run.strip():
             messagebox.showinfo("Run Code", "No Python code to run.")
             return
 
-        self.code_output_text.config(state=tk.NORMAL)
-        self.code_output_text.delete("1.0", tk.END)
-        self.code_output_text.insert(tk.END, "Executing code...\n")
-        self.code_output_text.config(state=tk.DISABLED)
-        self.root.update_idletasks()
+        try:
+            limits = self._get_sandbox_limits() if self.sandbox_var.get() else None
+        except ValueError as e:
+            messagebox.showerror("Input Error", f"Invalid sandbox limit: {str(e)}")
+            return
+        try:
+            self.run_manager.set_limit(int(self.max_runs_var.get()))
+        except ValueError:
+            messagebox.showerror("Input Error", "Parallel runs must be a whole number.")
+            return
+
+        worker_pool = None
+        if self.use_worker_pool_var.get():
+            self.worker_pool.set_preload_modules(self.preload_modules_var.get().replace(",", " ").split())
+            worker_pool = self.worker_pool
 
-        self.stop_code_event.clear() # Clear the stop event for a new execution
-        # Clear any pending input in the queue
-        while not self.code_input_queue.empty():
-            try:
-                self.code_input_queue.get_nowait()
-            except queue.Empty:
-                pass
+        # Nothing is launched for code that can't run; a run gets a tab at once and waits if all slots are busy
+        self.precheck_generated_code(code_to_run, on_passed=lambda: self.run_manager.submit(code_to_run, limits=limits, worker_pool=worker_pool))
 
-        self.run_code_button.config(state=tk.DISABLED)
-        self.stop_code_button.config(state=tk.NORMAL) # Enable stop code button
-        self.code_input_entry.config(state=tk.NORMAL) # Enable code input
-        self.send_code_input_button.config(state=tk.NORMAL) # Enable send input button
+    def _on_tab_changed(self, notebook):
+        """Reloads the Logs tab whenever it is opened."""
+        if notebook.select() == str(self.logs_frame):
+            self.log_view.refresh()
+
+    def replay_logged_request(self, payload: dict, renderer, on_done):
+        """Logs tab action: sends a logged request payload again on the async engine."""
+        self.engine.submit(
+            replay_request(self, payload, renderer),
+            lambda answer, error: on_done(answer, None if error is None else str(error))
+        )
+
+    def run_generated_tests(self):
+        """Runs the tests written by the model in parallel processes and reports the results in a new output tab."""
+        code = self.generated_code_text.get("1.0", tk.END).strip()
+        if not code:
+            messagebox.showinfo("Run Tests", "No Python code to test.")
+            return
+        try:
+            timeout = float(self.test_timeout_var.get())
+            workers = int(self.max_runs_var.get())
+            limits = self._get_sandbox_limits() if self.sandbox_var.get() else None
+        except ValueError as e:
+            messagebox.showerror("Input Error", f"Invalid test setting: {str(e)}")
+            return
 
-        # Run code in a separate thread to prevent GUI freeze
-        threading.Thread(target=execute_code_task, args=(self, code_to_run,)).start()
+        tab = self.run_view.add_tab("Tests")
+        tab.status_var.set(f"Running tests, {workers} at a time...")
+        tab.operation = self.engine.submit(
+            run_tests(code, timeout, workers, limits, on_result=lambda result: tab.renderer.push(result.line() + "\n"), cache=self.test_cache),
+            lambda report, error: self._on_tests_finished(tab, report, error)
+        )
+        self.status_var.set("Running tests...")
+        self._update_run_controls()
+
+    def _on_tests_finished(self, tab, report, error):
+        """Engine callback on the Tk thread: writes the report to the test session's tab."""
+        if tab not in self.run_view.tabs:
+            return # The tab was closed
+        if isinstance(error, asyncio.CancelledError):
+            tab.status_var.set("Stopped.")
+            self.status_var.set("Tests stopped by user.")
+        elif error is not None:
+            tab.renderer.push(f"{error}\n", "stderr")
+            tab.status_var.set("Could not run the tests.")
+            self.status_var.set(f"Could not run the tests: {error}")
+        else:
+            tab.renderer.push("\n" + report.format())
+            tab.status_var.set(report.summary())
+            self.status_var.set(f"Tests: {report.summary()}")
+        tab.renderer.finish()
+        self._update_run_controls()
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = OllamaMultiModelGUI(root)
+    if "--startup-time" in sys.argv: # Print the startup timings as JSON and exit (used by the benchmarks)
+        root.after_idle(lambda: (print(json.dumps(app.startup_timings)), app.on_close()))
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""
+Local stand-in for the Ollama HTTP API, used by the benchmarks.
+
+Serves /api/tags, /api/ps, streaming and non-streaming /api/chat and /api/generate with a
+canned answer containing a Python code block, paced at a configurable token rate.
+Can also be run on its own and pointed at from the app:
+
+    python benchmarks/mock_ollama_server.py --port 11435 --tokens-per-second 80
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_MODELS = ["mock-coder:small", "mock-coder:large"]
+
+def make_answer(response_tokens: int, token_chars: int = 4) -> list:
+    """Builds a canned answer as a list of tokens: some prose, then a runnable code block."""
+    code = [
+        "```python\n",
+        "def fib(n):\n",
+        "    a, b = 0, 1\n",
+        "    for _ in range(n):\n",
+        "        a, b = b, a + b\n",
+        "    return a\n",
+        "\n",
+        "print(fib(30))\n",
+        "```\n"
+    ]
+    code_tokens = [line[i:i + token_chars] for line in code for i in range(0, len(line), token_chars)]
+    filler = ("word " * token_chars)[:token_chars]
+    prose_count = max(0, response_tokens - len(code_tokens) - 1)
+    prose = [filler] * prose_count
+    # Break the prose into lines so the text widget sees a realistic line count
+    for i in range(15, len(prose), 16):
+        prose[i] = filler.rstrip() + "\n"
+    return prose + ["\n"] + code_tokens
+
+class MockOllamaServer:
+    """Threaded HTTP server emulating the parts of the Ollama API the app uses."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        tokens_per_second: float = 200,
+        response_tokens: int = 500,
+        token_chars: int = 4,
+        load_delay: float = 0.05,
+        models: list = None
+    ):
+        self.tokens_per_second = tokens_per_second # 0 streams as fast as possible
+        self.load_delay = load_delay # Simulated prompt evaluation before the first token
+        self.models = models or DEFAULT_MODELS
+        self.tokens = make_answer(response_tokens, token_chars)
+        self.requests_served = 0
+        self.loaded = set() # Models "in memory" since a chat or generate request used them
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Starts serving on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, like the real server
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    models = [{"name": name, "model": name, "digest": f"mock{index:060d}"} for index, name in enumerate(server.models)]
+                    self._send_json({"models": models})
+                elif self.path == "/api/ps":
+                    self._send_json({"models": [{"name": name, "model": name} for name in sorted(server.loaded)]})
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send_json({"error": "invalid JSON"}, status=400)
+                    return
+                server.requests_served += 1
+                if self.path == "/api/chat":
+                    self._chat(request)
+                elif self.path == "/api/generate":
+                    server.loaded.add(request.get("model"))
+                    self._send_json({"model": request.get("model"), "response": "", "done": True})
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def _chat(self, request: dict):
+                model = request.get("model", "")
+                if model not in server.models:
+                    self._send_json({"error": f"model '{model}' not found"}, status=404)
+                    return
+                server.loaded.add(model)
+                start = time.perf_counter()
+                time.sleep(server.load_delay)
+                prompt_eval_duration = time.perf_counter() - start
+                prompt_tokens = sum(len(m.get("content", "")) for m in request.get("messages", [])) // 4
+
+                if not request.get("stream", True):
+                    content = "".join(server.tokens)
+                    self._send_json(self._final_chunk(model, content, prompt_tokens, prompt_eval_duration, 0))
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                interval = 1.0 / server.tokens_per_second if server.tokens_per_second else 0
+                eval_start = time.perf_counter()
+                try:
+                    for index, token in enumerate(server.tokens):
+                        if interval:
+                            # Pace against the start time so sleep overshoot doesn't accumulate
+                            delay = eval_start + index * interval - time.perf_counter()
+                            if delay > 0:
+                                time.sleep(delay)
+                        chunk = {"model": model, "message": {"role": "assistant", "content": token}, "done": False}
+                        self._write_chunk(json.dumps(chunk) + "\n")
+                    final = self._final_chunk(model, "", prompt_tokens, prompt_eval_duration, time.perf_counter() - eval_start)
+                    self._write_chunk(json.dumps(final) + "\n")
+                    self._write_chunk("")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass # Client stopped the stream
+
+            def _final_chunk(self, model, content, prompt_tokens, prompt_eval_duration, eval_duration) -> dict:
+                return {
+                    "model": model,
+                    "message": {"role": "assistant", "content": content},
+                    "done": True,
+                    "prompt_eval_count": prompt_tokens,
+                    "prompt_eval_duration": int(prompt_eval_duration * 1e9),
+                    "eval_count": len(server.tokens),
+                    "eval_duration": int(eval_duration * 1e9),
+                    "load_duration": 0,
+                    "total_duration": int((prompt_eval_duration + eval_duration) * 1e9)
+                }
+
+            def _write_chunk(self, text: str):
+                data = text.encode("utf-8")
+                self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send_json(self, payload: dict, status: int = 200):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run a mock Ollama server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--tokens-per-second", type=float, default=80, help="0 streams as fast as possible")
+    parser.add_argument("--response-tokens", type=int, default=500)
+    parser.add_argument("--token-chars", type=int, default=4)
+    parser.add_argument("--load-delay", type=float, default=0.2, help="Seconds before the first token")
+    args = parser.parse_args(argv)
+    server = MockOllamaServer(args.host, args.port, args.tokens_per_second, args.response_tokens, args.token_chars, args.load_delay)
+    print(f"Mock Ollama server on {server.url} (models: {', '.join(server.models)})", file=sys.stderr)
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
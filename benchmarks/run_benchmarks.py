@@ -0,0 +1,340 @@
+"""
+End-to-end latency benchmarks against the mock Ollama server.
+
+Measures time to first token, rendered tokens per second and Tk event-loop lag
+while streaming into a results text widget, code-extraction time, the startup
+and teardown time of code runs (the run_code pipeline behind execute_code_task),
+concurrent queries load balanced over several servers, one of them down, and the
+app's startup time (import time, plus time until the window is ready when a
+display is available).
+Each run writes a JSON report; pass --compare with an earlier report to see the
+change per metric.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/bench-20260101-120000.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Repository root
+
+from mock_ollama_server import MockOllamaServer
+from utils.core import build_messages, stream_chat, stream_chat_async, extract_python_code, run_code, DEFAULT_SYSTEM_MESSAGE
+from utils.endpoints import EndpointPool
+from utils.ollama_api import OllamaClient
+from utils.sandbox import SandboxLimits
+from utils.worker_pool import WarmWorkerPool
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+HEARTBEAT_MS = 10 # Expected interval of the event-loop lag probe
+LOWER_IS_BETTER = ("time", "lag", "startup", "teardown", "_us", "_ms") # Metric name hints for --compare
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def describe(values: list, unit_scale: float = 1.0) -> dict:
+    """Median, p95 and max of a list of samples, scaled (e.g. seconds to ms)."""
+    return {
+        "median": statistics.median(values) * unit_scale if values else 0.0,
+        "p95": percentile(values, 0.95) * unit_scale,
+        "max": max(values) * unit_scale if values else 0.0
+    }
+
+def make_payload(model: str) -> dict:
+    return {
+        "model": model,
+        "messages": build_messages(DEFAULT_SYSTEM_MESSAGE, "", "Write a function that returns the n-th Fibonacci number."),
+        "options": {"temperature": 0, "num_ctx": 4096},
+        "stream": True
+    }
+
+def bench_stream(server: MockOllamaServer, repeat: int) -> dict:
+    """Time to first token and client-side token rate of the streaming query path."""
+    client = OllamaClient(server.url)
+    model = server.models[0]
+    client.list_models() # Open the pooled connection so the first sample isn't a cold connect
+    ttft, totals, rates = [], [], []
+    for _ in range(repeat):
+        chunk_times = []
+        result = stream_chat(client, make_payload(model), on_chunk=lambda text: chunk_times.append(time.perf_counter()))
+        ttft.append(result["time_to_first_token"])
+        totals.append(result["total_time"])
+        if len(chunk_times) > 1:
+            rates.append((len(chunk_times) - 1) / (chunk_times[-1] - chunk_times[0]))
+    client.close()
+    return {
+        "ttft_ms": describe(ttft, 1000),
+        "total_time_ms": describe(totals, 1000),
+        "client_tokens_per_second": statistics.median(rates) if rates else 0.0
+    }
+
+def bench_render(server: MockOllamaServer, repeat: int) -> dict:
+    """
+    Streams answers into a ScrolledText through StreamRenderer, as the Results tab
+    does, while a heartbeat measures how late the Tk event loop runs its callbacks.
+    """
+    import tkinter as tk
+    from tkinter import scrolledtext
+    from utils.stream_renderer import StreamRenderer
+
+    root = tk.Tk()
+    root.withdraw()
+    results_text = scrolledtext.ScrolledText(root, width=80, height=30, wrap=tk.WORD)
+    results_text.pack()
+    renderer = StreamRenderer(root, results_text)
+    client = OllamaClient(server.url)
+    model = server.models[0]
+
+    rendered_rates, render_lag, loop_lag = [], [], []
+    for _ in range(repeat):
+        results_text.delete("1.0", tk.END)
+        done = threading.Event()
+        renderer.on_finished = done.set
+        renderer.start()
+        last_beat = [time.perf_counter()]
+
+        def heartbeat():
+            now = time.perf_counter()
+            loop_lag.append(max(0.0, now - last_beat[0] - HEARTBEAT_MS / 1000))
+            last_beat[0] = now
+            if not done.is_set():
+                root.after(HEARTBEAT_MS, heartbeat)
+
+        def worker():
+            try:
+                stream_chat(client, make_payload(model), on_chunk=renderer.push)
+            finally:
+                renderer.finish()
+
+        root.after(HEARTBEAT_MS, heartbeat)
+        threading.Thread(target=worker, daemon=True).start()
+        while not done.is_set():
+            root.update()
+            time.sleep(0.001)
+        finished_at = time.perf_counter()
+        if renderer.first_chunk_time is not None and finished_at > renderer.first_chunk_time:
+            rendered_rates.append(renderer.chunks_rendered / (finished_at - renderer.first_chunk_time))
+        render_lag.append(renderer.average_render_lag())
+
+    client.close()
+    root.destroy()
+    return {
+        "rendered_tokens_per_second": statistics.median(rendered_rates) if rendered_rates else 0.0,
+        "render_lag_avg_ms": statistics.mean(render_lag) * 1000 if render_lag else 0.0,
+        "event_loop_lag_ms": describe(loop_lag, 1000)
+    }
+
+def bench_extract(server: MockOllamaServer, iterations: int = 2000) -> dict:
+    """Time to extract the code block from a typical answer and from one 100 times longer."""
+    answer = "".join(server.tokens)
+    results = {}
+    for name, text in (("extract_typical_us", answer), ("extract_large_us", answer * 100)):
+        count = iterations if name == "extract_typical_us" else max(1, iterations // 100)
+        start = time.perf_counter()
+        for _ in range(count):
+            extract_python_code(text)
+        results[name] = (time.perf_counter() - start) / count * 1e6
+    return results
+
+def bench_execute(repeat: int) -> dict:
+    """
+    Startup (start → first output) and teardown (first output → report returned) of a
+    trivial script, on a new interpreter, a warm worker and in the sandbox.
+    """
+    code = "print('ready')\n"
+    pool = WarmWorkerPool(size=1, preload_modules=[])
+    variants = {
+        "cold": {},
+        "warm": {"worker_pool": pool},
+        "sandbox": {"limits": SandboxLimits()}
+    }
+    results = {}
+    try:
+        for name, kwargs in variants.items():
+            startup, teardown = [], []
+            for _ in range(repeat):
+                if name == "warm":
+                    pool.fill()
+                    time.sleep(0.3) # Let the worker finish starting before the clock runs
+                first_output = []
+                start = time.perf_counter()
+                report = run_code(code, on_output=lambda text, tag: first_output or first_output.append(time.perf_counter()), **kwargs)
+                end = time.perf_counter()
+                if report.returncode != 0 or not first_output:
+                    raise RuntimeError(f"{name} run failed: {report.exit_reason}")
+                startup.append(first_output[0] - start)
+                teardown.append(end - first_output[0])
+            results[name] = {"startup_ms": describe(startup, 1000), "teardown_ms": describe(teardown, 1000)}
+    finally:
+        pool.shutdown()
+    return results
+
+def bench_balance(tokens_per_second: float, response_tokens: int, servers: int = 3, queries: int = 12) -> dict:
+    """
+    Sends concurrent queries through an endpoint pool of `servers` mock servers plus
+    one that is down: total time, per-query time and how the queries were spread.
+    """
+    mocks = [MockOllamaServer(tokens_per_second=tokens_per_second, response_tokens=response_tokens).start() for _ in range(servers)]
+    with socket.socket() as probe: # A free port that nothing listens on
+        probe.bind(("127.0.0.1", 0))
+        down_url = f"http://127.0.0.1:{probe.getsockname()[1]}"
+    model = mocks[0].models[0]
+
+    async def run():
+        pool = EndpointPool([down_url] + [mock.url for mock in mocks]) # Not checked yet, so the first queries fail over
+        times = []
+
+        async def query():
+            start = time.perf_counter()
+            await pool.call(model, lambda endpoint: stream_chat_async(endpoint.client, make_payload(model)))
+            times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(query() for _ in range(queries)))
+        return time.perf_counter() - start, times, pool
+
+    try:
+        total, times, pool = asyncio.run(run())
+    finally:
+        for mock in mocks:
+            mock.stop()
+    served = [endpoint.requests - endpoint.failures for endpoint in pool.endpoints[1:]]
+    return {
+        "total_time_ms": total * 1000,
+        "query_time_ms": describe(times, 1000),
+        "failovers": pool.failovers,
+        "max_share_per_server": max(served) / queries # 1 / servers when perfectly spread
+    }
+
+def bench_startup(repeat: int) -> dict:
+    """
+    Time to import OllamaCoder in a fresh interpreter and, with a display, the timings
+    the app reports for `--startup-time` (imports, building the window, ready).
+    Runs against an empty data directory so saved settings don't change the result.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = "import time; start = time.perf_counter(); import OllamaCoder; print(time.perf_counter() - start)"
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = dict(os.environ, OLLAMA_CODER_HOME=data_dir)
+        imports = [float(subprocess.run([sys.executable, "-c", code], cwd=root, env=env, capture_output=True, text=True, check=True).stdout)
+                   for _ in range(repeat)]
+        results["import_ms"] = describe(imports, 1000)
+        ready = []
+        for _ in range(repeat):
+            completed = subprocess.run([sys.executable, "OllamaCoder.py", "--startup-time"], cwd=root, env=env, capture_output=True, text=True)
+            lines = [line for line in completed.stdout.splitlines() if line.startswith("{")]
+            if completed.returncode != 0 or not lines:
+                print("Skipping the window startup benchmark (no display?)", file=sys.stderr)
+                break
+            ready.append(json.loads(lines[-1])["ready"])
+        if ready:
+            results["ready_ms"] = describe(ready, 1000)
+    return results
+
+def flatten(report: dict, prefix: str = "") -> dict:
+    """Turns the nested results into {"stream.ttft_ms.median": value} for comparison."""
+    flat = {}
+    for key, value in report.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+def print_report(results: dict, baseline: dict = None):
+    """Prints every metric, with the change against the baseline results when given."""
+    current = flatten(results)
+    previous = flatten(baseline) if baseline else {}
+    width = max(len(name) for name in current)
+    for name, value in current.items():
+        line = f"{name:<{width}}  {value:12.2f}"
+        if name in previous:
+            old = previous[name]
+            change = (value - old) / old * 100 if old else 0.0
+            better = (change < 0) if any(hint in name for hint in LOWER_IS_BETTER) else (change > 0)
+            marker = "" if abs(change) < 5 else (" better" if better else " worse")
+            line += f"  {old:12.2f}  {change:+7.1f}%{marker}"
+        print(line)
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(RESULTS_DIR)).stdout.strip()
+    except OSError:
+        return ""
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark streaming, rendering, extraction and execution latency.")
+    parser.add_argument("--tokens-per-second", type=float, default=200, help="Paced token rate of the mock server")
+    parser.add_argument("--response-tokens", type=int, default=500, help="Tokens per mock answer")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per benchmark")
+    parser.add_argument("--skip-ui", action="store_true", help="Skip the Tk rendering benchmark")
+    parser.add_argument("--output", help="Report file (default: benchmarks/results/bench-<time>.json)")
+    parser.add_argument("--compare", help="Earlier report to compare against")
+    args = parser.parse_args(argv)
+
+    settings = {"tokens_per_second": args.tokens_per_second, "response_tokens": args.response_tokens, "repeat": args.repeat}
+    results = {}
+    with MockOllamaServer(tokens_per_second=args.tokens_per_second, response_tokens=args.response_tokens) as paced, \
+            MockOllamaServer(tokens_per_second=0, response_tokens=args.response_tokens) as flood:
+        print("Streaming...", file=sys.stderr)
+        results["stream"] = bench_stream(paced, args.repeat)
+        if not args.skip_ui:
+            print("Rendering...", file=sys.stderr)
+            try:
+                results["render_paced"] = bench_render(paced, args.repeat)
+                results["render_flood"] = bench_render(flood, args.repeat) # Unthrottled: worst case for the UI
+            except Exception as e: # Usually no display available
+                print(f"Skipping the rendering benchmark: {e}", file=sys.stderr)
+        print("Extracting...", file=sys.stderr)
+        results["extract"] = bench_extract(paced)
+    print("Load balancing...", file=sys.stderr)
+    results["balance"] = bench_balance(args.tokens_per_second, args.response_tokens)
+    print("Starting the app...", file=sys.stderr)
+    results["startup"] = bench_startup(args.repeat)
+    print("Executing...", file=sys.stderr)
+    results["execute"] = bench_execute(args.repeat)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": settings
+        },
+        "results": results
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline_report = json.load(f)
+        if baseline_report["meta"].get("settings") != settings:
+            print("Warning: the baseline was run with different settings.", file=sys.stderr)
+        baseline = baseline_report["results"]
+    print_report(results, baseline)
+    print(f"Report written to {output}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import asyncio
+import json
+
+import pytest
+
+from utils.async_client import AsyncOllamaClient, HTTPStatusError, UnreachableError
+
+class FakeServer:
+    """Local HTTP/1.1 server answering each path with a scripted reply; counts connections."""
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = []
+        self.failures = {} # Path -> number of 503 answers still to send
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.url = f"http://127.0.0.1:{self._server.sockets[0].getsockname()[1]}"
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                path = lines[0].split(" ")[1]
+                length = next(int(line.split(":")[1]) for line in lines if line.lower().startswith("content-length"))
+                body = await reader.readexactly(length)
+                self.requests.append((path, json.loads(body) if body else None))
+                if not await self._reply(path, writer):
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _reply(self, path, writer) -> bool:
+        """Writes the reply for path; returns whether the connection stays open."""
+        if self.failures.get(path):
+            self.failures[path] -= 1
+            writer.write(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 4\r\n\r\nbusy")
+        elif path == "/api/tags":
+            body = json.dumps({"models": [{"name": "m"}]}).encode()
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+        elif path == "/api/chat": # NDJSON split across chunks in the middle of a line, with an extension and a trailer
+            writer.write(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n")
+            for piece in (b'{"n": 1}\n{"n"', b': 2}\n', b'{"n": 3}'):
+                writer.write(b"%x;ext=1\r\n%s\r\n" % (len(piece), piece))
+                await writer.drain()
+                await asyncio.sleep(0.01)
+            writer.write(b"0\r\nX-Trailer: yes\r\n\r\n")
+        elif path == "/once": # Answers, then drops the connection the client will try to reuse
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}")
+            await writer.drain()
+            return False
+        elif path == "/truncated":
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\n{\"partial\"")
+            await writer.drain()
+            return False
+        elif path == "/endless": # A stream the client stops reading early
+            writer.write(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n")
+            for _ in range(100):
+                writer.write(b"3\r\nab\n\r\n")
+                await writer.drain()
+                await asyncio.sleep(0.01)
+            writer.write(b"0\r\n\r\n")
+        elif path == "/silent":
+            await asyncio.sleep(10)
+        else:
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 7\r\n\r\nmissing")
+        await writer.drain()
+        return True
+
+def run(coroutine_function):
+    async def main():
+        async with FakeServer() as server:
+            client = AsyncOllamaClient(server.url, retries=1, backoff_factor=0)
+            try:
+                await coroutine_function(server, client)
+            finally:
+                client.close()
+    asyncio.run(main())
+
+def test_chunked_stream_is_split_into_lines():
+    async def check(server, client):
+        response = await client.chat({"model": "m", "messages": [], "keep_alive": "5m"})
+        lines = [json.loads(line) async for line in response.iter_lines()]
+        response.close()
+        assert lines == [{"n": 1}, {"n": 2}, {"n": 3}]
+        assert server.requests[-1] == ("/api/chat", {"model": "m", "messages": [], "keep_alive": "5m"})
+    run(check)
+
+def test_connection_is_reused_after_complete_responses_and_errors():
+    async def check(server, client):
+        await client.list_models()
+        response = await client.chat({"model": "m", "messages": []})
+        assert len(await response.read()) > 0
+        with pytest.raises(HTTPStatusError) as error:
+            await client.get_json("/nowhere")
+        assert error.value.status == 404
+        await client.list_models()
+        assert server.connections == 1
+    run(check)
+
+def test_503_is_retried():
+    async def check(server, client):
+        server.failures["/api/tags"] = 1
+        assert await client.list_models() == [{"name": "m"}]
+        assert [path for path, _ in server.requests] == ["/api/tags", "/api/tags"]
+    run(check)
+
+def test_idle_connection_closed_by_the_server_is_replaced():
+    async def check(server, client):
+        assert await client.get_json("/once") == {}
+        await asyncio.sleep(0.05) # The server has closed it by now
+        assert await client.list_models() == [{"name": "m"}]
+        assert server.connections == 2
+    run(check)
+
+def test_truncated_body_raises_and_the_connection_is_not_reused():
+    async def check(server, client):
+        response = await client.request("GET", "/truncated")
+        with pytest.raises(ConnectionError):
+            await response.read()
+        assert client._idle == []
+        await client.list_models()
+        assert server.connections == 2
+    run(check)
+
+def test_partly_read_stream_is_not_returned_to_the_pool():
+    async def check(server, client):
+        response = await client.request("POST", "/endless", {})
+        async for line in response.iter_lines():
+            assert line == b"ab"
+            break
+        response.close()
+        assert client._idle == []
+        await client.list_models() # Would read the rest of the old stream if the connection had been reused
+        assert server.connections == 2
+    run(check)
+
+def test_slow_server_times_out():
+    async def check(server, client):
+        with pytest.raises(TimeoutError):
+            await client.request("GET", "/silent", timeout=0.1)
+    run(check)
+
+def test_unreachable_server():
+    async def main():
+        async with FakeServer() as server:
+            url = server.url
+        client = AsyncOllamaClient(url, retries=1, backoff_factor=0) # Nothing listens there any more
+        with pytest.raises(UnreachableError):
+            await client.list_models()
+    asyncio.run(main())
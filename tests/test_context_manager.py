@@ -0,0 +1,84 @@
+import threading
+
+from utils.context_manager import ConversationContext, estimate_tokens
+
+def turn(index, size=400):
+    return {"prompt": f"question {index} " + "q" * size, "response": f"answer {index} " + "a" * size}
+
+def test_everything_fits_verbatim():
+    context = ConversationContext()
+    report = {}
+    history = [turn(i, 10) for i in range(3)]
+    messages = context.build_messages("sys", "ctx", "now?", history, 4096, report=report)
+    assert [m["role"] for m in messages] == ["system"] + ["user", "assistant"] * 3 + ["user"]
+    assert messages[-1]["content"] == "Context: ctx\n\nQuestion: now?"
+    assert report["turns_verbatim"] == 3 and report["turns_dropped"] == 0
+    assert report["prompt_tokens_estimate"] <= report["budget_tokens"]
+
+def test_old_turns_are_dropped_without_a_summarizer():
+    context = ConversationContext()
+    report = {}
+    history = [turn(i) for i in range(20)]
+    messages = context.build_messages("sys", "", "now?", history, 1024, report=report)
+    assert report["turns_dropped"] > 0
+    assert report["turns_verbatim"] + report["turns_dropped"] == 20
+    assert messages[-2]["content"] == history[-1]["response"] # Newest turns are the ones kept
+    assert report["prompt_tokens_estimate"] <= report["budget_tokens"] == context.budget_for(1024)
+
+def test_old_turns_are_summarized_and_the_summary_is_extended():
+    context = ConversationContext()
+    calls = []
+
+    def summarize(previous, turns):
+        calls.append((previous, len(turns)))
+        return f"{previous}+{len(turns)}"
+
+    history = [turn(i) for i in range(20)]
+    report = {}
+    messages = context.build_messages("sys", "", "now?", history, 1024, summarize=summarize, report=report)
+    assert report["turns_summarized"] > 0 and report["turns_dropped"] == 0
+    assert messages[1]["role"] == "system" and messages[1]["content"].startswith("Summary of the earlier conversation:")
+    assert report["prompt_tokens_estimate"] <= report["budget_tokens"]
+
+    context.build_messages("sys", "", "again?", history, 1024, summarize=summarize)
+    assert len(calls) == 1 # Same turns: the cached summary is reused
+    context.build_messages("sys", "", "more?", history + [turn(20), turn(21)], 1024, summarize=summarize)
+    assert len(calls) == 2 and calls[1][0] == calls[0][0] + "+" + str(calls[0][1]) # Only the new turns are folded in
+
+def test_long_context_is_truncated_from_the_start():
+    context = ConversationContext()
+    report = {}
+    text = "start " + "x" * 20000 + " end"
+    messages = context.build_messages("sys", text, "now?", [], 1024, report=report)
+    assert report["context_truncated"]
+    assert messages[-1]["content"].endswith("end\n\nQuestion: now?")
+    assert estimate_tokens(messages[-1]["content"]) <= context.budget_for(1024)
+
+def test_code_already_in_history_is_left_out_of_the_context():
+    context = ConversationContext()
+    report = {}
+    history = [{"prompt": "write it", "response": "```python\nprint(1)\n```"}]
+    messages = context.build_messages("sys", "```python\nprint(1)\n```\n\n```python\nprint(2)\n```", "now?", history, 4096, report=report)
+    assert report["code_blocks_deduplicated"] == 1
+    assert "print(1)" not in messages[-1]["content"] and "print(2)" in messages[-1]["content"]
+
+def test_summarizing_does_not_block_other_queries():
+    context = ConversationContext()
+    started, release = threading.Event(), threading.Event()
+
+    def slow_summarize(previous, turns):
+        started.set()
+        release.wait(5)
+        return "summary"
+
+    history = [turn(i) for i in range(20)]
+    worker = threading.Thread(target=context.build_messages, args=("sys", "", "q", history, 1024, slow_summarize))
+    worker.start()
+    assert started.wait(5)
+    done = threading.Event()
+    other = threading.Thread(target=lambda: (context.build_messages("sys", "", "q", [turn(0, 10)], 1024), done.set()))
+    other.start()
+    assert done.wait(2) # Not stuck behind the model call
+    release.set()
+    worker.join(5)
+    other.join(5)
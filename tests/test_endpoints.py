@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from utils.async_client import HTTPStatusError, UnreachableError
+from utils.endpoints import EndpointPool, parse_endpoint_urls
+
+def make_pool(*urls):
+    pool = EndpointPool(list(urls))
+    for endpoint in pool.endpoints:
+        endpoint.healthy = True
+        endpoint.models = {"m"}
+    return pool
+
+def test_parse_endpoint_urls():
+    assert parse_endpoint_urls("http://a:1/, http://b:2 http://a:1") == ["http://a:1", "http://b:2"]
+
+def test_pick_prefers_loaded_model_then_fewest_in_flight():
+    pool = make_pool("http://a", "http://b", "http://c")
+    pool.limit_per_endpoint = 8
+    a, b, c = pool.endpoints
+    a.in_flight = 2
+    assert pool.pick("m") is b
+    c.loaded.add("m")
+    c.in_flight = 5
+    assert pool.pick("m") is c
+    c.in_flight = 8 # No free slot left
+    assert pool.pick("m") is b
+
+def test_pick_skips_down_servers_and_servers_without_the_model():
+    pool = make_pool("http://a", "http://b", "http://c")
+    a, b, c = pool.endpoints
+    a.healthy = False
+    b.models = {"other"}
+    assert pool.pick("m") is c
+    assert pool.pick("m", exclude={"http://c"}) is b # Falls back to any server that is up
+    assert pool.pick("m", exclude={"http://a", "http://b", "http://c"}) is None
+
+def test_call_fails_over_to_the_next_server():
+    pool = make_pool("http://a", "http://b")
+    seen = []
+
+    async def request(endpoint):
+        seen.append(endpoint.url)
+        if endpoint.url == "http://a":
+            raise UnreachableError("connection refused")
+        return "answer"
+
+    assert asyncio.run(pool.call("m", request)) == "answer"
+    assert seen == ["http://a", "http://b"]
+    assert pool.endpoints[0].healthy is False
+    assert pool.failovers == 1
+    assert "m" in pool.endpoints[1].loaded
+    assert all(endpoint.in_flight == 0 for endpoint in pool.endpoints)
+
+def test_call_fails_over_on_503_but_not_on_404():
+    pool = make_pool("http://a", "http://b")
+
+    async def busy(endpoint):
+        if endpoint.url == "http://a":
+            raise HTTPStatusError(503, "Service Unavailable", "")
+        return endpoint.url
+
+    assert asyncio.run(pool.call("m", busy)) == "http://b"
+
+    pool = make_pool("http://a", "http://b")
+
+    async def missing(endpoint):
+        raise HTTPStatusError(404, "Not Found", "model not found")
+
+    with pytest.raises(HTTPStatusError):
+        asyncio.run(pool.call("m", missing))
+    assert pool.failovers == 0
+
+def test_call_raises_when_every_server_is_down():
+    pool = make_pool("http://a", "http://b")
+
+    async def request(endpoint):
+        raise UnreachableError("connection refused")
+
+    with pytest.raises(UnreachableError):
+        asyncio.run(pool.call("m", request))
+    assert pool.failovers == 2
+
+def test_model_digests_keep_down_servers_and_prefer_healthy_ones():
+    pool = make_pool("http://a", "http://b")
+    a, b = pool.endpoints
+    a.digests = {"m": "old", "only-a": "x"}
+    b.digests = {"m": "new"}
+    a.mark_down("connection refused")
+    assert pool.model_digests() == {"m": "new", "only-a": "x"}
+
+def test_call_keeps_each_server_within_its_slots():
+    pool = make_pool("http://a", "http://b")
+    pool.endpoints[0].loaded.add("m") # Preferred while it has a free slot
+    peak = {"http://a": 0, "http://b": 0}
+
+    async def request(endpoint):
+        peak[endpoint.url] = max(peak[endpoint.url], endpoint.in_flight)
+        await asyncio.sleep(0.01)
+        return endpoint.url
+
+    async def main():
+        return await asyncio.gather(*(pool.call("m", request) for _ in range(6)))
+
+    assert sorted(set(asyncio.run(main()))) == ["http://a", "http://b"]
+    assert peak == {"http://a": 1, "http://b": 1}
+
+def test_call_waits_for_a_slot_until_the_limit_is_raised():
+    pool = make_pool("http://a")
+
+    async def main():
+        release = asyncio.Event()
+
+        async def slow(endpoint):
+            await release.wait()
+
+        async def quick(endpoint):
+            return endpoint.in_flight
+
+        first = asyncio.ensure_future(pool.call("m", slow))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(pool.call("m", quick))
+        await asyncio.sleep(0.01)
+        assert not second.done() # The only slot is taken
+        pool.set_limit(2)
+        assert await second == 2
+        release.set()
+        await first
+
+    asyncio.run(main())
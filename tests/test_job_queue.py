@@ -0,0 +1,57 @@
+from utils.job_queue import JobScheduler
+
+class FakeOperation:
+    def cancel(self):
+        pass
+
+class FakeEngine:
+    """Collects submitted coroutines instead of running them, so tests finish jobs by hand."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, coroutine, on_done):
+        coroutine.close()
+        self.submitted.append(on_done)
+        return FakeOperation()
+
+async def noop():
+    pass
+
+def make_scheduler(**kwargs):
+    engine = FakeEngine()
+    return engine, JobScheduler(engine, lambda job: noop(), **kwargs)
+
+def inputs(model="m", url="http://a"):
+    return {"model": model, "ollama_url": url, "question": "q"}
+
+def test_runs_limit_jobs_per_server_and_starts_the_next_when_one_ends():
+    engine, scheduler = make_scheduler(limit_per_server=2)
+    jobs = [scheduler.submit(inputs()) for _ in range(3)]
+    assert [job.status for job in jobs] == ["running", "running", "queued"]
+    engine.submitted[0]("answer", None)
+    assert [job.status for job in jobs] == ["done", "running", "running"]
+
+def test_servers_are_limited_separately():
+    engine, scheduler = make_scheduler(limit_per_server=1)
+    a = scheduler.submit(inputs(url="http://a"))
+    a2 = scheduler.submit(inputs(url="http://a/"))
+    b = scheduler.submit(inputs(url="http://b"))
+    assert (a.status, a2.status, b.status) == ("running", "queued", "running")
+
+def test_higher_priority_runs_first():
+    engine, scheduler = make_scheduler(limit_per_server=1)
+    scheduler.submit(inputs())
+    low = scheduler.submit(inputs(), "Low")
+    high = scheduler.submit(inputs(), "High")
+    engine.submitted[0](None, None)
+    assert (high.status, low.status) == ("running", "queued")
+
+def test_capacity_multiplies_the_limit_and_set_limit_notifies():
+    limits = []
+    engine, scheduler = make_scheduler(limit_per_server=1, capacity=lambda server: 2, on_limit=limits.append)
+    jobs = [scheduler.submit(inputs()) for _ in range(4)]
+    assert sum(job.status == "running" for job in jobs) == 2
+    scheduler.set_limit(2)
+    assert limits == [2]
+    assert all(job.status == "running" for job in jobs)
@@ -0,0 +1,31 @@
+import threading
+from types import SimpleNamespace
+
+from utils.ollama_api import get_ollama_client
+
+def make_gui():
+    return SimpleNamespace(ollama_url="http://localhost:11434", ollama_clients={})
+
+def test_keep_alive_is_per_caller_and_connections_are_shared():
+    gui = make_gui()
+    short = get_ollama_client(gui, "http://a:1/", "1m")
+    long = get_ollama_client(gui, "http://a:1", "1h")
+    assert (short.keep_alive, long.keep_alive) == ("1m", "1h") # Getting the second did not change the first
+    assert short.session is long.session
+    assert list(gui.ollama_clients) == ["http://a:1"]
+
+def test_one_client_per_server_across_threads():
+    gui = make_gui()
+    barrier = threading.Barrier(8)
+    clients = []
+
+    def get():
+        barrier.wait()
+        clients.append(get_ollama_client(gui, "http://a:1", "5m"))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(client.session) for client in clients}) == 1
@@ -0,0 +1,46 @@
+from utils.precheck import ModuleIndex, build_repair_prompt, precheck_code
+
+def make_index(tmp_path):
+    return ModuleIndex(str(tmp_path / "module_index.json"))
+
+def test_clean_code_passes(tmp_path):
+    assert precheck_code("import os\nprint(os.getcwd())\n", make_index(tmp_path)) == []
+
+def test_syntax_error_reports_the_line_of_the_text_as_given():
+    problems = precheck_code("\n\nx = 1\nif x\n    pass\n")
+    assert [problem.line for problem in problems] == [4] # Leading blank lines count, as in the code tab
+    assert "SyntaxError" in problems[0].message
+
+def test_compile_time_errors_are_caught():
+    problems = precheck_code("x = 1\nreturn x\n")
+    assert problems and problems[0].line == 2
+
+def test_missing_module_is_reported_unless_the_import_is_guarded(tmp_path):
+    code = (
+        "import os\n"
+        "import surely_not_installed_module\n"
+        "try:\n"
+        "    import another_missing_module\n"
+        "except ImportError:\n"
+        "    another_missing_module = None\n"
+        "from also_missing.sub import thing\n"
+        "from . import relative\n"
+    )
+    problems = precheck_code(code, make_index(tmp_path))
+    assert [(problem.line, problem.message) for problem in problems] == [
+        (2, "module 'surely_not_installed_module' is not installed"),
+        (7, "module 'also_missing' is not installed")
+    ]
+
+def test_module_index_is_cached_on_disk(tmp_path):
+    index = make_index(tmp_path)
+    modules = index.load()
+    assert "json" in modules and "sys" in modules
+    assert (tmp_path / "module_index.json").exists()
+    assert make_index(tmp_path).load() == modules
+
+def test_repair_prompt_names_the_problems():
+    code = "import surely_not_installed_module\n"
+    prompt = build_repair_prompt(code, precheck_code(code, ModuleIndex("/nonexistent/dir/index.json")))
+    assert "line 1: module 'surely_not_installed_module' is not installed" in prompt
+    assert prompt.endswith(f"```python\n{code}\n```")
@@ -0,0 +1,63 @@
+import os
+import time
+
+from utils.response_cache import ResponseCache, make_cache_key
+
+def test_make_cache_key_depends_on_every_input():
+    base = make_cache_key("m", "d1", {"temperature": 0}, [{"role": "user", "content": "hi"}])
+    assert base == make_cache_key("m", "d1", {"temperature": 0}, [{"role": "user", "content": "hi"}])
+    assert base != make_cache_key("m", "d2", {"temperature": 0}, [{"role": "user", "content": "hi"}])
+    assert base != make_cache_key("m", "d1", {"temperature": 0.5}, [{"role": "user", "content": "hi"}])
+    assert base != make_cache_key("m", "d1", {"temperature": 0}, [{"role": "user", "content": "hello"}])
+
+def test_get_put_and_counters(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    assert cache.get("a") is None
+    cache.put("a", "m", "d", "answer", {"eval_count": 3})
+    assert cache.get("a")["response"] == "answer"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_index_survives_restart_and_drops_missing_files(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put("a", "m", "d", "one")
+    cache.put("b", "m", "d", "two")
+    os.remove(os.path.join(str(tmp_path), "b.json"))
+    reopened = ResponseCache(str(tmp_path))
+    assert reopened.get("a")["response"] == "one"
+    assert reopened.get("b") is None
+
+def test_evicts_least_recently_used_entry(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_entries=2)
+    cache.put("a", "m", "d", "one")
+    time.sleep(0.01)
+    cache.put("b", "m", "d", "two")
+    time.sleep(0.01)
+    cache.get("a") # a is now more recent than b
+    time.sleep(0.01)
+    cache.put("c", "m", "d", "three")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert not os.path.exists(os.path.join(str(tmp_path), "b.json"))
+
+def test_evicts_by_size(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=400)
+    cache.put("a", "m", "d", "x" * 150)
+    time.sleep(0.01)
+    cache.put("b", "m", "d", "y" * 150)
+    assert cache.get("a") is None
+    assert cache.total_bytes() <= 400
+
+def test_oversized_response_is_not_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=100)
+    cache.put("a", "m", "d", "x" * 500)
+    assert cache.get("a") is None
+
+def test_invalidates_only_models_with_a_different_digest(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put("same", "kept", "d1", "one")
+    cache.put("changed", "pulled", "old", "two")
+    cache.put("unseen", "offline", "d3", "three")
+    assert cache.invalidate_stale({"kept": "d1", "pulled": "new"}) == 1
+    assert cache.get("changed") is None
+    assert cache.get("same") is not None
+    assert cache.get("unseen") is not None # Its server is down, not its model replaced
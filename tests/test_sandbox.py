@@ -0,0 +1,37 @@
+import os
+
+import pytest
+
+from utils.core import run_code
+from utils.sandbox import SandboxLimits, is_memory_error
+
+posix_only = pytest.mark.skipif(os.name != "posix", reason="rlimits are POSIX only")
+
+def test_is_memory_error():
+    assert is_memory_error("Traceback (most recent call last):\n  File \"x.py\", line 1\nMemoryError\n")
+    assert is_memory_error("MemoryError: out of memory")
+    assert not is_memory_error("ValueError: bad\n")
+    assert not is_memory_error("")
+
+@posix_only
+def test_limits_reach_the_program():
+    output = []
+    code = "import resource; print(resource.getrlimit(resource.RLIMIT_CPU)[0], resource.getrlimit(resource.RLIMIT_AS)[0])"
+    report = run_code(code, on_output=lambda text, tag: output.append(text), limits=SandboxLimits(wall_time=10, cpu_time=3, memory_mb=512))
+    assert report.returncode == 0
+    assert "".join(output).split() == ["3", str(512 * 1024 * 1024)]
+
+@posix_only
+def test_memory_limit_is_reported():
+    report = run_code("x = bytearray(1024 * 1024 * 1024)", limits=SandboxLimits(wall_time=10, cpu_time=0, memory_mb=256))
+    assert report.stop_reason == "memory limit of 256 MB exceeded"
+    assert report.exit_reason == report.stop_reason
+
+@posix_only
+def test_cpu_limit_stops_busy_loop():
+    report = run_code("while True: pass", limits=SandboxLimits(wall_time=10, cpu_time=1, memory_mb=0))
+    assert report.exit_reason == "CPU time limit exceeded"
+
+def test_wall_clock_limit():
+    report = run_code("import time; time.sleep(30)", limits=SandboxLimits(wall_time=0.5, cpu_time=0, memory_mb=0))
+    assert report.stop_reason.startswith("wall-clock limit")
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from utils import test_harness # Not importing TestResultCache by name: pytest would try to collect it
+from utils.test_harness import MODULE_ASSERTS, run_tests, split_tests
+
+CODE = '''import unittest
+
+def add(a, b):
+    return a + b
+
+def test_add():
+    assert add(1, 2) == 3
+
+def test_with_fixture(tmp_path):
+    pass
+
+class TestAdd(unittest.TestCase):
+    def test_zero(self):
+        self.assertEqual(add(0, 0), 0)
+
+    def helper(self):
+        pass
+
+assert add(2, 2) == 4
+test_add()
+
+if __name__ == "__main__":
+    unittest.main()
+'''
+
+def test_split_separates_tests_from_the_implementation():
+    module, tests = split_tests(CODE)
+    assert tests == ["test_add", "TestAdd.test_zero", MODULE_ASSERTS]
+    assert "__main__" not in module
+    assert "\ntest_add()" not in module
+    assert "assert add(2, 2) == 4" in module.split(f"def {MODULE_ASSERTS}():")[1] # Moved into its own test
+    assert "def add(a, b):" in module
+
+def test_split_without_tests():
+    module, tests = split_tests("print('hi')\n")
+    assert tests == [] and module == "print('hi')"
+
+def test_split_rejects_invalid_code():
+    with pytest.raises(SyntaxError):
+        split_tests("def broken(:\n")
+
+def test_run_reports_each_outcome_and_uses_the_cache(tmp_path):
+    code = '''import time
+
+def test_passes():
+    assert True
+
+def test_fails():
+    assert 1 == 2, "one is not two"
+
+def test_errors():
+    raise RuntimeError("boom")
+
+def test_hangs():
+    time.sleep(30)
+'''
+    cache = test_harness.TestResultCache(str(tmp_path))
+    seen = []
+    report = asyncio.run(run_tests(code, timeout=2, workers=4, on_result=seen.append, cache=cache))
+    outcomes = {result.name: result.outcome for result in report.results}
+    assert outcomes == {"test_passes": "passed", "test_fails": "failed", "test_errors": "error", "test_hangs": "timeout"}
+    assert [result.name for result in report.results] == ["test_passes", "test_fails", "test_errors", "test_hangs"]
+    assert "one is not two" in report.results[1].message
+    assert len(seen) == 4 and not report.passed()
+    assert "FAILURES" in report.format()
+
+    cached = asyncio.run(run_tests(code, timeout=2, workers=4, cache=cache))
+    assert cached.cached
+    assert {result.name: result.outcome for result in cached.results} == outcomes
+
+def test_run_without_tests_raises():
+    with pytest.raises(ValueError):
+        asyncio.run(run_tests("x = 1\n"))
@@ -0,0 +1,21 @@
+import time
+
+from utils.worker_pool import WarmWorkerPool
+
+def test_pool_starts_nothing_until_the_first_run(tmp_path):
+    script = tmp_path / "hello.py"
+    script.write_text("import sys\nprint('hello', 'json' in sys.modules)\n")
+    pool = WarmWorkerPool(size=1, preload_modules=["json"])
+    try:
+        assert pool._idle == []
+        process, was_warm = pool.run(str(script))
+        assert not was_warm # The first run starts its own interpreter
+        assert process.communicate(timeout=10)[0].startswith("hello")
+        deadline = time.time() + 10
+        while not pool._idle and time.time() < deadline: # Filled in the background after the first run
+            time.sleep(0.05)
+        process, was_warm = pool.run(str(script))
+        assert was_warm
+        assert process.communicate(timeout=10)[0] == "hello True\n"
+    finally:
+        pool.shutdown()
@@ -0,0 +1,112 @@
+import glob
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+from utils.app_paths import get_data_dir
+
+LOGGER_NAME = "ollama_coder"
+LOG_FILE = "ollama_coder.jsonl"
+LOG_MAX_BYTES = 5 * 1024 * 1024 # Rotated at 5 MB
+LOG_BACKUPS = 5 # Rotated files kept (ollama_coder.jsonl.1 ... .5)
+LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR"]
+DEFAULT_LEVEL = "INFO"
+
+_listener = None
+_trace = False # Full request payloads are logged only when this is on
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and the record's `data` fields."""
+
+    def format(self, record) -> str:
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        entry.update(getattr(record, "data", None) or {})
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+def setup_logging(level: str = DEFAULT_LEVEL, trace: bool = False, log_dir: str = None):
+    """
+    Routes the app's log records through a queue to a background thread that writes
+    them as JSON lines to a rotating file in the data directory and, in short form,
+    to the console, so logging never blocks the Tk or engine threads. Calling it
+    again only changes the level and trace mode.
+    """
+    global _listener
+    logger = logging.getLogger(LOGGER_NAME)
+    set_level(level)
+    set_trace(trace)
+    if _listener is not None:
+        return
+    file_handler = logging.handlers.RotatingFileHandler(
+        os.path.join(log_dir or get_data_dir("logs"), LOG_FILE), maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.propagate = False
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+
+def shutdown_logging():
+    """Writes out the queued records and stops the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+def set_level(level: str):
+    logging.getLogger(LOGGER_NAME).setLevel(level if level in LEVELS else DEFAULT_LEVEL)
+
+def set_trace(enabled: bool):
+    global _trace
+    _trace = bool(enabled)
+
+def trace_enabled() -> bool:
+    return _trace
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for one part of the app, e.g. get_logger("ollama_api")."""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+def digest(value) -> tuple:
+    """(size in bytes, sha256) of a str or of a JSON-serializable value, for logging a payload without its content."""
+    data = (value if isinstance(value, str) else json.dumps(value, sort_keys=True, ensure_ascii=False)).encode("utf-8")
+    return len(data), hashlib.sha256(data).hexdigest()
+
+def log_files(log_dir: str = None) -> list:
+    """The log file and its rotated copies, oldest first."""
+    path = os.path.join(log_dir or get_data_dir("logs"), LOG_FILE)
+    rotated = sorted(glob.glob(path + ".*"), key=lambda name: int(name.rsplit(".", 1)[1]) if name.rsplit(".", 1)[1].isdigit() else 0, reverse=True)
+    return rotated + ([path] if os.path.exists(path) else [])
+
+def read_records(event: str = None, log_dir: str = None, limit: int = 1000) -> list:
+    """The most recent `limit` log records (of one event type if given), oldest first."""
+    records = []
+    for path in log_files(log_dir):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue # A line cut short by a crash
+                    if event is None or record.get("event") == event:
+                        records.append(record)
+        except OSError:
+            continue
+    return records[-limit:]
+
+def format_time(timestamp) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)) if timestamp else ""
@@ -0,0 +1,10 @@
+import os
+
+DATA_DIR_ENV = "OLLAMA_CODER_HOME" # Overrides the default data directory
+DEFAULT_DATA_DIR = os.path.join(os.path.expanduser("~"), ".ollama_coder")
+
+def get_data_dir(*parts: str) -> str:
+    """Returns (and creates) a directory under the app's per-user data directory."""
+    path = os.path.join(os.environ.get(DATA_DIR_ENV) or DEFAULT_DATA_DIR, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,250 @@
+"""
+Minimal asyncio HTTP/1.1 client for the Ollama API.
+
+Used by the async engine so streaming answers need no thread per request: a
+cancelled task closes its connection at once, which is what makes Stop immediate.
+Connections are kept alive and reused like the pooled requests session in
+utils/ollama_api.py.
+"""
+import asyncio
+import json
+import ssl
+from urllib.parse import urlsplit
+
+READ_SIZE = 64 * 1024
+RETRY_STATUSES = (502, 503, 504)
+
+class HTTPStatusError(Exception):
+    """Raised for 4xx/5xx responses; the body usually holds Ollama's error message."""
+
+    def __init__(self, status: int, reason: str, body: str):
+        super().__init__(f"{status} {reason}: {body.strip()[:500]}")
+        self.status = status
+        self.body = body
+
+class UnreachableError(ConnectionError):
+    """Raised when a server could not be reached (no response started), so another server can be tried."""
+
+class AsyncResponse:
+    """Response whose body is read on demand, either whole or line by line."""
+
+    def __init__(self, client, reader, writer, status: int, reason: str, headers: dict, timeout: float):
+        self._client = client
+        self._reader = reader
+        self._writer = writer
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._timeout = timeout
+        self._chunked = "chunked" in headers.get("transfer-encoding", "").lower()
+        length = headers.get("content-length")
+        self._length = int(length) if length is not None and not self._chunked else None
+        self._reusable = headers.get("connection", "").lower() != "close" and (self._chunked or self._length is not None)
+        self._consumed = False
+        self._closed = False
+
+    async def _read(self, awaitable):
+        try:
+            return await asyncio.wait_for(awaitable, self._timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"No data from {self._client.base_url} for {self._timeout}s") from None
+
+    async def iter_chunks(self):
+        """Yields the body as it arrives, handling chunked and fixed-length bodies."""
+        if self._chunked:
+            while True:
+                size_line = await self._read(self._reader.readline())
+                if not size_line:
+                    raise ConnectionError("Connection closed in the middle of a response.")
+                size = int(size_line.split(b";")[0].strip(), 16)
+                if size == 0:
+                    while (await self._read(self._reader.readline())).strip(): # Trailers, if any
+                        pass
+                    break
+                data = await self._read(self._reader.readexactly(size + 2))
+                yield data[:-2]
+        elif self._length is not None:
+            remaining = self._length
+            while remaining > 0:
+                data = await self._read(self._reader.read(min(remaining, READ_SIZE)))
+                if not data:
+                    raise ConnectionError("Connection closed in the middle of a response.")
+                remaining -= len(data)
+                yield data
+        else:
+            while True:
+                data = await self._read(self._reader.read(READ_SIZE))
+                if not data:
+                    break
+                yield data
+        self._consumed = True
+
+    async def iter_lines(self):
+        """Yields complete lines (without the newline), e.g. Ollama's NDJSON stream."""
+        pending = b""
+        async for data in self.iter_chunks():
+            pending += data
+            if b"\n" in pending:
+                *lines, pending = pending.split(b"\n")
+                for line in lines:
+                    yield line
+        if pending:
+            yield pending
+
+    async def read(self) -> bytes:
+        try:
+            return b"".join([data async for data in self.iter_chunks()])
+        finally:
+            self.close()
+
+    async def json(self):
+        return json.loads(await self.read())
+
+    def close(self):
+        """Returns the connection to the pool if the body was read completely, otherwise closes it."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._consumed and self._reusable:
+            self._client._release(self._reader, self._writer)
+        else:
+            self._writer.close()
+
+class AsyncOllamaClient:
+    """Async counterpart of OllamaClient with a small pool of keep-alive connections."""
+
+    def __init__(
+        self,
+        base_url: str,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 300,
+        retries: int = 2,
+        backoff_factor: float = 0.3,
+        pool_size: int = 4,
+        keep_alive: str = None
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        parts = urlsplit(self.base_url)
+        self._secure = parts.scheme == "https"
+        self._host = parts.hostname or "localhost"
+        self._port = parts.port or (443 if self._secure else 80)
+        self._prefix = parts.path.rstrip("/")
+        self._idle = [] # (reader, writer) pairs ready for reuse
+
+    def _release(self, reader, writer):
+        if len(self._idle) < self.pool_size and not writer.is_closing():
+            self._idle.append((reader, writer))
+        else:
+            writer.close()
+
+    async def _connect(self):
+        """Returns (reader, writer, reused), preferring an idle pooled connection."""
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+        ssl_context = ssl.create_default_context() if self._secure else None
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self._host, self._port, ssl=ssl_context), self.connect_timeout)
+        except asyncio.TimeoutError:
+            raise ConnectionError(f"Could not connect to {self.base_url} within {self.connect_timeout}s") from None
+        return reader, writer, False
+
+    async def request(self, method: str, path: str, payload: dict = None, timeout: float = None) -> AsyncResponse:
+        """
+        Sends a request and returns once the status line and headers have arrived.
+        Connection failures and 502/503/504 answers are retried with backoff; nothing
+        is retried once a response has started.
+        """
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        head = (
+            f"{method} {self._prefix}/{path.lstrip('/')} HTTP/1.1\r\n"
+            f"Host: {self._host}:{self._port}\r\n"
+            "Content-Type: application/json\r\n"
+            "Accept: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n"
+        ).encode("ascii")
+        timeout = timeout or self.read_timeout
+        attempt = 0
+        while True:
+            writer = None
+            try:
+                reader, writer, reused = await self._connect()
+                writer.write(head + body)
+                await writer.drain()
+                status_line = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+            except asyncio.CancelledError:
+                if writer is not None:
+                    writer.close()
+                raise
+            except asyncio.TimeoutError: # Raised by the wait for the response head; connect timeouts are retried below
+                writer.close()
+                raise TimeoutError(f"No response from {self.base_url} within {timeout}s") from None
+            except (OSError, asyncio.IncompleteReadError) as e:
+                if writer is not None:
+                    writer.close()
+                    if reused:
+                        continue # The server closed an idle connection; try a fresh one right away
+                if attempt >= self.retries:
+                    raise UnreachableError(f"Ollama server at {self.base_url} not reachable: {e}") from e
+                await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+                attempt += 1
+                continue
+
+            lines = status_line.decode("latin-1").split("\r\n")
+            _, status, reason = (lines[0].split(" ", 2) + [""])[:3]
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    name, value = line.split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+            response = AsyncResponse(self, reader, writer, int(status), reason, headers, timeout)
+            if response.status >= 400:
+                text = (await response.read()).decode("utf-8", errors="replace")
+                if response.status in RETRY_STATUSES and attempt < self.retries:
+                    await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+                    attempt += 1
+                    continue
+                raise HTTPStatusError(response.status, reason, text)
+            return response
+
+    async def get_json(self, path: str, timeout: float = None):
+        return await (await self.request("GET", path, timeout=timeout)).json()
+
+    async def post_json(self, path: str, payload: dict, timeout: float = None):
+        return await (await self.request("POST", path, payload, timeout=timeout)).json()
+
+    async def chat(self, payload: dict) -> AsyncResponse:
+        """Starts a chat request, adding the client's keep_alive hint unless the payload sets one."""
+        if self.keep_alive:
+            payload.setdefault("keep_alive", self.keep_alive)
+        return await self.request("POST", "/api/chat", payload)
+
+    async def list_models(self, timeout: float = 5) -> list:
+        return (await self.get_json("/api/tags", timeout=timeout)).get("models", [])
+
+    async def list_running(self, timeout: float = 5) -> list:
+        """Returns the models currently loaded in memory, as reported by /api/ps."""
+        return (await self.get_json("/api/ps", timeout=timeout)).get("models", [])
+
+    async def warm_model(self, model: str, keep_alive: str = None):
+        """Loads a model into memory without generating anything, for keep_alive (or the client's default)."""
+        payload = {"model": model}
+        if keep_alive or self.keep_alive:
+            payload["keep_alive"] = keep_alive or self.keep_alive
+        await self.post_json("/api/generate", payload)
+
+    def close(self):
+        """Closes the idle connections."""
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
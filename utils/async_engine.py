@@ -0,0 +1,124 @@
+import asyncio
+import queue
+import threading
+
+from utils.app_log import get_logger
+
+log = get_logger("async_engine")
+
+UI_POLL_INTERVAL_MS = 20 # How often the Tk main loop drains the engine's message queue
+
+class Operation:
+    """Handle to a coroutine running on the engine, used to cancel it from the Tk thread."""
+
+    def __init__(self, engine, on_done=None):
+        self._engine = engine
+        self._on_done = on_done
+        self._task = None
+        self.finished = threading.Event()
+
+    def cancel(self):
+        """Cancels the coroutine at its next await; safe to call from any thread."""
+        if not self.finished.is_set():
+            self._engine.loop.call_soon_threadsafe(self._cancel)
+
+    def done(self) -> bool:
+        return self.finished.is_set()
+
+    def _cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+
+class AsyncEngine:
+    """
+    One asyncio loop on a background thread that owns the app's network and subprocess
+    I/O. Work is submitted as coroutines; their results, and any other updates meant
+    for widgets, reach the Tk main loop through a single queue drained with root.after,
+    so only the main thread ever touches Tk.
+    """
+
+    def __init__(self, root, poll_interval_ms: int = UI_POLL_INTERVAL_MS):
+        self.root = root
+        self.poll_interval_ms = poll_interval_ms
+        self.loop = asyncio.new_event_loop()
+        self._ui_queue = queue.SimpleQueue() # (callback, args) to run on the Tk thread
+        self._operations = set()
+        self._thread = threading.Thread(target=self._run_loop, name="async-engine", daemon=True)
+        self._thread.start()
+        self._poll_id = self.root.after(self.poll_interval_ms, self._poll)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coroutine, on_done=None) -> Operation:
+        """
+        Runs a coroutine on the engine. on_done(result, error) is called on the Tk thread
+        when it ends; error is the exception (asyncio.CancelledError when cancelled) or None.
+        """
+        operation = Operation(self, on_done)
+        self.loop.call_soon_threadsafe(self._start, operation, coroutine)
+        return operation
+
+    def submit_blocking(self, function, *args, on_done=None) -> Operation:
+        """Runs a blocking function (e.g. SQLite or NumPy work) on the loop's thread pool."""
+        return self.submit(asyncio.to_thread(function, *args), on_done)
+
+    def call_soon(self, callback, *args):
+        """Runs a plain callback on the engine's loop, after work submitted before it has started."""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def call_ui(self, callback, *args):
+        """Queues callback(*args) to run on the Tk thread; safe to call from any thread."""
+        self._ui_queue.put((callback, args))
+
+    def _start(self, operation: Operation, coroutine):
+        task = self.loop.create_task(coroutine)
+        operation._task = task
+        self._operations.add(operation)
+        task.add_done_callback(lambda task: self._finish(operation, task))
+
+    def _finish(self, operation: Operation, task):
+        self._operations.discard(operation)
+        if task.cancelled():
+            result, error = None, asyncio.CancelledError()
+        else:
+            result, error = (None, task.exception()) if task.exception() else (task.result(), None)
+        operation.finished.set()
+        if operation._on_done is not None:
+            self.call_ui(operation._on_done, result, error)
+        elif error is not None and not isinstance(error, asyncio.CancelledError):
+            log.error(f"Background operation failed: {error!r}", exc_info=error)
+
+    def _poll(self):
+        """Runs every queued UI callback, then reschedules itself."""
+        while True:
+            try:
+                callback, args = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e: # One failing update mustn't stop the queue
+                log.exception(f"Error in UI update {getattr(callback, '__name__', callback)}: {e!r}")
+        self._poll_id = self.root.after(self.poll_interval_ms, self._poll)
+
+    def shutdown(self, timeout: float = 2):
+        """Cancels running operations and stops the loop; called when the window closes."""
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+
+        async def cancel_all():
+            tasks = [operation._task for operation in list(self._operations) if operation._task is not None]
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.wait(tasks, timeout=timeout)
+
+        try:
+            asyncio.run_coroutine_threadsafe(cancel_all(), self.loop).result(timeout + 1)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=1)
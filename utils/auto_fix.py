@@ -0,0 +1,177 @@
+import asyncio
+import time
+
+from utils.core import build_messages, stream_chat_async, extract_python_code, run_code_async
+from utils.precheck import precheck_code, format_problems
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_CANDIDATES = 1
+DEFAULT_CANDIDATE_TEMPERATURE = 0.7 # Parallel candidates need sampling, or they'd all be the same answer
+ERROR_TAIL_CHARS = 2000 # stderr sent back in a repair prompt; the end of a traceback is what matters
+
+class Attempt:
+    """One generated candidate and the outcome of running it."""
+
+    def __init__(self, round_number: int, candidate: int):
+        self.round_number = round_number
+        self.candidate = candidate
+        self.status = "generating" # generating, running, passed, failed, precheck, no code, stopped, error
+        self.response = ""
+        self.code = ""
+        self.error = "" # stderr tail, pre-check problems or exception text
+        self.stdout = ""
+        self.exit_reason = ""
+        self.generation_time = 0.0
+        self.run_time = 0.0
+
+    def label(self) -> str:
+        return f"attempt {self.round_number}, candidate {self.candidate}"
+
+class AutoFixResult:
+    """Outcome of an auto-fix session."""
+
+    def __init__(self):
+        self.attempts = []
+        self.winner = None # Attempt that exited cleanly
+        self.stopped = False # The session was cancelled
+        self.wall_time = 0.0
+
+    @property
+    def rounds(self) -> int:
+        return max((attempt.round_number for attempt in self.attempts), default=0)
+
+    def summary(self) -> str:
+        if self.winner:
+            return (f"{self.winner.label()} ran cleanly after {len(self.attempts)} generations "
+                    f"in {self.rounds} rounds, {self.wall_time:.1f}s")
+        return f"no candidate ran cleanly after {len(self.attempts)} generations in {self.rounds} rounds, {self.wall_time:.1f}s"
+
+def build_error_prompt(code: str, error: str) -> str:
+    """Compact repair prompt: the failing code and the end of its error output."""
+    if len(error) > ERROR_TAIL_CHARS:
+        error = "..." + error[-ERROR_TAIL_CHARS:]
+    return (
+        "Running your code failed with:\n"
+        f"```\n{error.strip()}\n```\n"
+        "Fix the problem and reply with the complete corrected program in a single ```python block.\n\n"
+        f"```python\n{code}\n```"
+    )
+
+async def auto_fix(
+    client,
+    model: str,
+    system_message: str,
+    context: str,
+    question: str,
+    options: dict,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    candidates: int = DEFAULT_CANDIDATES,
+    candidate_temperature: float = DEFAULT_CANDIDATE_TEMPERATURE,
+    limits=None,
+    module_index=None,
+    on_event=None,
+    keep_alive: str = None
+) -> AutoFixResult:
+    """
+    Generates code, runs it and, while it fails, sends the error back to the model, for
+    up to max_attempts rounds. Each round generates `candidates` answers concurrently
+    (client is an AsyncOllamaClient) and runs each as soon as it arrives; the first one
+    to exit cleanly wins and the others are cancelled. on_event(attempt) is called
+    whenever an attempt changes status. keep_alive, if given, is sent with every request.
+    Cancelling the task stops every candidate and returns the result so far, with
+    `stopped` set.
+    """
+    on_event = on_event or (lambda attempt: None)
+    result = AutoFixResult()
+    start_time = time.perf_counter()
+    messages = build_messages(system_message, context, question)
+    candidates = max(1, candidates)
+    if candidates > 1:
+        options = dict(options, temperature=max(options.get("temperature", 0), candidate_temperature))
+
+    for round_number in range(1, max(1, max_attempts) + 1):
+        attempts = [Attempt(round_number, candidate) for candidate in range(1, candidates + 1)]
+        result.attempts.extend(attempts)
+        tasks = [
+            asyncio.ensure_future(_run_attempt(client, model, messages, options, keep_alive, attempt, limits, module_index, on_event))
+            for attempt in attempts
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                attempt = await next_done
+                if attempt.status == "passed":
+                    result.winner = attempt
+                    break
+        except asyncio.CancelledError:
+            result.stopped = True
+        finally:
+            for task in tasks: # The winner's rivals, or everything when stopped
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if result.winner or result.stopped:
+            break
+
+        # Repair the candidate that got furthest: one that ran beats one that failed the pre-check
+        failed = [attempt for attempt in attempts if attempt.code]
+        if not failed:
+            continue # No code at all; ask again
+        to_repair = min(failed, key=lambda attempt: (attempt.status != "failed", len(attempt.error)))
+        messages = messages + [
+            {"role": "assistant", "content": to_repair.response},
+            {"role": "user", "content": build_error_prompt(to_repair.code, to_repair.error)}
+        ]
+
+    result.wall_time = time.perf_counter() - start_time
+    return result
+
+async def _run_attempt(client, model, messages, options, keep_alive, attempt, limits, module_index, on_event) -> Attempt:
+    """Generates one candidate, pre-checks it and runs it."""
+    on_event(attempt)
+    try:
+        generation_start = time.perf_counter()
+        payload = {"model": model, "messages": messages, "options": options, "stream": True}
+        if keep_alive:
+            payload["keep_alive"] = keep_alive
+        generated = await stream_chat_async(client, payload)
+        attempt.generation_time = time.perf_counter() - generation_start
+        attempt.response = generated["response"]
+        attempt.code = extract_python_code(attempt.response)
+        if not attempt.code:
+            attempt.status = "no code"
+            return attempt
+        problems = precheck_code(attempt.code, module_index)
+        if problems:
+            attempt.status = "precheck"
+            attempt.error = format_problems(problems)
+            return attempt
+
+        attempt.status = "running"
+        on_event(attempt)
+        output = {None: [], "stderr": []}
+        report = await run_code_async(
+            attempt.code,
+            on_output=lambda text, tag: output[tag].append(text),
+            limits=limits,
+            stdin_text="", # Nobody is there to type input
+            isolate=True # Candidates run side by side, so each gets its own directory
+        )
+        attempt.run_time = report.wall_time
+        attempt.exit_reason = report.exit_reason
+        attempt.stdout = "".join(output[None])
+        attempt.error = "".join(output["stderr"])
+        if report.stop_reason == "stopped by user":
+            attempt.status = "stopped"
+        elif report.returncode == 0:
+            attempt.status = "passed"
+        else:
+            attempt.status = "failed"
+            attempt.error = attempt.error or f"The program {report.exit_reason}."
+    except asyncio.CancelledError:
+        attempt.status = "stopped"
+        raise
+    except Exception as e:
+        attempt.status = "error"
+        attempt.error = str(e)
+    finally:
+        on_event(attempt)
+    return attempt
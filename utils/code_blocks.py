@@ -0,0 +1,111 @@
+import re
+
+PYTHON_LANGUAGES = {"python", "python3", "py", "py3"}
+FENCE_PATTERN = re.compile(r"^(?P<indent>[ \t]*)(?P<fence>`{3,}|~{3,})[ \t]*(?P<info>[^`\s]*)") # CommonMark-style fence line
+
+class CodeBlock:
+    """One fenced block from a model response."""
+
+    def __init__(self, language: str, fence: str, indent: str):
+        self.language = language
+        self.fence = fence # Closing fence must use the same character and be at least as long
+        self.indent = indent # Fences inside list items are indented; so is their code
+        self.lines = []
+        self.closed = False
+
+    @property
+    def code(self) -> str:
+        return "\n".join(self.lines).strip("\n")
+
+    @property
+    def is_python(self) -> bool:
+        return self.language in PYTHON_LANGUAGES
+
+    @property
+    def is_untagged(self) -> bool:
+        return self.language == ""
+
+class CodeBlockParser:
+    """
+    Incremental fenced-code parser fed with response chunks as they stream in.
+    Recognizes ```python/```py/untagged and other fences, any number of blocks, and
+    reports progress through callbacks: on_code_changed(parser) whenever a complete
+    code line was added or a block opened, on_block_closed(parser, block) when a
+    closing fence arrives.
+    """
+
+    def __init__(self, on_code_changed=None, on_block_closed=None):
+        self.on_code_changed = on_code_changed
+        self.on_block_closed = on_block_closed
+        self.blocks = []
+        self._partial_line = "" # Text after the last newline, parsed once the line completes
+        self._current = None # Open block, if any
+
+    def feed(self, text: str):
+        """Parses every line completed by text. Cheap enough to call per streamed token."""
+        if "\n" not in text:
+            self._partial_line += text
+            return
+        lines = (self._partial_line + text).split("\n")
+        self._partial_line = lines.pop()
+        changed = False
+        for line in lines:
+            changed = self._parse_line(line) or changed
+        if changed and self.on_code_changed:
+            self.on_code_changed(self)
+
+    def close(self):
+        """Parses the final unterminated line once the stream has ended."""
+        if self._partial_line:
+            line, self._partial_line = self._partial_line, ""
+            if self._parse_line(line) and self.on_code_changed:
+                self.on_code_changed(self)
+
+    def _parse_line(self, line: str) -> bool:
+        """Handles one complete line; returns True if code was added or a block opened or closed."""
+        match = FENCE_PATTERN.match(line)
+        if self._current is None:
+            if not match:
+                return False
+            self._current = CodeBlock(match.group("info").lower(), match.group("fence"), match.group("indent"))
+            self.blocks.append(self._current)
+            return True
+        block = self._current
+        if match and not match.group("info") and match.group("fence")[0] == block.fence[0] \
+                and len(match.group("fence")) >= len(block.fence) and not line.strip().strip(block.fence[0]):
+            block.closed = True
+            self._current = None
+            if self.on_block_closed:
+                self.on_block_closed(self, block)
+            return True
+        if block.indent and line.startswith(block.indent):
+            line = line[len(block.indent):]
+        block.lines.append(line)
+        return True
+
+    def python_blocks(self, include_open: bool = True) -> list:
+        """
+        Blocks tagged as Python; untagged blocks are only used when there are none, since
+        answers with tagged code tend to use untagged fences for sample output.
+        """
+        tagged = [block for block in self.blocks if block.is_python]
+        candidates = tagged or [block for block in self.blocks if block.is_untagged]
+        return [block for block in candidates if block.closed or include_open]
+
+    def python_codes(self) -> list:
+        """Code of every non-empty Python block in order, the open one included. Blocks are never joined."""
+        return [block.code for block in self.python_blocks() if block.code.strip()]
+
+    def default_index(self) -> int:
+        """Index into python_codes() of the block to run: the first complete one, else the first (still open) one."""
+        blocks = [block for block in self.python_blocks() if block.code.strip()]
+        return next((index for index, block in enumerate(blocks) if block.closed), 0)
+
+    def python_code(self) -> str:
+        """The block to run by default; later blocks are often alternatives or fragments."""
+        codes = self.python_codes()
+        return codes[self.default_index()] if codes else ""
+
+    def has_runnable_code(self) -> bool:
+        """True once at least one Python block has been closed."""
+        return any(block.code.strip() for block in self.python_blocks(include_open=False))
@@ -1,103 +1,51 @@
-import subprocess
-import threading
-import queue
-import sys
-import os
-import tkinter as tk # For messagebox and status_var updates
-
-def execute_code_task(gui_instance, code: str):
-    """Task to execute Python code and update output."""
-    temp_file_path = "temp_generated_code.py"
-    try:
-        with open(temp_file_path, "w", encoding="utf-8") as f:
-            f.write(code)
-
-        gui_instance.current_code_process = subprocess.Popen(
-            [sys.executable, temp_file_path],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            encoding="utf-8",
-            bufsize=1
-        )
-        
-        stdout_thread = threading.Thread(target=_read_stdout, args=(gui_instance, gui_instance.current_code_process, gui_instance.code_output_text, gui_instance.stop_code_event))
-        stderr_thread = threading.Thread(target=_read_stderr, args=(gui_instance, gui_instance.current_code_process, gui_instance.code_output_text, gui_instance.stop_code_event))
-        stdout_thread.daemon = True
-        stderr_thread.daemon = True
-        stdout_thread.start()
-        stderr_thread.start()
-
-        while gui_instance.current_code_process.poll() is None:
-            if gui_instance.stop_code_event.is_set():
-                print("Stop code execution event detected. Terminating process.")
-                gui_instance.current_code_process.terminate()
-                try:
-                    gui_instance.current_code_process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    if gui_instance.current_code_process.poll() is None:
-                        gui_instance.current_code_process.kill()
-                gui_instance.status_var.set("Code execution stopped by user.")
-                break
-            
-            gui_instance.root.update_idletasks()
-            threading.Event().wait(0.05)
-
-        stdout_thread.join(timeout=1)
-        stderr_thread.join(timeout=1)
-
-        if not gui_instance.stop_code_event.is_set():
-            gui_instance.status_var.set("Code execution completed.")
-
-    except Exception as e:
-        if not gui_instance.stop_code_event.is_set():
-            gui_instance.code_output_text.config(state=tk.NORMAL)
-            gui_instance.code_output_text.delete("1.0", tk.END)
-            gui_instance.code_output_text.insert(tk.END, f"--- Execution Error ---\n{str(e)}\n")
-            gui_instance.code_output_text.see(tk.END)
-            gui_instance.code_output_text.config(state=tk.DISABLED)
-            gui_instance.status_var.set("Error during code execution.")
+import asyncio
+
+from utils.core import run_code_async
+
+async def execute_code_task(run):
+    """
+    Runs a CodeRun's code on the async engine, streaming its output to the run's tab,
+    and returns the RunReport. The script is written to a temp directory of its own,
+    so runs can go side by side. With a worker pool the code runs on a pre-started
+    interpreter instead of a freshly launched one. With limits (a SandboxLimits) it
+    also runs in that directory under CPU, memory, wall-clock and output caps;
+    pre-started workers are not used then, since the limits are applied when the
+    process starts. Cancelling the task stops the program.
+    """
+    run.renderer.push("Executing code...\n")
+    return await run_code_async(
+        run.code,
+        on_output=run.renderer.push,
+        on_start=run.started,
+        limits=run.limits,
+        worker_pool=run.worker_pool
+    )
+
+def show_code_result(gui_instance, run, error):
+    """Run manager callback on the Tk thread: reports how the run ended in the status bar."""
+    report = run.report
+    if error is not None:
+        if isinstance(error, asyncio.CancelledError):
+            gui_instance.status_var.set(f"{run.title} stopped by user.")
         else:
-            gui_instance.status_var.set("Code execution stopped by user.")
-    finally:
-        try:
-            if os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
-        except Exception as e:
-            print(f"Error cleaning up temp file: {e}")
-        
-        gui_instance.run_code_button.config(state=tk.NORMAL)
-        gui_instance.stop_code_button.config(state=tk.DISABLED)
-        gui_instance.code_input_entry.config(state=tk.DISABLED)
-        gui_instance.send_code_input_button.config(state=tk.DISABLED)
-        gui_instance.current_code_process = None
-        gui_instance.root.update_idletasks()
-
-def _read_stdout(gui_instance, process, output_widget, stop_event):
-    """Reads stdout from the subprocess and updates the GUI."""
-    for line in iter(process.stdout.readline, ''):
-        if stop_event.is_set():
-            break
-        gui_instance.root.after(0, _update_output_widget, output_widget, line)
-    process.stdout.close()
-
-def _read_stderr(gui_instance, process, output_widget, stop_event):
-    """Reads stderr from the subprocess and updates the GUI."""
-    for line in iter(process.stderr.readline, ''):
-        if stop_event.is_set():
-            break
-        gui_instance.root.after(0, _update_output_widget, output_widget, line, "red")
-    process.stderr.close()
-
-def _update_output_widget(widget, content, color=None):
-    """Helper to update a text widget from a non-GUI thread."""
-    widget.config(state=tk.NORMAL)
-    if color:
-        widget.tag_config(color, foreground=color)
-        widget.insert(tk.END, content, color)
+            run.renderer.push(f"--- Execution Error ---\n{str(error)}\n", "stderr")
+            gui_instance.status_var.set(f"Error during {run.title}.")
+    elif report.stop_reason == "stopped by user":
+        gui_instance.status_var.set(f"{run.title} stopped by user.")
+    elif report.stop_reason:
+        gui_instance.status_var.set(f"{run.title} terminated: {report.stop_reason}.")
+    elif report.returncode != 0:
+        gui_instance.status_var.set(f"{run.title} failed: {report.exit_reason}.")
     else:
-        widget.insert(tk.END, content)
-    widget.see(tk.END)
-    widget.config(state=tk.DISABLED)
-    widget.update_idletasks()
\ No newline at end of file
+        gui_instance.status_var.set(f"{run.title} completed. {_record_run_latency(gui_instance, report.wall_time, report.was_warm)}")
+
+def _record_run_latency(gui_instance, elapsed: float, was_warm: bool) -> str:
+    """Stores the run time under warm or cold and describes it alongside the running averages."""
+    kind = "warm" if was_warm else "cold"
+    gui_instance.run_latencies[kind].append(elapsed)
+    averages = ", ".join(
+        f"{name} avg {sum(times) / len(times):.2f}s ({len(times)} runs)"
+        for name, times in gui_instance.run_latencies.items() if times
+    )
+    label = "warm worker" if was_warm else "new interpreter"
+    return f"Run took {elapsed:.2f}s on a {label} | {averages}"
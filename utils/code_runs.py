@@ -0,0 +1,162 @@
+import asyncio
+import itertools
+import os
+import threading
+import time
+
+DEFAULT_MAX_RUNS = max(1, min(4, (os.cpu_count() or 2) // 2)) # Programs running at once; more wait their turn
+
+class CodeRun:
+    """
+    One execution of a piece of code: its state, the process while it runs, input
+    typed for it and the RunReport once it has ended. Output goes to `renderer`,
+    the OutputRenderer of the run's tab.
+    """
+
+    def __init__(self, run_id: int, code: str, title: str = "", limits=None, worker_pool=None):
+        self.id = run_id
+        self.code = code
+        self.title = title or f"Run #{run_id}"
+        self.limits = limits # SandboxLimits, or None
+        self.worker_pool = worker_pool
+        self.status = "queued" # queued, running, done, failed, stopped
+        self.renderer = None
+        self.process = None
+        self.report = None
+        self.error = ""
+        self.operation = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._pending_input = [] # Lines typed before the process started
+        self._lock = threading.Lock()
+
+    def is_finished(self) -> bool:
+        return self.status in ("done", "failed", "stopped")
+
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def started(self, process):
+        """on_start callback of run_code_async (engine thread): sends the input typed so far."""
+        with self._lock:
+            self.process = process
+            pending, self._pending_input = self._pending_input, []
+        for text in pending:
+            self._write(process, text)
+
+    def send_input(self, text: str) -> bool:
+        """Writes a line to the program's stdin, or keeps it until the program has started."""
+        with self._lock:
+            if self.is_finished():
+                return False
+            process = self.process
+            if process is None:
+                self._pending_input.append(text)
+                return True
+        return self._write(process, text)
+
+    @staticmethod
+    def _write(process, text: str) -> bool:
+        try:
+            process.stdin.write(text)
+            process.stdin.flush()
+            return True
+        except (BrokenPipeError, OSError, ValueError): # The program exited or closed its stdin
+            return False
+
+    def resident_memory_mb(self):
+        """Current RSS of the running process in MB (Linux only), or None."""
+        process = self.process
+        if process is None or self.is_finished():
+            return None
+        try:
+            with open(f"/proc/{process.pid}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024
+        except (OSError, ValueError, IndexError):
+            pass
+        return None
+
+class RunManager:
+    """
+    Runs code on the async engine with at most `max_running` programs at once; further
+    runs wait in submission order. Every run writes its script to its own temp
+    directory, so runs never share files. Called on the Tk thread, as are the callbacks:
+
+    start_run(run) returns the coroutine that executes the run and returns its
+    RunReport; on_finished(run, error) is called when it ends; on_change(run) whenever
+    a run changes state, first right after it was submitted (before it can start), so
+    its output can be given somewhere to go.
+    """
+
+    def __init__(self, engine, start_run, on_finished=None, on_change=None, max_running: int = DEFAULT_MAX_RUNS):
+        self.engine = engine
+        self.start_run = start_run
+        self.on_finished = on_finished or (lambda run, error: None)
+        self.on_change = on_change or (lambda run: None)
+        self.max_running = max(1, max_running)
+        self.runs = [] # Every run that still has a tab
+        self._ids = itertools.count(1)
+
+    def submit(self, code: str, title: str = "", limits=None, worker_pool=None) -> CodeRun:
+        run_id = next(self._ids)
+        run = CodeRun(run_id, code, title, limits, worker_pool)
+        self.runs.append(run)
+        self.on_change(run)
+        self._dispatch()
+        return run
+
+    def stop(self, run: CodeRun):
+        """Drops a queued run or stops a running one."""
+        if run.status == "queued":
+            run.status = "stopped"
+            run.finished_at = time.time()
+            self.on_change(run)
+            self.on_finished(run, asyncio.CancelledError())
+        elif run.status == "running" and run.operation is not None:
+            run.operation.cancel() # Reported through _finished once the program has been stopped
+
+    def remove(self, run: CodeRun):
+        """Forgets a run whose tab was closed, stopping it if needed."""
+        self.stop(run)
+        if run in self.runs:
+            self.runs.remove(run)
+
+    def set_limit(self, max_running: int):
+        self.max_running = max(1, max_running)
+        self._dispatch()
+
+    def running(self) -> list:
+        return [run for run in self.runs if run.status == "running"]
+
+    def _dispatch(self):
+        """Starts waiting runs while there are free slots."""
+        free = self.max_running - len(self.running())
+        for run in [run for run in self.runs if run.status == "queued"][:max(0, free)]:
+            run.status = "running"
+            run.started_at = time.time()
+            run.operation = self.engine.submit(
+                self.start_run(run),
+                lambda report, error, run=run: self._finished(run, report, error)
+            )
+            self.on_change(run)
+
+    def _finished(self, run: CodeRun, report, error):
+        run.finished_at = time.time()
+        run.report = report
+        if isinstance(error, asyncio.CancelledError) or (report is not None and report.stop_reason == "stopped by user"):
+            run.status = "stopped"
+        elif error is not None:
+            run.status = "failed"
+            run.error = str(error)
+        else:
+            run.status = "done" if report.returncode == 0 and not report.stop_reason else "failed"
+        try:
+            self.on_finished(run, error)
+        finally:
+            self._dispatch()
+            self.on_change(run)
@@ -0,0 +1,192 @@
+import hashlib
+import re
+import threading
+
+from utils.app_log import get_logger
+
+log = get_logger("context_manager")
+
+CHARS_PER_TOKEN = 4 # Rough average for English text and code with common tokenizers
+MESSAGE_OVERHEAD_TOKENS = 4 # Role markers and separators added by the chat template
+RESPONSE_RESERVE_RATIO = 0.25 # Share of num_ctx kept free for the model's answer
+SUMMARY_RESERVE_TOKENS = 300 # Room set aside for the running summary once old turns no longer fit
+CODE_BLOCK_PATTERN = re.compile(r"```[\w+-]*\n(.*?)```", re.DOTALL)
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for budgeting; avoids loading a real tokenizer."""
+    return len(text) // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+
+def _hash_text(*parts: str) -> str:
+    """Stable hash of one or more strings."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def _code_hashes(text: str) -> set:
+    """Hashes of the fenced code blocks found in text."""
+    return {_hash_text(block.strip()) for block in CODE_BLOCK_PATTERN.findall(text)}
+
+class ConversationContext:
+    """
+    Builds the message list for /api/chat so the prompt stays under a token budget
+    derived from num_ctx. The newest turns are kept verbatim, older turns are folded
+    into a model-written summary that is extended incrementally and cached, and code
+    blocks in the Context field that already appear in the history are left out.
+    """
+
+    def __init__(self, response_reserve_ratio: float = RESPONSE_RESERVE_RATIO):
+        self.response_reserve_ratio = response_reserve_ratio
+        self._summaries = {} # Hash of the first N turns -> (N, summary text)
+        self._lock = threading.Lock() # Concurrent queries share the summary cache; never held while summarizing
+        self.last_report = {}
+
+    def reset(self):
+        """Forgets cached summaries, e.g. when the chat history is cleared."""
+        with self._lock:
+            self._summaries.clear()
+            self.last_report = {}
+
+    def budget_for(self, num_ctx: int) -> int:
+        """Number of prompt tokens allowed for a given context window."""
+        return max(256, int(num_ctx * (1 - self.response_reserve_ratio)))
+
+    def build_messages(
+        self,
+        system_message: str,
+        context: str,
+        question: str,
+        history: list,
+        num_ctx: int,
+        summarize=None,
+        report: dict = None
+    ) -> list:
+        """
+        Returns the messages to send. `summarize(previous_summary, turns)` is called
+        to fold dropped turns into the running summary; without it they are dropped.
+        If `report` is given it is filled with the budgeting details of this call.
+        """
+        messages, details = self._build_messages(system_message, context, question, history, num_ctx, summarize)
+        with self._lock:
+            self.last_report = details
+        if report is not None:
+            report.update(details)
+        return messages
+
+    def _build_messages(self, system_message, context, question, history, num_ctx, summarize) -> tuple:
+        """Implementation of build_messages; returns the messages and the budgeting details."""
+        budget = self.budget_for(num_ctx)
+        context, deduplicated_blocks = self._deduplicate_code(context, history)
+
+        system_tokens = estimate_tokens(system_message)
+        user_content = f"Context: {context}\n\nQuestion: {question}"
+        user_tokens = estimate_tokens(user_content)
+        truncated_context = False
+        if system_tokens + user_tokens > budget:
+            # Keep the most recent end of the context; it is usually the most relevant part
+            keep_chars = max(0, (budget - system_tokens - estimate_tokens(question) - 2 * MESSAGE_OVERHEAD_TOKENS) * CHARS_PER_TOKEN)
+            context = context[-keep_chars:] if keep_chars else ""
+            user_content = f"Context: {context}\n\nQuestion: {question}"
+            user_tokens = estimate_tokens(user_content)
+            truncated_context = True
+
+        remaining = budget - system_tokens - user_tokens
+        history_tokens = sum(self._turn_tokens(entry) for entry in history)
+        reserved = SUMMARY_RESERVE_TOKENS if history_tokens > remaining and summarize is not None else 0
+        remaining -= reserved
+        kept = 0
+        for entry in reversed(history):
+            cost = self._turn_tokens(entry)
+            if cost > remaining:
+                break
+            remaining -= cost
+            kept += 1
+        first_kept = len(history) - kept
+
+        summary_message = None
+        remaining += reserved # The summary is charged at its real size below
+        if first_kept and summarize is not None:
+            summary = self._summary_for(history[:first_kept], summarize)
+            if summary:
+                summary_message = {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}
+                summary_tokens = estimate_tokens(summary_message["content"])
+                if summary_tokens > remaining:
+                    summary_message = None
+                else:
+                    remaining -= summary_tokens
+
+        messages = [{"role": "system", "content": system_message}]
+        if summary_message:
+            messages.append(summary_message)
+        for entry in history[first_kept:]:
+            messages.append({"role": "user", "content": entry["prompt"]})
+            messages.append({"role": "assistant", "content": entry["response"]})
+        messages.append({"role": "user", "content": user_content})
+
+        details = {
+            "budget_tokens": budget,
+            "prompt_tokens_estimate": budget - remaining,
+            "turns_total": len(history),
+            "turns_verbatim": len(history) - first_kept,
+            "turns_summarized": first_kept if summary_message else 0,
+            "turns_dropped": 0 if summary_message else first_kept,
+            "code_blocks_deduplicated": deduplicated_blocks,
+            "context_truncated": truncated_context
+        }
+        return messages, details
+
+    def _turn_tokens(self, entry: dict) -> int:
+        """Token estimate for one history turn, cached on the entry."""
+        if "tokens" not in entry:
+            entry["tokens"] = estimate_tokens(entry["prompt"]) + estimate_tokens(entry["response"])
+        return entry["tokens"]
+
+    def _deduplicate_code(self, context: str, history: list) -> tuple:
+        """Removes fenced code blocks from context that are already present in the history."""
+        if "```" not in context:
+            return context, 0
+        seen = set()
+        for entry in history:
+            if "code_hashes" not in entry:
+                entry["code_hashes"] = _code_hashes(entry["response"])
+            seen |= entry["code_hashes"]
+        removed = 0
+
+        def replace(match):
+            nonlocal removed
+            if _hash_text(match.group(1).strip()) in seen:
+                removed += 1
+                return ""
+            return match.group(0)
+
+        context = CODE_BLOCK_PATTERN.sub(replace, context)
+        return re.sub(r"\n{3,}", "\n\n", context).strip(), removed
+
+    def _summary_for(self, turns: list, summarize) -> str:
+        """Summary of `turns`, extending the longest cached summary of a prefix of them."""
+        prefix_hashes = []
+        running = hashlib.sha256()
+        for entry in turns:
+            running.update(_hash_text(entry["prompt"], entry["response"]).encode("ascii"))
+            prefix_hashes.append(running.hexdigest())
+
+        covered, previous_summary = 0, ""
+        with self._lock:
+            for index in range(len(turns), 0, -1):
+                cached = self._summaries.get(prefix_hashes[index - 1])
+                if cached:
+                    covered, previous_summary = cached
+                    break
+        if covered == len(turns):
+            return previous_summary
+
+        try: # A model call: other queries keep building their prompts meanwhile
+            summary = summarize(previous_summary, turns[covered:]).strip()
+        except Exception as e:
+            log.warning(f"Error summarizing conversation history: {e}")
+            return previous_summary
+        if summary:
+            with self._lock:
+                self._summaries[prefix_hashes[-1]] = (len(turns), summary)
+        return summary or previous_summary
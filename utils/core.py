@@ -0,0 +1,397 @@
+"""
+GUI-independent query → extract → execute pipeline.
+
+Nothing in this module touches Tk; progress is reported through callbacks, so the
+same code drives the GUI (utils/ollama_api.py, utils/code_execution.py) and the
+headless batch runner (OllamaBatch.py).
+"""
+import asyncio
+import codecs
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from utils.code_blocks import CodeBlockParser
+from utils.sandbox import OutputLimit, RunReport, reap, fill_usage, describe_exit, is_memory_error, send_signal, TERMINATE_GRACE_SECONDS
+from utils.app_log import get_logger
+
+log = get_logger("core")
+
+READ_CHUNK_SIZE = 64 * 1024 # Bytes per pipe read; callers batch the text for display
+STOP_POLL_SECONDS = 0.05 # How often a threading stop event is checked while a program runs
+DEFAULT_SYSTEM_MESSAGE = "You are a helpful coding assistant specializing in Python. You can generate code snippets, explain them, and provide examples. You always adhere to Python best practices and conventions. You are friendly and approachable, and will be helpful to users. If the user requests code, you should provide it in a clear and concise manner. If the user asks for explanations, you should provide them in a way that is easy for a novice programmer to understand. You should also provide examples and test cases to help the user verify the code. If the user asks for code that violates Python best practices, you should politely suggest improvements. If the user asks a question about a specific aspect of Python or coding in general, you should provide a helpful and informative answer."
+
+def build_messages(system_message: str, context: str, question: str) -> list:
+    """Messages for a single stand-alone question (no chat history)."""
+    return [
+        {
+            "role": "system",
+            "content": system_message
+        },
+        {
+            "role": "user",
+            "content": f"Context: {context}\n\nQuestion: {question}"
+        }
+    ]
+
+class _ChatStream:
+    """Collects the NDJSON lines of a streaming /api/chat response and its timings."""
+
+    def __init__(self, on_chunk=None):
+        self.on_chunk = on_chunk
+        self.request_start = time.perf_counter()
+        self.parts = []
+        self.final_chunk = {}
+        self.first_token_time = None
+
+    def feed(self, line: bytes):
+        chunk = json.loads(line.decode('utf-8'))
+        if 'message' in chunk and 'content' in chunk['message']:
+            content = chunk['message']['content']
+            if self.first_token_time is None and content:
+                self.first_token_time = time.perf_counter()
+            self.parts.append(content)
+            if self.on_chunk is not None:
+                self.on_chunk(content)
+        if chunk.get('done'):
+            self.final_chunk = chunk
+
+    def result(self, stopped: bool = False) -> dict:
+        final_chunk = self.final_chunk
+        return {
+            "response": ''.join(self.parts),
+            "stopped": stopped,
+            "final_chunk": final_chunk,
+            "time_to_first_token": (self.first_token_time - self.request_start) if self.first_token_time else None,
+            "total_time": time.perf_counter() - self.request_start,
+            "prompt_eval_count": final_chunk.get('prompt_eval_count'),
+            "prompt_eval_duration": final_chunk.get('prompt_eval_duration', 0) / 1e9, # Nanoseconds to seconds
+            "eval_count": final_chunk.get('eval_count'),
+            "eval_duration": final_chunk.get('eval_duration', 0) / 1e9,
+            "load_duration": final_chunk.get('load_duration', 0) / 1e9, # Non-zero when the model had to be loaded
+            "total_duration": final_chunk.get('total_duration', 0) / 1e9
+        }
+
+def stream_chat(client, payload: dict, on_chunk=None, stop_event=None) -> dict:
+    """
+    Sends a streaming /api/chat request and calls on_chunk(text) for every piece of
+    content. Returns the full response together with client-side and server-side timings.
+    """
+    stream = _ChatStream(on_chunk)
+    response = client.chat(payload)
+    stopped = False
+    try:
+        for line in response.iter_lines():
+            if stop_event is not None and stop_event.is_set():
+                log.info("Stop requested; closing the connection.")
+                stopped = True
+                break
+            if line:
+                stream.feed(line)
+    finally:
+        response.close()
+    return stream.result(stopped)
+
+async def stream_chat_async(client, payload: dict, on_chunk=None) -> dict:
+    """
+    stream_chat for an AsyncOllamaClient (utils/async_client.py). There is no stop
+    event: cancelling the task stops the stream and closes the connection at once.
+    """
+    stream = _ChatStream(on_chunk)
+    response = await client.chat(payload)
+    try:
+        async for line in response.iter_lines():
+            if line:
+                stream.feed(line)
+    finally:
+        response.close()
+    return stream.result()
+
+def parse_code_blocks(model_response: str) -> CodeBlockParser:
+    """A CodeBlockParser fed with a complete response."""
+    parser = CodeBlockParser()
+    parser.feed(model_response)
+    parser.close()
+    return parser
+
+def extract_python_code(model_response: str) -> str:
+    """
+    Extracts the code to run from the model's response: the first complete ```python/```py
+    block (or untagged block if there are none), or an unterminated block if no block
+    was closed. Later blocks are not appended; see extract_python_blocks.
+    """
+    return parse_code_blocks(model_response).python_code()
+
+def extract_python_blocks(model_response: str) -> tuple:
+    """(code of every Python block in order, index of the one extract_python_code returns)."""
+    parser = parse_code_blocks(model_response)
+    return parser.python_codes(), parser.default_index()
+
+def run_code(
+    code: str,
+    on_output=None,
+    on_start=None,
+    stop_event=None,
+    limits=None,
+    worker_pool=None,
+    stdin_text: str = None,
+    isolate: bool = False
+) -> RunReport:
+    """Blocking wrapper around run_code_async for callers without an event loop."""
+    return asyncio.run(run_code_async(code, on_output, on_start, stop_event, limits, worker_pool, stdin_text, isolate))
+
+async def run_code_async(
+    code: str,
+    on_output=None,
+    on_start=None,
+    stop_event=None,
+    limits=None,
+    worker_pool=None,
+    stdin_text: str = None,
+    isolate: bool = False
+) -> RunReport:
+    """
+    Runs code in a separate Python process and returns a RunReport.
+
+    on_output(text, tag) receives output chunks in arrival order (tag is None for
+    stdout, "stderr" for stderr); on_start(process) is called once the process is
+    running, e.g. to forward input to its stdin. With limits (a SandboxLimits) or
+    isolate, the program also runs in the temp directory holding its script (otherwise
+    in the current one); limits also apply CPU, memory, wall-clock and output caps and
+    bypass worker_pool, since the rlimits are set by a launcher that execs the program.
+    stdin_text, if given, is written and stdin is closed.
+
+    Cancelling the task stops the program (SIGTERM, then SIGKILL after a grace period)
+    and still returns its report; stop_event does the same for callers on other threads.
+    """
+    on_output = on_output or (lambda text, tag: None)
+    stderr_tail = [] # Last stderr chunks, to recognize a MemoryError caused by the memory limit
+    if limits and limits.memory_mb:
+        forward_output = on_output
+        def on_output(text, tag):
+            if tag == "stderr":
+                stderr_tail.append(text)
+                del stderr_tail[:-8]
+            forward_output(text, tag)
+    run_dir = tempfile.mkdtemp(prefix="ollama_run_") # Every run has its own script, so runs can overlap
+    temp_file_path = os.path.join(run_dir, "generated_code.py")
+    start_time = time.perf_counter()
+    report = RunReport()
+    output_limit = OutputLimit(limits.output_kb * 1024 if limits else 0)
+    try:
+        with open(temp_file_path, "w", encoding="utf-8") as f:
+            f.write(code)
+
+        if worker_pool is not None and limits is None:
+            process, report.was_warm = worker_pool.run(temp_file_path)
+        else:
+            argv = [sys.executable, temp_file_path]
+            process = subprocess.Popen(
+                limits.command(argv) if limits else argv,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                bufsize=1,
+                cwd=run_dir if (limits or isolate) else None,
+                **(limits.popen_kwargs() if limits else {})
+            )
+        if on_start is not None:
+            on_start(process)
+        if stdin_text is not None:
+            try:
+                process.stdin.write(stdin_text)
+                process.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+
+        limit_reached = asyncio.Event() # Set by a reader once the output cap is passed
+        readers = [
+            await _read_pipe(process.stdout, on_output, None, output_limit, limit_reached),
+            await _read_pipe(process.stderr, on_output, "stderr", output_limit, limit_reached)
+        ]
+        exited = asyncio.ensure_future(_wait_for_exit(process))
+        wake_on_limit = asyncio.ensure_future(limit_reached.wait())
+
+        # SIGTERM first, SIGKILL after a grace period
+        stop_reason = None
+        kill_deadline = None
+        try:
+            while not exited.done():
+                now = time.perf_counter()
+                if stop_reason is None:
+                    if stop_event is not None and stop_event.is_set():
+                        stop_reason = "stopped by user"
+                    elif limits and limits.wall_time and now - start_time > limits.wall_time:
+                        stop_reason = f"wall-clock limit of {limits.wall_time}s exceeded"
+                    elif output_limit.exceeded:
+                        stop_reason = f"output limit of {limits.output_kb} KB exceeded"
+                    if stop_reason:
+                        log.info(f"Terminating code execution: {stop_reason}.", extra={"data": {"event": "run_stopped", "pid": process.pid, "reason": stop_reason}})
+                        send_signal(process)
+                        kill_deadline = now + TERMINATE_GRACE_SECONDS
+                elif kill_deadline and now > kill_deadline:
+                    send_signal(process, force=True)
+                    kill_deadline = None
+
+                timeouts = []
+                if stop_event is not None or os.name != "posix":
+                    timeouts.append(STOP_POLL_SECONDS) # Threading events and thread readers can't wake the loop
+                if stop_reason is None and limits and limits.wall_time:
+                    timeouts.append(max(0, start_time + limits.wall_time - now))
+                if kill_deadline:
+                    timeouts.append(max(0, kill_deadline - now))
+                waiters = {exited} if wake_on_limit.done() else {exited, wake_on_limit}
+                try:
+                    await asyncio.wait(waiters, timeout=min(timeouts) if timeouts else None, return_when=asyncio.FIRST_COMPLETED)
+                except asyncio.CancelledError:
+                    if stop_reason is None:
+                        stop_reason = "stopped by user"
+                        log.info(f"Terminating code execution: {stop_reason}.", extra={"data": {"event": "run_stopped", "pid": process.pid, "reason": stop_reason}})
+                        send_signal(process)
+                        kill_deadline = time.perf_counter() + TERMINATE_GRACE_SECONDS
+            fill_usage(report, exited.result())
+        finally:
+            wake_on_limit.cancel()
+            if not exited.done():
+                exited.cancel()
+                send_signal(process, force=True)
+
+        # Output still in the pipes; a background grandchild may hold them open, so don't wait forever
+        await asyncio.wait([reader.done for reader in readers], timeout=1)
+        for reader in readers:
+            reader.close()
+        if stop_reason is None and output_limit.exceeded: # The child may die of a broken pipe before we notice
+            stop_reason = f"output limit of {limits.output_kb} KB exceeded"
+        if stop_reason is None and limits and limits.memory_mb and process.returncode and is_memory_error("".join(stderr_tail)):
+            stop_reason = f"memory limit of {limits.memory_mb} MB exceeded"
+
+        report.returncode = process.returncode
+        report.stop_reason = stop_reason
+        report.exit_reason = describe_exit(process.returncode, stop_reason)
+        report.wall_time = time.perf_counter() - start_time
+        return report
+    finally:
+        try:
+            shutil.rmtree(run_dir, ignore_errors=True)
+        except Exception as e:
+            log.warning(f"Error cleaning up temp file: {e}")
+
+async def _wait_for_exit(process):
+    """
+    Waits for the process to exit and returns its rusage (None where unavailable).
+    On Linux a pidfd wakes the loop the moment the process exits; elsewhere it polls.
+    """
+    loop = asyncio.get_running_loop()
+    pidfd = None
+    if hasattr(os, "pidfd_open"):
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except OSError:
+            pidfd = None
+    if pidfd is not None:
+        exited = loop.create_future()
+        try:
+            loop.add_reader(pidfd, lambda: exited.done() or exited.set_result(None))
+            try:
+                await exited
+            finally:
+                loop.remove_reader(pidfd)
+        except NotImplementedError: # Event loops without add_reader
+            pass
+        finally:
+            os.close(pidfd)
+    while True:
+        finished, usage = reap(process)
+        if finished:
+            return usage
+        await asyncio.sleep(STOP_POLL_SECONDS)
+
+class _PipeReader(asyncio.Protocol):
+    """
+    Passes a subprocess pipe's output to on_output as it arrives, decoded as UTF-8.
+    stdout and stderr usually share one consumer, so output keeps the order in which
+    it arrived, with stderr tagged for coloring.
+    """
+
+    def __init__(self, on_output, tag, output_limit, limit_reached):
+        self.on_output = on_output
+        self.tag = tag
+        self.output_limit = output_limit
+        self.limit_reached = limit_reached
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.transport = None
+        self.done = asyncio.get_running_loop().create_future()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data: bytes):
+        text = self.decoder.decode(data).replace("\r\n", "\n")
+        if not self.output_limit.consume(len(text)):
+            self.on_output("\n--- Output limit reached ---\n", "stderr")
+            self.limit_reached.set()
+            self.transport.close()
+            return
+        self.on_output(text, self.tag)
+
+    def connection_lost(self, exc):
+        tail = self.decoder.decode(b"", final=True)
+        if tail and not self.output_limit.exceeded:
+            self.on_output(tail, self.tag)
+        if not self.done.done():
+            self.done.set_result(None)
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+class _ThreadPipeReader:
+    """Fallback for event loops that can't watch pipes (Windows): reads on the loop's thread pool."""
+
+    def __init__(self, stream, on_output, tag, output_limit):
+        self.stop_event = threading.Event()
+        self.done = asyncio.get_running_loop().run_in_executor(
+            None, _read_stream, stream, on_output, tag, self.stop_event, output_limit)
+
+    def close(self):
+        self.stop_event.set()
+
+async def _read_pipe(stream, on_output, tag, output_limit, limit_reached):
+    """Starts reading a subprocess pipe; returns a reader with a `done` future and close()."""
+    if os.name == "posix":
+        loop = asyncio.get_running_loop()
+        _, reader = await loop.connect_read_pipe(lambda: _PipeReader(on_output, tag, output_limit, limit_reached), stream)
+        return reader
+    return _ThreadPipeReader(stream, on_output, tag, output_limit)
+
+def _read_stream(stream, on_output, tag, stop_event, output_limit=None):
+    """
+    Reads a subprocess pipe in large chunks and passes the text to on_output.
+    stdout and stderr usually share one consumer, so output keeps the order in which
+    it arrived, with stderr tagged for coloring.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    fd = stream.fileno()
+    while True:
+        try:
+            data = os.read(fd, READ_CHUNK_SIZE) # Returns whatever is available, up to the chunk size
+        except OSError:
+            break
+        if not data or stop_event.is_set():
+            break
+        text = decoder.decode(data).replace("\r\n", "\n")
+        if output_limit is not None and not output_limit.consume(len(text)):
+            on_output("\n--- Output limit reached ---\n", "stderr")
+            break
+        on_output(text, tag)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        on_output(tail, tag)
+    stream.close()
@@ -0,0 +1,67 @@
+import tkinter as tk
+from tkinter import ttk
+
+REFRESH_INTERVAL_MS = 1000 # In-flight counts tick while requests are running
+
+class EndpointView:
+    """
+    Table of the Ollama servers in the pool: whether each is up, its models (loaded ones
+    first), requests in flight, failures and latency, with a button to check them now.
+    """
+
+    def __init__(self, parent, pool, on_check=None):
+        self.pool = pool
+        self._after_id = None
+
+        controls = ttk.Frame(parent)
+        controls.pack(fill=tk.X, padx=5, pady=5)
+        self.summary_var = tk.StringVar(value="Servers are checked in the background.")
+        ttk.Label(controls, textvariable=self.summary_var).pack(side=tk.LEFT)
+        ttk.Button(controls, text="Check Now", command=on_check, state=tk.NORMAL if on_check else tk.DISABLED).pack(side=tk.RIGHT)
+
+        columns = ("url", "status", "loaded", "models", "in_flight", "requests", "failures", "check", "mean", "p95")
+        headings = ("Server", "Status", "Loaded", "Models", "In Flight", "Requests", "Failures", "Check", "Mean", "p95")
+        widths = (200, 160, 200, 260, 70, 70, 70, 70, 70, 70)
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings")
+        for column, heading, width in zip(columns, headings, widths):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, stretch=(column in ("models", "status")))
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+    def refresh(self):
+        """Redraws the table from the pool and keeps ticking while requests are in flight."""
+        if self._after_id is not None:
+            self.tree.after_cancel(self._after_id)
+            self._after_id = None
+        self.tree.delete(*self.tree.get_children())
+        busy = False
+        for endpoint in list(self.pool.endpoints):
+            if endpoint.healthy is None:
+                status = "not checked"
+            elif endpoint.healthy:
+                status = "up"
+            else:
+                status = f"down: {endpoint.error[:80]}"
+            latency = endpoint.latency_stats()
+            self.tree.insert("", tk.END, values=(
+                endpoint.url,
+                status,
+                ", ".join(sorted(endpoint.loaded)),
+                ", ".join(sorted(endpoint.models - endpoint.loaded)),
+                endpoint.in_flight,
+                endpoint.requests,
+                endpoint.failures,
+                _seconds(endpoint.check_latency),
+                _seconds(latency["mean"]),
+                _seconds(latency["p95"])
+            ))
+            busy = busy or endpoint.in_flight > 0
+        up = sum(1 for endpoint in self.pool.endpoints if endpoint.healthy)
+        self.summary_var.set(f"{up} of {len(self.pool.endpoints)} servers up, {self.pool.failovers} failovers")
+        if busy:
+            self._after_id = self.tree.after(REFRESH_INTERVAL_MS, self.refresh)
+
+def _seconds(value) -> str:
+    if value is None:
+        return ""
+    return f"{value * 1000:.0f}ms" if value < 1 else f"{value:.1f}s"
@@ -0,0 +1,203 @@
+import asyncio
+import re
+import statistics
+import time
+from collections import deque
+
+from utils.async_client import AsyncOllamaClient, HTTPStatusError, UnreachableError, RETRY_STATUSES
+
+CHECK_INTERVAL = 15 # Seconds between background health checks of every server
+CHECK_TIMEOUT = 3 # A server slower than this to list its models counts as down
+LATENCY_SAMPLES = 100 # Recent requests kept per server for the latency figures
+
+def parse_endpoint_urls(text: str) -> list:
+    """Splits a comma- or space-separated list of server URLs, dropping duplicates and trailing slashes."""
+    urls = []
+    for url in re.split(r"[,\s]+", text.strip()):
+        url = url.rstrip("/")
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+class Endpoint:
+    """One Ollama server: whether it is up, which models it has and has loaded, and request timings."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.client = AsyncOllamaClient(url, retries=0) # The pool fails over to another server instead of retrying
+        self.healthy = None # Unknown until the first check
+        self.error = ""
+        self.models = set() # From /api/tags
+        self.digests = {} # Model name -> digest, also from /api/tags
+        self.loaded = set() # From /api/ps, plus models this app has used since
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.check_latency = None # Seconds the last health check took
+        self.checked_at = None
+        self.latencies = deque(maxlen=LATENCY_SAMPLES) # Seconds per completed request
+
+    def latency_stats(self) -> dict:
+        """Mean and 95th percentile of the recent request times, in seconds."""
+        samples = sorted(self.latencies) # Copy first: requests finish on the engine's thread
+        if not samples:
+            return {"mean": None, "p95": None}
+        return {"mean": statistics.fmean(samples), "p95": samples[min(len(samples) - 1, int(0.95 * len(samples)))]}
+
+    def mark_down(self, error: str):
+        self.healthy = False
+        self.error = error
+
+class EndpointPool:
+    """
+    The Ollama servers queries can go to. Each request goes to a healthy server that
+    has the model, preferring one with a free slot (fewer than `limit_per_endpoint`
+    requests in flight), then one where the model is already loaded, then the one with
+    the fewest requests in flight, then the fastest. When every such server is busy the
+    request waits for a slot. A server that can't be reached is
+    marked down and the request is sent to the next one; servers are checked again in
+    the background, so one that comes back is used again. Runs on the async engine's
+    loop; the Tk thread only reads the figures.
+    """
+
+    def __init__(self, urls: list = None, limit_per_endpoint: int = 1):
+        self.endpoints = [Endpoint(url) for url in urls or []]
+        self.limit_per_endpoint = limit_per_endpoint # Requests each server runs at once (OLLAMA_NUM_PARALLEL)
+        self.failovers = 0
+        self._slot_waiters = [] # Futures of requests waiting for a free slot
+
+    def set_urls(self, urls: list):
+        """Replaces the server list, keeping the state of servers that stay. Call on the engine's loop."""
+        current = {endpoint.url: endpoint for endpoint in self.endpoints}
+        self.endpoints = [current.pop(url, None) or Endpoint(url) for url in urls]
+        for endpoint in current.values():
+            endpoint.client.close()
+        self._wake_waiters()
+
+    def set_limit(self, limit_per_endpoint: int):
+        """Changes how many requests each server runs at once. Call on the engine's loop."""
+        self.limit_per_endpoint = max(1, limit_per_endpoint)
+        self._wake_waiters()
+
+    def capacity(self) -> int:
+        """Number of servers not known to be down (at least one); the job scheduler admits limit_per_endpoint jobs for each."""
+        return max(1, sum(1 for endpoint in self.endpoints if endpoint.healthy is not False))
+
+    def models(self) -> list:
+        """Every model offered by at least one healthy server."""
+        return sorted({model for endpoint in self.endpoints if endpoint.healthy for model in endpoint.models})
+
+    def model_digests(self) -> dict:
+        """
+        Model name -> digest for the response cache key. Servers that are down keep their
+        last known digests, so their cached answers are not dropped; healthy servers win.
+        """
+        by_health = sorted(self.endpoints, key=lambda endpoint: bool(endpoint.healthy))
+        return {name: digest for endpoint in by_health for name, digest in endpoint.digests.items()}
+
+    def pick(self, model: str = None, exclude=()) -> Endpoint:
+        """The best server for the model, or None when every server was tried."""
+        candidates = [endpoint for endpoint in self.endpoints if endpoint.url not in exclude]
+        if not candidates:
+            return None
+        up = [endpoint for endpoint in candidates if endpoint.healthy is not False]
+        candidates = up or candidates # When all look down, try them anyway: one may be back
+        if model:
+            # A server that hasn't been checked yet may have the model
+            candidates = [endpoint for endpoint in candidates if not endpoint.models or model in endpoint.models] or candidates
+
+        def load(endpoint):
+            mean = endpoint.latency_stats()["mean"]
+            busy = endpoint.in_flight >= self.limit_per_endpoint
+            return (busy, model not in endpoint.loaded, endpoint.in_flight, mean if mean is not None else float("inf"))
+        return min(candidates, key=load)
+
+    async def _wait_for_slot(self):
+        """Waits until a request finishes or the servers or the limit change."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._slot_waiters.append(waiter)
+        try:
+            await waiter
+        finally:
+            if waiter in self._slot_waiters:
+                self._slot_waiters.remove(waiter)
+
+    def _wake_waiters(self):
+        """Lets every waiting request pick a server again."""
+        waiters, self._slot_waiters = self._slot_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def call(self, model: str, request):
+        """
+        Awaits request(endpoint) on the best server for the model once it has a free
+        slot, failing over to the next server when one can't be reached or answers
+        502/503/504. Errors after a response has started (e.g. a dropped stream) are
+        raised, not retried elsewhere.
+        """
+        tried = set()
+        while True:
+            endpoint = self.pick(model, tried)
+            if endpoint is None:
+                raise UnreachableError(f"No Ollama server reachable (tried {', '.join(sorted(tried)) or 'none'}).")
+            if endpoint.in_flight >= self.limit_per_endpoint: # pick prefers free servers, so all are busy
+                await self._wait_for_slot()
+                continue
+            tried.add(endpoint.url)
+            endpoint.in_flight += 1
+            endpoint.requests += 1
+            start = time.perf_counter()
+            try:
+                result = await request(endpoint)
+            except (UnreachableError, HTTPStatusError) as e:
+                endpoint.failures += 1
+                if isinstance(e, HTTPStatusError) and e.status not in RETRY_STATUSES:
+                    raise
+                endpoint.mark_down(str(e))
+                self.failovers += 1
+                continue
+            except Exception:
+                endpoint.failures += 1
+                raise
+            finally:
+                endpoint.in_flight -= 1
+                self._wake_waiters()
+            endpoint.latencies.append(time.perf_counter() - start)
+            endpoint.healthy = True
+            if model:
+                endpoint.loaded.add(model) # Ollama keeps it loaded for keep_alive
+            return result
+
+    async def check(self, endpoint: Endpoint):
+        """Health check: lists the server's models (/api/tags) and the loaded ones (/api/ps)."""
+        start = time.perf_counter()
+        try:
+            models = await endpoint.client.list_models(timeout=CHECK_TIMEOUT)
+            try:
+                running = await endpoint.client.list_running(timeout=CHECK_TIMEOUT)
+            except HTTPStatusError: # Servers older than /api/ps
+                running = None
+        except (OSError, HTTPStatusError, ValueError) as e:
+            endpoint.mark_down(str(e))
+        else:
+            endpoint.healthy = True
+            endpoint.error = ""
+            endpoint.models = {model["name"] for model in models}
+            endpoint.digests = {model["name"]: model.get("digest", "") for model in models}
+            if running is not None:
+                endpoint.loaded = {model.get("name") or model.get("model") for model in running}
+        endpoint.check_latency = time.perf_counter() - start
+        endpoint.checked_at = time.time()
+        self._wake_waiters() # A server that came back may take waiting requests
+
+    async def check_all(self):
+        await asyncio.gather(*(self.check(endpoint) for endpoint in list(self.endpoints)))
+
+    async def monitor(self, on_checked=None, interval: float = CHECK_INTERVAL):
+        """Checks every server now and then every `interval` seconds until cancelled."""
+        while True:
+            await self.check_all()
+            if on_checked is not None:
+                on_checked()
+            await asyncio.sleep(interval)
@@ -1,6 +1,9 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import os
+import shutil
+import subprocess
+import sys
 
 def save_script_function(gui_instance):
     """Saves the generated code to a .py file."""
@@ -42,6 +45,7 @@ def load_script_function(gui_instance):
             gui_instance.generated_code_text.delete("1.0", tk.END)
             gui_instance.generated_code_text.insert(tk.END, loaded_code)
             gui_instance.generated_code_text.config(state=tk.DISABLED)
+            gui_instance.set_code_blocks([loaded_code])
             gui_instance.status_var.set(f"Code loaded from {os.path.basename(file_path)}")
             messagebox.showinfo("Load Code", f"Python script loaded successfully from:\n{file_path}")
             
@@ -50,4 +54,43 @@ def load_script_function(gui_instance):
 
         except Exception as e:
             messagebox.showerror("Load Error", f"Failed to load script: {e}")
-            gui_instance.status_var.set("Error loading code.")
\ No newline at end of file
+            gui_instance.status_var.set("Error loading code.")
+
+def save_output_function(gui_instance):
+    """Saves the full output of the run in the selected output tab, including lines no longer shown there."""
+    renderer = gui_instance.run_view.selected_renderer()
+    spill_path = renderer.flush_spill_file() if renderer is not None else None
+    if not spill_path or not os.path.exists(spill_path):
+        messagebox.showinfo("Save Output", "There is no program output to save.")
+        return
+
+    file_path = filedialog.asksaveasfilename(
+        defaultextension=".txt",
+        filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+        title="Save Program Output"
+    )
+
+    if file_path:
+        try:
+            shutil.copyfile(spill_path, file_path)
+            gui_instance.status_var.set(f"Output saved to {os.path.basename(file_path)}")
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Failed to save output: {e}")
+            gui_instance.status_var.set("Error saving output.")
+
+def view_output_function(gui_instance):
+    """Opens the full output of the run in the selected output tab in the system's default text viewer."""
+    renderer = gui_instance.run_view.selected_renderer()
+    spill_path = renderer.flush_spill_file() if renderer is not None else None
+    if not spill_path or not os.path.exists(spill_path):
+        messagebox.showinfo("View Output", "There is no program output to view.")
+        return
+    try:
+        if sys.platform.startswith("win"):
+            os.startfile(spill_path)
+        elif sys.platform == "darwin":
+            subprocess.Popen(["open", spill_path])
+        else:
+            subprocess.Popen(["xdg-open", spill_path])
+    except Exception as e:
+        messagebox.showerror("View Error", f"Failed to open output: {e}\nThe full output is stored in:\n{spill_path}")
@@ -0,0 +1,123 @@
+import time
+import tkinter as tk
+from tkinter import ttk, scrolledtext
+
+PAGE_SIZE = 200 # Rows fetched per page as the list is scrolled
+LOAD_MORE_THRESHOLD = 0.9 # Fetch the next page once the scrollbar passes this fraction
+
+class HistoryView:
+    """
+    Chat history browser backed by a SessionStore: a paged list of turns that loads
+    more rows as it is scrolled, a search box using the store's full-text index, and
+    a detail pane that only ever holds the selected turn.
+    """
+
+    def __init__(self, parent, store, on_continue=None):
+        self.store = store
+        self.on_continue = on_continue # Called with a session id to continue that session
+        self.query = ""
+        self.loaded = 0
+        self.total = 0
+        self._loading = False
+
+        search_frame = ttk.Frame(parent)
+        search_frame.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Label(search_frame, text="Search:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=50)
+        search_entry.pack(side=tk.LEFT, padx=(5, 0))
+        search_entry.bind("<Return>", lambda event: self.search())
+        ttk.Button(search_frame, text="Search", command=self.search).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(search_frame, text="Show All", command=self.show_all).pack(side=tk.LEFT, padx=(5, 0))
+        self.continue_button = ttk.Button(search_frame, text="Continue Session", command=self._continue_selected, state=tk.DISABLED)
+        self.continue_button.pack(side=tk.RIGHT)
+        self.count_var = tk.StringVar()
+        ttk.Label(search_frame, textvariable=self.count_var).pack(side=tk.RIGHT, padx=(0, 10))
+
+        panes = ttk.PanedWindow(parent, orient=tk.VERTICAL)
+        panes.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        list_frame = ttk.Frame(panes)
+        columns = ("time", "model", "prompt")
+        self.tree = ttk.Treeview(list_frame, columns=columns, show="headings", selectmode="browse")
+        for column, heading, width in zip(columns, ("Time", "Model", "Prompt"), (130, 150, 600)):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, stretch=(column == "prompt"))
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=lambda first, last: self._on_scroll(scrollbar, first, last))
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind("<<TreeviewSelect>>", lambda event: self._show_selected())
+        panes.add(list_frame, weight=1)
+
+        self.detail_text = scrolledtext.ScrolledText(panes, width=110, height=15, wrap=tk.WORD)
+        self.detail_text.tag_config("heading", font=("TkDefaultFont", 9, "bold"))
+        self.detail_text.config(state=tk.DISABLED)
+        panes.add(self.detail_text, weight=1)
+
+    def reload(self):
+        """Clears the list and loads the first page for the current search."""
+        self.tree.delete(*self.tree.get_children())
+        self.loaded = 0
+        self.total = self.store.count_turns(self.query)
+        self._load_page()
+
+    def search(self):
+        self.query = self.search_var.get().strip()
+        self.reload()
+
+    def show_all(self):
+        self.search_var.set("")
+        self.search()
+
+    def turn_added(self):
+        """Refreshes the list after a new turn was stored, unless a search is being shown."""
+        if not self.query:
+            self.reload()
+
+    def _load_page(self):
+        if self._loading or self.loaded >= self.total:
+            return
+        self._loading = True
+        try:
+            for turn in self.store.list_turns(self.loaded, PAGE_SIZE, self.query):
+                when = time.strftime("%Y-%m-%d %H:%M", time.localtime(turn["created"]))
+                prompt = " ".join(turn["prompt"].split()) # One line per row
+                self.tree.insert("", tk.END, iid=str(turn["id"]), values=(when, turn["model"], prompt))
+                self.loaded += 1
+        finally:
+            self._loading = False
+        shown = f"{self.total} matching turns" if self.query else f"{self.total} turns"
+        self.count_var.set(f"{shown} ({self.loaded} loaded)" if self.loaded < self.total else shown)
+
+    def _on_scroll(self, scrollbar, first, last):
+        scrollbar.set(first, last)
+        if float(last) >= LOAD_MORE_THRESHOLD and self.loaded < self.total:
+            self.tree.after_idle(self._load_page) # Not from inside the scroll callback
+
+    def _selected_turn(self):
+        selection = self.tree.selection()
+        return self.store.get_turn(int(selection[0])) if selection else None
+
+    def _show_selected(self):
+        """Loads the selected turn in full into the detail pane."""
+        turn = self._selected_turn()
+        self.continue_button.config(state=tk.NORMAL if turn and self.on_continue else tk.DISABLED)
+        self.detail_text.config(state=tk.NORMAL)
+        self.detail_text.delete("1.0", tk.END)
+        if turn:
+            self.detail_text.insert(tk.END, f"User ({turn['model']}):\n", "heading")
+            self.detail_text.insert(tk.END, f"{turn['prompt']}\n\n")
+            self.detail_text.insert(tk.END, "Model:\n", "heading")
+            self.detail_text.insert(tk.END, f"{turn['response']}\n")
+            stats = turn["stats"]
+            if stats.get("total_time") is not None:
+                self.detail_text.insert(tk.END, f"\nTotal time {stats['total_time']:.2f}s", "heading")
+                if stats.get("eval_count"):
+                    self.detail_text.insert(tk.END, f", {stats['eval_count']} tokens", "heading")
+        self.detail_text.config(state=tk.DISABLED)
+
+    def _continue_selected(self):
+        turn = self._selected_turn()
+        if turn and self.on_continue:
+            self.on_continue(turn["session_id"])
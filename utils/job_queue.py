@@ -0,0 +1,160 @@
+import asyncio
+import itertools
+import os
+import threading
+import time
+
+PRIORITIES = {"High": 0, "Normal": 1, "Low": 2} # Lower runs first
+DEFAULT_PRIORITY = "Normal"
+
+def default_parallel_per_server() -> int:
+    """Ollama serves OLLAMA_NUM_PARALLEL requests per model at once; without it, assume one."""
+    try:
+        return max(1, int(os.environ.get("OLLAMA_NUM_PARALLEL", "1")))
+    except ValueError:
+        return 1
+
+class Job:
+    """A queued prompt: its inputs, timings and, once it runs, the answer streamed so far."""
+
+    def __init__(self, job_id: int, inputs: dict, priority: str = DEFAULT_PRIORITY):
+        self.id = job_id
+        self.inputs = inputs
+        self.priority = priority
+        self.server = inputs["ollama_url"].rstrip("/")
+        self.status = "queued" # queued, running, done, failed, cancelled
+        self.enqueued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.response = ""
+        self.code = ""
+        self.error = ""
+        self.stats = {}
+        self.operation = None
+        self._parts = []
+        self._renderer = None # Renderer the answer is mirrored to while the job is shown
+        self._lock = threading.Lock()
+
+    @property
+    def wait_time(self) -> float:
+        return (self.started_at or self.finished_at or time.time()) - self.enqueued_at
+
+    @property
+    def run_time(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def push(self, text: str, tag: str = None, count_as_token: bool = True):
+        """Renderer interface: buffers the text and mirrors it to the attached renderer. Safe from any thread."""
+        with self._lock:
+            self._parts.append(text)
+            if self._renderer is not None:
+                self._renderer.push(text, tag, count_as_token)
+
+    def text(self) -> str:
+        with self._lock:
+            return "".join(self._parts)
+
+    def attach(self, renderer):
+        """Starts mirroring to renderer, replaying what was streamed before."""
+        with self._lock:
+            self._renderer = renderer
+            if self._parts:
+                renderer.push("".join(self._parts), count_as_token=False)
+
+    def detach(self):
+        with self._lock:
+            self._renderer = None
+
+    def is_finished(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+class JobScheduler:
+    """
+    Priority queue of prompts, run on the async engine with at most `limit_per_server`
+    jobs in flight per Ollama server. Higher priorities run first, then jobs in the
+    order they were queued; a busy server doesn't hold up jobs for other servers. All
+    methods are called on the Tk thread, as are the callbacks:
+
+    start_job(job) returns the coroutine that runs the job; on_finished(job, result,
+    error) is called when it ends; on_change() whenever a job changes state. When a
+    job's server stands for several load-balanced servers, capacity(server) returns how
+    many, and that many times the limit are admitted; the servers' own slots (see
+    EndpointPool) keep each one at the limit. on_limit(limit) is called when the limit
+    is set, so those slots can follow it.
+    """
+
+    def __init__(self, engine, start_job, on_finished=None, on_change=None, limit_per_server: int = None, capacity=None, on_limit=None):
+        self.engine = engine
+        self.start_job = start_job
+        self.on_finished = on_finished or (lambda job, result, error: None)
+        self.on_change = on_change or (lambda: None)
+        self.limit_per_server = limit_per_server or default_parallel_per_server()
+        self.capacity = capacity or (lambda server: 1)
+        self.on_limit = on_limit or (lambda limit: None)
+        self.jobs = [] # Every job still listed, in submission order
+        self._ids = itertools.count(1)
+        self._running = {} # Server -> number of jobs in flight
+
+    def submit(self, inputs: dict, priority: str = DEFAULT_PRIORITY) -> Job:
+        job = Job(next(self._ids), inputs, priority if priority in PRIORITIES else DEFAULT_PRIORITY)
+        self.jobs.append(job)
+        self._dispatch()
+        self.on_change()
+        return job
+
+    def cancel(self, job: Job):
+        """Drops a queued job or stops a running one."""
+        if job.status == "queued":
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            self.on_change()
+        elif job.status == "running" and job.operation is not None:
+            job.operation.cancel() # Reported through _finished once the task has unwound
+
+    def set_limit(self, limit_per_server: int):
+        self.limit_per_server = max(1, limit_per_server)
+        self.on_limit(self.limit_per_server)
+        self._dispatch()
+
+    def clear_finished(self):
+        self.jobs = [job for job in self.jobs if not job.is_finished()]
+        self.on_change()
+
+    def queued(self) -> list:
+        """Waiting jobs in the order they will be considered."""
+        waiting = [job for job in self.jobs if job.status == "queued"]
+        return sorted(waiting, key=lambda job: (PRIORITIES[job.priority], job.id))
+
+    def running(self) -> list:
+        return [job for job in self.jobs if job.status == "running"]
+
+    def _dispatch(self):
+        """Starts the best waiting job for every server that has a free slot."""
+        for job in self.queued():
+            if self._running.get(job.server, 0) >= self.limit_per_server * self.capacity(job.server):
+                continue
+            self._running[job.server] = self._running.get(job.server, 0) + 1
+            job.status = "running"
+            job.started_at = time.time()
+            job.operation = self.engine.submit(
+                self.start_job(job),
+                lambda result, error, job=job: self._finished(job, result, error)
+            )
+
+    def _finished(self, job: Job, result, error):
+        self._running[job.server] -= 1
+        job.finished_at = time.time()
+        if isinstance(error, asyncio.CancelledError):
+            job.status = "cancelled"
+        elif error is not None:
+            job.status = "failed"
+            job.error = str(error)
+        else:
+            job.status = "done"
+        try:
+            self.on_finished(job, result, error)
+        finally:
+            self._dispatch()
+            self.on_change()
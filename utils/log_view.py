@@ -0,0 +1,104 @@
+import json
+import tkinter as tk
+from tkinter import ttk, scrolledtext
+
+from utils.app_log import LEVELS, read_records, format_time, set_level, set_trace, digest
+from utils.stream_renderer import StreamRenderer
+
+MAX_ROWS = 1000 # Most recent records listed
+
+class LogView:
+    """
+    The app's structured log: the most recent records with their fields, the level and
+    trace-mode switches, and, for requests logged with their full payload (trace mode),
+    a button that sends the same request again and shows the new answer next to
+    whether it matches the logged one.
+    """
+
+    def __init__(self, parent, root, level_var, trace_var, on_replay=None):
+        self.on_replay = on_replay # Called with (payload, renderer, on_done(answer)) to resend a request
+        self.records = []
+        self.replayed = None # Record being replayed
+
+        controls = ttk.Frame(parent)
+        controls.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Label(controls, text="Level:").pack(side=tk.LEFT)
+        level_combobox = ttk.Combobox(controls, textvariable=level_var, values=LEVELS, state="readonly", width=10)
+        level_combobox.pack(side=tk.LEFT, padx=(5, 0))
+        level_combobox.bind("<<ComboboxSelected>>", lambda event: set_level(level_var.get()))
+        ttk.Checkbutton(controls, text="Trace full request payloads", variable=trace_var,
+                        command=lambda: set_trace(trace_var.get())).pack(side=tk.LEFT, padx=(10, 0))
+        self.requests_only_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(controls, text="Requests only", variable=self.requests_only_var, command=self.refresh).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Button(controls, text="Refresh", command=self.refresh).pack(side=tk.RIGHT)
+        self.replay_button = ttk.Button(controls, text="Replay Request", command=self._replay_selected, state=tk.DISABLED)
+        self.replay_button.pack(side=tk.RIGHT, padx=(0, 5))
+
+        panes = ttk.PanedWindow(parent, orient=tk.VERTICAL)
+        panes.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        list_frame = ttk.Frame(panes)
+        columns = ("time", "level", "logger", "message")
+        self.tree = ttk.Treeview(list_frame, columns=columns, show="headings", selectmode="browse")
+        for column, heading, width in zip(columns, ("Time", "Level", "Source", "Message"), (130, 60, 160, 600)):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, stretch=(column == "message"))
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind("<<TreeviewSelect>>", lambda event: self._show_selected())
+        panes.add(list_frame, weight=1)
+
+        self.detail_text = scrolledtext.ScrolledText(panes, width=110, height=15, wrap=tk.WORD)
+        self.detail_text.config(state=tk.DISABLED)
+        panes.add(self.detail_text, weight=1)
+        self.replay_renderer = StreamRenderer(root, self.detail_text) # Streams a replayed answer below the record
+
+    def refresh(self):
+        """Reloads the records from the log files, newest first."""
+        self.records = read_records("chat_request" if self.requests_only_var.get() else None, limit=MAX_ROWS)
+        self.tree.delete(*self.tree.get_children())
+        for index in range(len(self.records) - 1, -1, -1):
+            record = self.records[index]
+            self.tree.insert("", tk.END, iid=str(index), values=(
+                format_time(record.get("time")), record.get("level", ""), record.get("logger", ""), record.get("message", "")))
+
+    def _selected(self):
+        selection = self.tree.selection()
+        return self.records[int(selection[0])] if selection else None
+
+    def _show_selected(self):
+        record = self._selected()
+        if record is None:
+            return
+        self.replay_button.config(state=tk.NORMAL if record.get("payload") and self.on_replay and self.replayed is None else tk.DISABLED)
+        self.detail_text.config(state=tk.NORMAL)
+        self.detail_text.delete("1.0", tk.END)
+        self.detail_text.insert(tk.END, json.dumps(record, indent=2, ensure_ascii=False))
+        self.detail_text.config(state=tk.DISABLED)
+
+    def _replay_selected(self):
+        """Sends the selected request's payload again and streams the answer below it."""
+        record = self._selected()
+        if record is None or not record.get("payload"):
+            return
+        self.replayed = record
+        self.replay_button.config(state=tk.DISABLED)
+        self.replay_renderer.start()
+        self.replay_renderer.push(f"\n\n--- Replaying request {record.get('request_id', '')} to {record.get('model', '')} ---\n", count_as_token=False)
+        self.on_replay(record["payload"], self.replay_renderer, self._on_replayed)
+
+    def _on_replayed(self, answer: str = None, error=None):
+        """Called on the Tk thread when the replay has ended; compares the answer with the logged one."""
+        record, self.replayed = self.replayed, None
+        if error is not None:
+            self.replay_renderer.push(f"\n--- Replay failed: {error} ---\n", count_as_token=False)
+        elif record is not None and record.get("response_sha256"):
+            same = digest(answer)[1] == record["response_sha256"]
+            self.replay_renderer.push(f"\n--- {'Same answer as' if same else 'Different answer from'} the logged request ---\n", count_as_token=False)
+        self.replay_renderer.finish()
+        self._show_selected_button()
+
+    def _show_selected_button(self):
+        record = self._selected()
+        self.replay_button.config(state=tk.NORMAL if record and record.get("payload") and self.on_replay else tk.DISABLED)
@@ -0,0 +1,152 @@
+import time
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+
+ALL_MODELS = "All models"
+SPARKLINE_POINTS = 60 # Most recent queries drawn in each sparkline
+SPARKLINE_WIDTH = 220
+SPARKLINE_HEIGHT = 36
+TABLE_ROWS = 500 # Most recent queries listed in the table
+
+# (record field, label, format of the latest value); the spikes to look for are
+# long loads (model reloaded) and growing prompt counts and prompt evaluation times
+SPARKLINES = [
+    ("time_to_first_token", "Time to first token", "{:.2f}s"),
+    ("load_duration", "Model load", "{:.2f}s"),
+    ("prompt_eval_count", "Prompt tokens", "{:.0f}"),
+    ("prompt_eval_duration", "Prompt evaluation", "{:.2f}s"),
+    ("tokens_per_second", "Generation tok/s", "{:.1f}"),
+    ("render_lag_avg", "Render lag (avg)", "{:.3f}s")
+]
+
+COLUMNS = [
+    ("timestamp", "Time", 130), ("model", "Model", 150), ("endpoint", "Server", 150),
+    ("prompt_eval_count", "Prompt Tok", 75), ("load_duration", "Load", 60),
+    ("prompt_eval_duration", "Prompt Eval", 75), ("time_to_first_token", "TTFT", 60),
+    ("eval_count", "Tokens", 60), ("tokens_per_second", "Tok/s", 60),
+    ("total_time", "Total", 60), ("render_lag_avg", "Render Lag", 75), ("source", "Source", 70)
+]
+
+class MetricsView:
+    """
+    Timings of every query: sparklines of the recent trend for the key figures and a
+    table of the history, filtered by model, with CSV and JSONL export.
+    """
+
+    def __init__(self, parent, metrics_log):
+        self.log = metrics_log
+
+        controls = ttk.Frame(parent)
+        controls.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Label(controls, text="Model:").pack(side=tk.LEFT)
+        self.model_var = tk.StringVar(value=ALL_MODELS)
+        self.model_combobox = ttk.Combobox(controls, textvariable=self.model_var, state="readonly", width=30)
+        self.model_combobox.pack(side=tk.LEFT, padx=(5, 0))
+        self.model_combobox.bind("<<ComboboxSelected>>", lambda event: self.refresh())
+        ttk.Button(controls, text="Clear History", command=self.clear).pack(side=tk.RIGHT)
+        ttk.Button(controls, text="Export JSONL...", command=lambda: self.export("jsonl")).pack(side=tk.RIGHT, padx=(0, 5))
+        ttk.Button(controls, text="Export CSV...", command=lambda: self.export("csv")).pack(side=tk.RIGHT, padx=(0, 5))
+
+        sparkline_frame = ttk.Frame(parent)
+        sparkline_frame.pack(fill=tk.X, padx=5, pady=5)
+        self.sparklines = {} # Field -> (value label variable, canvas)
+        for index, (field, label, _) in enumerate(SPARKLINES):
+            cell = ttk.Frame(sparkline_frame)
+            cell.grid(row=index // 3, column=index % 3, padx=5, pady=5, sticky=tk.W)
+            value_var = tk.StringVar()
+            ttk.Label(cell, text=label).pack(anchor=tk.W)
+            ttk.Label(cell, textvariable=value_var).pack(anchor=tk.W)
+            canvas = tk.Canvas(cell, width=SPARKLINE_WIDTH, height=SPARKLINE_HEIGHT, background="white", highlightthickness=0)
+            canvas.pack()
+            self.sparklines[field] = (value_var, canvas)
+
+        self.tree = ttk.Treeview(parent, columns=[column for column, _, _ in COLUMNS], show="headings")
+        for column, heading, width in COLUMNS:
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, stretch=(column in ("model", "endpoint")))
+        scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0), pady=5)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=5)
+        self.refresh()
+
+    def add(self, record: dict):
+        """Stores a new query's record and shows it."""
+        self.log.add(record)
+        self.refresh()
+
+    def _filtered(self) -> list:
+        model = self.model_var.get()
+        return [record for record in self.log.records if model == ALL_MODELS or record.get("model") == model]
+
+    def refresh(self):
+        models = sorted({record.get("model") or "" for record in self.log.records} - {""})
+        self.model_combobox["values"] = [ALL_MODELS] + models
+        records = self._filtered()
+
+        recent = records[-SPARKLINE_POINTS:]
+        for field, _, value_format in SPARKLINES:
+            value_var, canvas = self.sparklines[field]
+            values = [record.get(field) for record in recent if record.get(field) is not None]
+            value_var.set(value_format.format(values[-1]) + f" (last), {value_format.format(max(values))} max" if values else "no data")
+            _draw_sparkline(canvas, values)
+
+        self.tree.delete(*self.tree.get_children())
+        for record in reversed(records[-TABLE_ROWS:]): # Newest first
+            self.tree.insert("", tk.END, values=[_format(column, record.get(column)) for column, _, _ in COLUMNS])
+
+    def export(self, kind: str):
+        records = self._filtered()
+        if not records:
+            messagebox.showinfo("Export Metrics", "There are no metrics to export yet.")
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=f".{kind}",
+            filetypes=[("CSV files", "*.csv")] if kind == "csv" else [("JSON Lines files", "*.jsonl")],
+            title="Export Query Metrics"
+        )
+        if not path:
+            return
+        try:
+            if kind == "csv":
+                self.log.export_csv(path, records)
+            else:
+                self.log.export_jsonl(path, records)
+        except OSError as e:
+            messagebox.showerror("Export Metrics", f"Could not write {path}: {e}")
+
+    def clear(self):
+        if messagebox.askyesno("Clear History", "Delete the stored timings of all queries?"):
+            self.log.clear()
+            self.model_var.set(ALL_MODELS)
+            self.refresh()
+
+def _draw_sparkline(canvas, values: list):
+    """Draws the values as a line scaled to the canvas, with the last point marked."""
+    canvas.delete("all")
+    if not values:
+        return
+    low, high = min(values), max(values)
+    span = (high - low) or 1
+    step = SPARKLINE_WIDTH / max(1, len(values) - 1)
+    points = []
+    for index, value in enumerate(values):
+        points.append(index * step if len(values) > 1 else SPARKLINE_WIDTH / 2)
+        points.append(SPARKLINE_HEIGHT - 3 - (value - low) / span * (SPARKLINE_HEIGHT - 6))
+    if len(values) > 1:
+        canvas.create_line(*points, fill="#1f77b4", width=1.5)
+    x, y = points[-2:]
+    canvas.create_oval(x - 2, y - 2, x + 2, y + 2, fill="#d62728", outline="")
+
+def _format(column: str, value) -> str:
+    if value is None or value == "":
+        return ""
+    if column == "timestamp":
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(value))
+    if column in ("prompt_eval_count", "eval_count"):
+        return str(value)
+    if column == "tokens_per_second":
+        return f"{value:.1f}"
+    if isinstance(value, float):
+        return f"{value:.2f}s"
+    return str(value)
@@ -0,0 +1,140 @@
+import asyncio
+import time
+import tkinter as tk
+from tkinter import ttk, scrolledtext
+
+from utils.ollama_api import query_single_model
+from utils.stream_renderer import StreamRenderer
+
+DEFAULT_MAX_PARALLEL = 2 # Ollama serves one request per model at a time unless OLLAMA_NUM_PARALLEL is raised
+
+class ModelRun:
+    """State of one model's query in a fan-out comparison."""
+
+    def __init__(self, model: str):
+        self.model = model
+        self.operation = None # Engine operation; cancelling it stops this model only
+        self.stats = {}
+        self.status = "queued"
+        self.code_status = ""
+        self.response = ""
+        self.frame = None
+        self.output_text = None
+        self.stop_button = None
+        self.renderer = None
+
+    def stop(self):
+        if self.operation is not None:
+            self.operation.cancel()
+
+def build_model_pane(gui_instance, run: ModelRun):
+    """Creates the streaming pane for one model inside the comparison paned window."""
+    run.frame = ttk.Frame(gui_instance.compare_panes)
+    header = ttk.Frame(run.frame)
+    header.pack(fill=tk.X)
+    ttk.Label(header, text=run.model).pack(side=tk.LEFT)
+    run.stop_button = ttk.Button(header, text="Stop", command=run.stop)
+    run.stop_button.pack(side=tk.RIGHT)
+    run.output_text = scrolledtext.ScrolledText(run.frame, width=40, height=20, wrap=tk.WORD)
+    run.output_text.pack(fill=tk.BOTH, expand=True)
+    run.renderer = StreamRenderer(gui_instance.root, run.output_text)
+    gui_instance.compare_panes.add(run.frame, weight=1)
+    run.renderer.start()
+
+def start_fan_out(gui_instance, models: list, inputs: dict, max_parallel: int = DEFAULT_MAX_PARALLEL) -> list:
+    """Queries several models as concurrent tasks on the async engine, at most max_parallel at a time, each streaming into its own pane."""
+    for pane in gui_instance.compare_panes.panes():
+        gui_instance.compare_panes.forget(pane)
+        gui_instance.root.nametowidget(str(pane)).destroy()
+    gui_instance.compare_tree.delete(*gui_instance.compare_tree.get_children())
+
+    runs = []
+    for model in models:
+        run = ModelRun(model)
+        build_model_pane(gui_instance, run)
+        gui_instance.compare_tree.insert("", tk.END, iid=model, values=(model, run.status, "", "", "", "", ""))
+        runs.append(run)
+
+    semaphore = asyncio.Semaphore(max(1, max_parallel)) # Binds to the engine's loop on first use
+    remaining = [len(runs)]
+
+    def on_done(result, error):
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            gui_instance._on_fan_out_finished(runs)
+
+    for run in runs:
+        run.operation = gui_instance.engine.submit(_run_model(gui_instance, run, inputs, semaphore), on_done)
+    return runs
+
+async def _run_model(gui_instance, run: ModelRun, inputs: dict, semaphore: asyncio.Semaphore):
+    """Queries one model once a slot is free and records its latency figures."""
+    start_time = None
+    try:
+        async with semaphore:
+            run.status = "running"
+            _update_row(gui_instance, run)
+            start_time = time.perf_counter()
+            run.response = await query_single_model(
+                gui_instance,
+                model=run.model,
+                system_message=inputs["system_message"],
+                context=inputs["context"],
+                question=inputs["question"],
+                temperature=inputs["temperature"],
+                max_tokens=inputs["max_tokens"],
+                ollama_url=inputs["ollama_url"],
+                renderer=run.renderer,
+                stats=run.stats,
+                use_cache=inputs["use_cache"],
+                replay_as_stream=inputs["replay_as_stream"],
+                retrieval_k=inputs["retrieval_k"],
+                embed_model=inputs["embed_model"],
+                keep_alive=inputs["keep_alive"]
+            )
+        run.status = "done"
+        run.code_status = _check_code(gui_instance, run.response)
+        run.renderer.on_finished = lambda: gui_instance.record_query_metrics("compare", run.model, run.stats, run.renderer)
+    except asyncio.CancelledError:
+        run.status = "stopped"
+        raise
+    except Exception as e:
+        run.status = "error"
+        run.renderer.push(f"\n--- Error ---\n{str(e)}\n", count_as_token=False)
+    finally:
+        if start_time is not None:
+            run.stats["wall_time"] = time.perf_counter() - start_time
+            run.stats["tokens_per_second"] = _tokens_per_second(run)
+        run.renderer.finish()
+        _update_row(gui_instance, run)
+
+def _tokens_per_second(run: ModelRun) -> float:
+    """Generation speed as reported by Ollama, falling back to the client-side stream rate."""
+    if run.stats.get("eval_count") and run.stats.get("eval_duration"):
+        return run.stats["eval_count"] / run.stats["eval_duration"]
+    return run.renderer.tokens_per_second()
+
+def _check_code(gui_instance, response: str) -> str:
+    """Classifies the code in a response as runnable (it compiles), broken or missing."""
+    code = gui_instance._extract_python_code(response)
+    if not code:
+        return "none"
+    try:
+        compile(code, "<generated>", "exec")
+        return "compiles"
+    except SyntaxError as e:
+        return f"syntax error (line {e.lineno})"
+
+def _update_row(gui_instance, run: ModelRun):
+    """Queues a refresh of the model's row in the comparison table."""
+    ttft = run.stats.get("time_to_first_token")
+    values = (
+        run.model,
+        run.status,
+        f"{ttft:.2f}s" if ttft is not None else "",
+        f"{run.stats['tokens_per_second']:.1f}" if "tokens_per_second" in run.stats else "",
+        f"{run.stats['wall_time']:.2f}s" if "wall_time" in run.stats else "",
+        run.stats.get("eval_count") or "",
+        run.code_status
+    )
+    gui_instance.engine.call_ui(lambda: gui_instance.compare_tree.item(run.model, values=values))
@@ -1,41 +1,207 @@
-import requests
+import asyncio
+import copy
 import json
-import tkinter as tk # For messagebox and status_var updates
+import logging
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING
+
+from utils.app_log import get_logger, digest, trace_enabled
+from utils.async_client import AsyncOllamaClient
+from utils.endpoints import parse_endpoint_urls
+from utils.core import stream_chat_async
+from utils.response_cache import make_cache_key
+from utils.retrieval import get_snippet_index, format_snippets, DEFAULT_EMBED_MODEL
+
+if TYPE_CHECKING: # Only for the annotations; requests itself is imported by the first OllamaClient
+    import requests
+
+DEFAULT_KEEP_ALIVE = "30m" # How long Ollama keeps a model loaded after the last request
+_clients_lock = threading.Lock() # gui_instance.ollama_clients is filled from the Tk thread and worker threads
+
+log = get_logger("ollama_api")
+
+class OllamaClient:
+    """
+    Reusable HTTP client for the Ollama API with pooled keep-alive connections and retries.
+    requests is imported when the first client is made, keeping it out of the app's startup.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 300,
+        retries: int = 2,
+        backoff_factor: float = 0.3,
+        pool_size: int = 4,
+        keep_alive: str = DEFAULT_KEEP_ALIVE
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.keep_alive = keep_alive
+
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        self._http_error = requests.exceptions.HTTPError
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0, # Never replay a request whose response already started streaming
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST"})
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+    def url(self, path: str) -> str:
+        """Builds the full URL for an API path."""
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def get(self, path: str, timeout: float = None) -> "requests.Response":
+        """Sends a GET request over the pooled session."""
+        response = self.session.get(self.url(path), timeout=(self.connect_timeout, timeout or self.read_timeout))
+        response.raise_for_status()
+        return response
+
+    def post(self, path: str, payload: dict, stream: bool = False, timeout: float = None) -> "requests.Response":
+        """Sends a JSON POST request over the pooled session."""
+        response = self.session.post(
+            self.url(path),
+            data=json.dumps(payload),
+            stream=stream,
+            timeout=(self.connect_timeout, timeout or self.read_timeout)
+        )
+        response.raise_for_status()
+        return response
+
+    def list_models(self, timeout: float = 5) -> list:
+        """Returns the model entries reported by /api/tags."""
+        return self.get("/api/tags", timeout=timeout).json().get('models', [])
+
+    def chat(self, payload: dict, stream: bool = True) -> "requests.Response":
+        """Sends a chat request, adding the client's keep_alive hint unless the payload sets one."""
+        payload.setdefault("keep_alive", self.keep_alive)
+        return self.post("/api/chat", payload, stream=stream)
+
+    def embed(self, model: str, texts: list) -> list:
+        """Returns one embedding vector per text, using the batch /api/embed endpoint when available."""
+        try:
+            return self.post("/api/embed", {"model": model, "input": texts, "keep_alive": self.keep_alive}).json()["embeddings"]
+        except self._http_error as e:
+            if e.response is None or e.response.status_code != 404 or "model" in e.response.text.lower():
+                raise
+        # Servers older than /api/embed only embed one text per request
+        return [self.post("/api/embeddings", {"model": model, "prompt": text}).json()["embedding"] for text in texts]
+
+    def warm_model(self, model: str):
+        """Loads a model into memory without generating anything."""
+        self.post("/api/generate", {"model": model, "keep_alive": self.keep_alive}).close()
+
+    def with_keep_alive(self, keep_alive: str) -> "OllamaClient":
+        """A client sending another keep_alive hint over the same pooled connections; this one is unchanged."""
+        if keep_alive == self.keep_alive:
+            return self
+        client = copy.copy(self)
+        client.keep_alive = keep_alive
+        return client
+
+    def close(self):
+        """Closes all pooled connections."""
+        self.session.close()
+
+def get_ollama_client(gui_instance, ollama_url: str = None, keep_alive: str = None) -> OllamaClient:
+    """
+    Returns a client for a server sending the given keep_alive hint, sharing the GUI's
+    pooled connections to that server (created on first use). Callers off the Tk thread
+    pass keep_alive, since the setting's widget can only be read on that thread.
+    """
+    base_url = (ollama_url or gui_instance.ollama_url).rstrip('/')
+    if keep_alive is None:
+        keep_alive = gui_instance.keep_alive_var.get().strip() or DEFAULT_KEEP_ALIVE
+    with _clients_lock:
+        client = gui_instance.ollama_clients.get(base_url)
+        if client is None:
+            client = OllamaClient(base_url, keep_alive=keep_alive)
+            gui_instance.ollama_clients[base_url] = client
+    return client.with_keep_alive(keep_alive)
+
+def get_async_client(gui_instance, model: str = None) -> AsyncOllamaClient:
+    """
+    Returns the async client of the best server for the model; only call this from the
+    engine's loop. The client is shared, so callers put keep_alive in their payloads.
+    """
+    return gui_instance.endpoint_pool.pick(model).client
+
+async def warm_model(gui_instance, model: str, keep_alive: str = DEFAULT_KEEP_ALIVE) -> tuple:
+    """
+    Preloads a model on the server its queries will go to, so the first real query
+    doesn't pay the model load time; returns (server URL, seconds it took).
+    """
+    start_time = time.perf_counter()
+
+    async def warm(endpoint):
+        await endpoint.client.warm_model(model, keep_alive)
+        return endpoint.url
+    url = await gui_instance.endpoint_pool.call(model, warm)
+    return url, time.perf_counter() - start_time
 
 def fetch_ollama_models(gui_instance):
-    """Fetches available models from the Ollama API and populates the combobox."""
+    """
+    Starts model discovery: every server in the URL field is checked on the async
+    engine and update_model_list runs when they have answered, so a server that is
+    down doesn't hold up the window.
+    """
+    urls = parse_endpoint_urls(gui_instance.ollama_url_entry.get())
+    if urls:
+        gui_instance.set_endpoint_urls(urls, check=False)
     gui_instance.status_var.set("Fetching models from Ollama...")
-    gui_instance.root.update_idletasks()
-    try:
-        url = f"{gui_instance.ollama_url.rstrip('/')}/api/tags"
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-        gui_instance.available_models = [model['name'] for model in data.get('models', [])]
-        
-        if gui_instance.available_models:
-            gui_instance.model_combobox['values'] = gui_instance.available_models
-            
-            if "qwen2.5-coder:3b" in gui_instance.available_models:
-                gui_instance.model_combobox.set("qwen2.5-coder:3b")
+    gui_instance.engine.submit(
+        gui_instance.endpoint_pool.check_all(),
+        lambda result, error: gui_instance._on_endpoints_checked(warm=True)
+    )
+
+def update_model_list(gui_instance) -> bool:
+    """
+    Fills the model combobox with the models of every server that answered its last
+    health check, keeping the current choice when it is still offered. When no server
+    answers, the last known list stays. Returns True if the list changed.
+    """
+    pool = gui_instance.endpoint_pool
+    models = pool.models()
+    if not models:
+        if any(endpoint.healthy for endpoint in pool.endpoints):
+            gui_instance.status_var.set("No Ollama models found. Is Ollama server running?")
+            if not gui_instance.available_models:
+                gui_instance.model_combobox.set("No models found.")
+        elif any(endpoint.healthy is False for endpoint in pool.endpoints):
+            if gui_instance.available_models:
+                gui_instance.status_var.set("Ollama server not reachable; showing the last known models.")
             else:
-                gui_instance.model_combobox.set(gui_instance.available_models[0])
-            
-            gui_instance.status_var.set("Models loaded.")
+                gui_instance.model_combobox.set("Ollama server not reachable.")
+                gui_instance.status_var.set("Error: Ollama server not reachable. Please check URL and server status.")
+        return False
+
+    gui_instance.model_digests = pool.model_digests()
+    gui_instance.response_cache.invalidate_stale(gui_instance.model_digests) # Drop answers from replaced models
+    changed = models != gui_instance.available_models
+    gui_instance.available_models = models
+    gui_instance.model_combobox['values'] = models
+    if gui_instance.model_combobox.get() not in models:
+        if "qwen2.5-coder:3b" in models:
+            gui_instance.model_combobox.set("qwen2.5-coder:3b")
         else:
-            gui_instance.model_combobox.set("No models found.")
-            gui_instance.status_var.set("No Ollama models found. Is Ollama server running?")
-    except requests.exceptions.ConnectionError:
-        gui_instance.model_combobox.set("Ollama server not reachable.")
-        gui_instance.status_var.set("Error: Ollama server not reachable. Please check URL and server status.")
-    except Exception as e:
-        gui_instance.model_combobox.set("Error loading models.")
-        gui_instance.status_var.set(f"Error fetching models: {str(e)}")
-    finally:
-        gui_instance.model_combobox.config(state="readonly")
-        gui_instance.root.update_idletasks()
+            gui_instance.model_combobox.set(models[0])
+    return changed
 
-def query_single_model(
+async def query_single_model(
     gui_instance,
     model: str,
     system_message: str,
@@ -43,25 +209,47 @@ def query_single_model(
     question: str,
     temperature: float,
     max_tokens: int,
-    ollama_url: str
+    ollama_url: str,
+    renderer=None,
+    stats: dict = None,
+    use_cache: bool = False,
+    replay_as_stream: bool = False,
+    on_chunk=None,
+    retrieval_k: int = 0,
+    embed_model: str = DEFAULT_EMBED_MODEL,
+    keep_alive: str = DEFAULT_KEEP_ALIVE
 ) -> str:
-    """Query a single Ollama model."""
-    url = f"{ollama_url.rstrip('/')}/api/chat"
-    
-    messages = [
-        {
-            "role": "system",
-            "content": system_message
-        },
-        {
-            "role": "user",
-            "content": f"Context: {context}\n\nQuestion: {question}"
-        }
-    ]
-
-    for entry in gui_instance.chat_history:
-        messages.append({"role": "user", "content": entry["prompt"]})
-        messages.append({"role": "assistant", "content": entry["response"]})
+    """
+    Query a single Ollama model; runs on the async engine's loop. The request goes to
+    the server gui_instance.endpoint_pool picks for the model, and to the next one if
+    it can't be reached; ollama_url is the first server in the list. By default the
+    response streams into the Results tab and the timings are stored in
+    gui_instance.last_query_stats; pass `renderer` and `stats` to stream into another
+    pane (e.g. when comparing models). Cancel the task to stop the answer.
+    With `use_cache`, deterministic (temperature 0) answers are served from the
+    response cache when the model, options and messages are unchanged. on_chunk(text),
+    if given, is called with every piece of the answer as well. With retrieval_k, the
+    k earlier snippets most similar to the question are added to the context.
+    """
+    renderer = renderer or gui_instance.stream_renderer
+    push = renderer.push
+    if on_chunk is not None:
+        push = lambda text: (renderer.push(text), on_chunk(text))
+    client = get_ollama_client(gui_instance, gui_instance.endpoint_pool.pick(model).url, keep_alive) # Blocking client for embeddings and summaries
+    context_report = {}
+    if retrieval_k:
+        context = await asyncio.to_thread(
+            _add_retrieved_snippets, gui_instance, client, embed_model, context, question, retrieval_k, context_report)
+    messages = await asyncio.to_thread( # May ask the model to summarize old turns
+        gui_instance.conversation_context.build_messages,
+        system_message,
+        context,
+        question,
+        list(gui_instance.chat_history), # Snapshot: the Tk thread appends finished turns meanwhile
+        num_ctx=max_tokens,
+        summarize=lambda previous, turns: summarize_turns(client, model, previous, turns),
+        report=context_report
+    )
     
     payload = {
         "model": model,
@@ -70,34 +258,142 @@ def query_single_model(
             "temperature": temperature,
             "num_ctx": max_tokens
         },
-        "stream": True
+        "stream": True,
+        "keep_alive": keep_alive
     }
     
-    headers = {
-        "Content-Type": "application/json"
+    request_start = time.perf_counter()
+    outcome = {"status": "cancelled"} # Filled in for the request log below
+    try:
+        cache_key = None
+        if use_cache and temperature == 0:
+            model_digest = gui_instance.model_digests.get(model, "")
+            cache_key = make_cache_key(model, model_digest, payload["options"], messages)
+            cached = gui_instance.response_cache.get(cache_key)
+            if cached is not None:
+                response_text = await _replay_cached_response(cached["response"], push, replay_as_stream)
+                query_stats = dict(
+                    cached.get("stats", {}),
+                    cache_hit=True,
+                    time_to_first_token=time.perf_counter() - request_start,
+                    total_time=time.perf_counter() - request_start
+                )
+                if stats is None:
+                    gui_instance.last_query_stats = query_stats
+                else:
+                    stats.update(query_stats)
+                outcome.update(status="ok", stats=query_stats, response=response_text)
+                return response_text
+
+        served_by = {}
+
+        async def stream_from(endpoint):
+            served_by["endpoint"] = endpoint.url
+            return await stream_chat_async(endpoint.client, payload, on_chunk=push) # Rendered in batches by the Tk main loop
+        result = await gui_instance.endpoint_pool.call(model, stream_from)
+
+        query_stats = dict(context_report, served_by, cache_hit=False)
+        query_stats.update((key, value) for key, value in result.items() if key not in ("response", "final_chunk", "stopped"))
+        if stats is None:
+            gui_instance.last_query_stats = query_stats
+        else:
+            stats.update(query_stats)
+        if cache_key and result["final_chunk"]: # Only complete answers are cached
+            gui_instance.response_cache.put(cache_key, model, gui_instance.model_digests.get(model, ""), result["response"], query_stats)
+        outcome.update(status="ok" if result["final_chunk"] else "incomplete", stats=query_stats, response=result["response"])
+        return result["response"]
+    except Exception as e:
+        outcome.update(status="error", error=str(e))
+        raise
+    finally:
+        _log_request(payload, outcome, time.perf_counter() - request_start)
+
+def _log_request(payload: dict, outcome: dict, elapsed: float):
+    """
+    Logs a chat request with its size, hash and timings but without its content,
+    unless trace mode is on; then the full payload is kept so it can be replayed.
+    """
+    stats = outcome.get("stats", {})
+    payload_bytes, payload_sha256 = digest(payload)
+    data = {
+        "event": "chat_request",
+        "request_id": uuid.uuid4().hex[:12],
+        "status": outcome["status"],
+        "model": payload["model"],
+        "endpoint": stats.get("endpoint"),
+        "cache_hit": stats.get("cache_hit"),
+        "message_count": len(payload["messages"]),
+        "payload_bytes": payload_bytes,
+        "payload_sha256": payload_sha256,
+        "options": payload["options"],
+        "time_to_first_token": stats.get("time_to_first_token"),
+        "total_time": elapsed,
+        "prompt_eval_count": stats.get("prompt_eval_count"),
+        "eval_count": stats.get("eval_count")
     }
-    
-    print("\n--- Ollama API Request Payload (Messages) ---")
-    print(json.dumps(messages, indent=2))
-    print("---------------------------------------------\n")
+    if "response" in outcome:
+        data["response_bytes"], data["response_sha256"] = digest(outcome["response"])
+    if "error" in outcome:
+        data["error"] = outcome["error"]
+    if trace_enabled():
+        data["payload"] = payload
+    message = (f"{payload['model']}: {data['message_count']} messages, {payload_bytes / 1024:.1f} KB, "
+               f"{outcome['status']} in {elapsed:.2f}s" + (f" via {data['endpoint']}" if data["endpoint"] else ""))
+    log.log(logging.WARNING if outcome["status"] == "error" else logging.INFO, message, extra={"data": data})
 
-    response = requests.post(url, data=json.dumps(payload), headers=headers, stream=True)
-    response.raise_for_status()
-    
-    full_response = []
-    for line in response.iter_lines():
-        if gui_instance.stop_event.is_set():
-            print("Stop event detected. Closing connection.")
-            response.close()
-            gui_instance.status_var.set("Generation stopped.")
-            break
-        if line:
-            chunk = json.loads(line.decode('utf-8'))
-            if 'message' in chunk and 'content' in chunk['message']:
-                content = chunk['message']['content']
-                full_response.append(content)
-                gui_instance.results_text.insert(tk.END, content)
-                gui_instance.results_text.see(tk.END)
-                gui_instance.root.update_idletasks()
-    
-    return ''.join(full_response)
\ No newline at end of file
+async def replay_request(gui_instance, payload: dict, renderer) -> str:
+    """Sends a logged request payload again, streaming the answer into the renderer; returns the answer."""
+    async def stream_from(endpoint):
+        return await stream_chat_async(endpoint.client, payload, on_chunk=renderer.push)
+    result = await gui_instance.endpoint_pool.call(payload["model"], stream_from)
+    return result["response"]
+
+def _add_retrieved_snippets(gui_instance, client, embed_model: str, context: str, question: str, k: int, report: dict) -> str:
+    """Appends the k stored snippets most relevant to the question to the context."""
+    try:
+        results = get_snippet_index(gui_instance, embed_model).search(client, question, k)
+    except Exception as e: # Missing embedding model or NumPy shouldn't block the query
+        log.warning(f"Snippet retrieval failed: {e}")
+        report["retrieval_error"] = str(e)
+        return context
+    report["snippets_retrieved"] = len(results)
+    if not results:
+        return context
+    return f"{context}\n\n{format_snippets(results)}" if context.strip() else format_snippets(results)
+
+async def _replay_cached_response(response_text: str, push, as_stream: bool) -> str:
+    """Pushes a cached answer to the renderer, either at once or in small timed pieces."""
+    if not as_stream:
+        push(response_text)
+        return response_text
+    piece_size = 16
+    for start in range(0, len(response_text), piece_size):
+        push(response_text[start:start + piece_size])
+        await asyncio.sleep(0.005)
+    return response_text
+
+def summarize_turns(client: OllamaClient, model: str, previous_summary: str, turns: list) -> str:
+    """Asks the model to fold older chat turns into a short running summary."""
+    transcript = "\n\n".join(f"User: {entry['prompt']}\nAssistant: {entry['response']}" for entry in turns)
+    if previous_summary:
+        transcript = f"Summary so far:\n{previous_summary}\n\nNew messages:\n{transcript}"
+    payload = {
+        "model": model,
+        "messages": [
+            {
+                "role": "system",
+                "content": "Summarize the conversation below in at most 200 words. Keep the user's goals, decisions, "
+                           "names of functions, classes and files, and any errors that were reported. Omit code bodies."
+            },
+            {
+                "role": "user",
+                "content": transcript
+            }
+        ],
+        "options": {
+            "temperature": 0,
+            "num_predict": 400
+        },
+        "stream": False
+    }
+    return client.chat(payload, stream=False).json().get('message', {}).get('content', '')
\ No newline at end of file
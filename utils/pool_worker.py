@@ -0,0 +1,40 @@
+"""
+Bootstrap script for warm worker interpreters (see utils/worker_pool.py).
+
+The worker imports the modules named on its command line, then blocks until the
+parent writes the path of a script to stdin. It runs that script as __main__,
+exactly like `python script.py`, and exits. Anything written to stdin after the
+path is left for the script's own input() calls.
+"""
+import os
+import runpy
+import sys
+import traceback
+
+def main():
+    for module_name in sys.argv[1:]:
+        try:
+            __import__(module_name)
+        except Exception:
+            pass # Preloading is best effort; the script will report a real ImportError itself
+
+    script_path = sys.stdin.readline().rstrip("\n")
+    if not script_path:
+        return # Parent closed the pipe while we were idle
+
+    sys.argv = [script_path]
+    sys.path[0] = os.path.dirname(os.path.abspath(script_path)) # Same sys.path as `python script.py`
+    try:
+        runpy.run_path(script_path, run_name="__main__")
+    except SystemExit:
+        raise
+    except BaseException:
+        exc_type, exc_value, exc_traceback = sys.exc_info()
+        # Hide the worker and runpy frames so the traceback matches a normal run
+        while exc_traceback and os.path.abspath(exc_traceback.tb_frame.f_code.co_filename) != os.path.abspath(script_path):
+            exc_traceback = exc_traceback.tb_next
+        traceback.print_exception(exc_type, exc_value, exc_traceback)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import ast
+import importlib.util
+import json
+import os
+import pkgutil
+import sys
+import threading
+
+from utils.app_paths import get_data_dir
+from utils.app_log import get_logger
+
+log = get_logger("precheck")
+
+INDEX_FILE = "module_index.json"
+IMPORT_ERRORS = {"ImportError", "ModuleNotFoundError", "Exception", "BaseException"} # Handlers that make an import optional
+
+class Problem:
+    """One issue found without running the code."""
+
+    def __init__(self, line: int, message: str, column: int = None):
+        self.line = line
+        self.column = column
+        self.message = message
+
+    def __str__(self) -> str:
+        return f"line {self.line}: {self.message}"
+
+class ModuleIndex:
+    """
+    Names of the top-level modules importable by this interpreter (the one generated
+    code runs on). Scanning sys.path takes a noticeable fraction of a second, so the
+    result is cached on disk and only rebuilt when a sys.path directory changes, e.g.
+    after a pip install.
+    """
+
+    def __init__(self, cache_path: str = None):
+        self.cache_path = cache_path or os.path.join(get_data_dir(), INDEX_FILE)
+        self._modules = None
+        self._lock = threading.Lock()
+
+    def load(self) -> set:
+        """Returns the module names, reading or building the index on first use."""
+        with self._lock:
+            if self._modules is None:
+                fingerprint = self._fingerprint()
+                self._modules = self._read_cache(fingerprint)
+                if self._modules is None:
+                    self._modules = self._scan()
+                    self._write_cache(fingerprint)
+            return self._modules
+
+    def is_importable(self, name: str) -> bool:
+        """Checks the index, then asks the import system in case something was installed since."""
+        if name in self.load():
+            return True
+        try:
+            found = importlib.util.find_spec(name) is not None
+        except (ImportError, ValueError):
+            found = False
+        if found:
+            self._modules.add(name)
+        return found
+
+    def _search_path(self) -> list:
+        return [path for path in sys.path if path and os.path.isdir(path)] # '' (the cwd) is left to find_spec
+
+    def _fingerprint(self) -> list:
+        return [sys.executable] + [[path, os.stat(path).st_mtime] for path in self._search_path()]
+
+    def _scan(self) -> set:
+        modules = set(sys.builtin_module_names)
+        modules.update(getattr(sys, "stdlib_module_names", ())) # Python 3.10+
+        modules.update(module.name for module in pkgutil.iter_modules(self._search_path()))
+        return modules
+
+    def _read_cache(self, fingerprint: list):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get("fingerprint") != fingerprint:
+            return None
+        return set(cached.get("modules", []))
+
+    def _write_cache(self, fingerprint: list):
+        try:
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": fingerprint, "modules": sorted(self._modules)}, f)
+        except OSError as e:
+            log.warning(f"Could not save the module index: {e}")
+
+def precheck_code(code: str, module_index: ModuleIndex = None) -> list:
+    """
+    Compiles the code and checks its imports without running it. Returns a list of
+    Problems; an empty list means nothing obviously wrong was found.
+    """
+    try:
+        tree = compile(code, "<generated>", "exec", flags=ast.PyCF_ONLY_AST)
+        compile(tree, "<generated>", "exec") # Catches errors the parser lets through, e.g. 'return' outside function
+    except SyntaxError as e:
+        return [Problem(e.lineno or 1, f"{type(e).__name__}: {e.msg}", e.offset)]
+    except ValueError as e: # e.g. null bytes in the source
+        return [Problem(1, str(e))]
+
+    if module_index is None:
+        return []
+    problems = []
+    for node, name in _required_imports(tree):
+        if not module_index.is_importable(name):
+            problems.append(Problem(node.lineno, f"module '{name}' is not installed", node.col_offset + 1))
+    return problems
+
+def _required_imports(tree: ast.AST):
+    """Yields (node, top-level module name) for absolute imports not guarded by try/except ImportError."""
+    guarded = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Try) and any(_catches_import_error(handler) for handler in node.handlers):
+            for statement in node.body:
+                guarded.update(id(child) for child in ast.walk(statement))
+    for node in ast.walk(tree):
+        if id(node) in guarded:
+            continue
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield node, alias.name.split(".")[0]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            yield node, node.module.split(".")[0]
+
+def _catches_import_error(handler: ast.ExceptHandler) -> bool:
+    if handler.type is None: # Bare except
+        return True
+    types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+    return any(isinstance(item, ast.Name) and item.id in IMPORT_ERRORS for item in types)
+
+def format_problems(problems: list) -> str:
+    """Problem list for the status bar and for repair prompts."""
+    return "\n".join(str(problem) for problem in problems)
+
+def build_repair_prompt(code: str, problems: list) -> str:
+    """Asks the model to fix code that failed the pre-check."""
+    return (
+        "The code you wrote fails before it can run:\n"
+        f"{format_problems(problems)}\n\n"
+        "Please fix it and reply with the complete corrected program in a single ```python block. "
+        "Only use modules from the Python standard library or ones the errors don't mention.\n\n"
+        f"```python\n{code}\n```"
+    )
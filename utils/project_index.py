@@ -0,0 +1,327 @@
+import ast
+import hashlib
+import mmap
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from utils.app_paths import get_data_dir
+
+ALWAYS_SKIPPED_DIRS = {".git", ".hg", ".svn", "__pycache__", "node_modules", ".venv", "venv", ".mypy_cache", ".pytest_cache", ".tox"}
+MAX_FILE_BYTES = 5 * 1024 * 1024 # Larger files are listed but not indexed
+MMAP_THRESHOLD = 256 * 1024 # Files at least this big are hashed and sliced through mmap instead of read()
+BINARY_SNIFF_BYTES = 8192
+MAX_ATTACH_CHARS = 12000 # Longest chunk attached to a query
+SYMBOL_PATTERN = re.compile(
+    rb"^[ \t]*(?:export[ \t]+)?(?:pub[ \t]+)?(?:async[ \t]+)?(?P<kind>def|class|function|func|fn|interface|struct|enum)[ \t]+(?P<name>[A-Za-z_]\w*)",
+    re.MULTILINE
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    lines INTEGER NOT NULL,
+    indexed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    start_line INTEGER NOT NULL,
+    end_line INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS symbols_by_path ON symbols(path);
+"""
+
+class IgnoreRules:
+    """The .gitignore patterns that apply inside one directory; later rules win, '!' re-includes."""
+
+    def __init__(self, rules: list = None):
+        self.rules = rules or [] # (regex, negate, dir_only)
+
+    def extended(self, gitignore_path: str, base: str) -> "IgnoreRules":
+        """Rules for a subdirectory: these rules plus the ones in its own .gitignore, if any."""
+        try:
+            with open(gitignore_path, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return self
+        rules = list(self.rules)
+        for line in lines:
+            rule = _compile_gitignore_line(line, base)
+            if rule:
+                rules.append(rule)
+        return IgnoreRules(rules)
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        ignored = False
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                ignored = not negate
+        return ignored
+
+def _compile_gitignore_line(line: str, base: str):
+    """Translates one .gitignore line, relative to directory base, into a path regex."""
+    line = line.rstrip()
+    if not line or line.startswith("#"):
+        return None
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    line = line.replace("\\#", "#").replace("\\!", "!")
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    anchored = "/" in line # A slash anywhere but the end ties the pattern to the .gitignore's directory
+    line = line.lstrip("/")
+    if not line:
+        return None
+    parts, i = [], 0
+    while i < len(line):
+        if line.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif line.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif line[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif line[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif line[i] == "[" and "]" in line[i + 1:]:
+            end = line.index("]", i + 1)
+            parts.append("[" + line[i + 1:end].replace("!", "^", 1) + "]")
+            i = end + 1
+        else:
+            parts.append(re.escape(line[i]))
+            i += 1
+    prefix = re.escape(base + "/") if base else ""
+    pattern = prefix + ("" if anchored else "(?:.*/)?") + "".join(parts) + "$"
+    return re.compile(pattern), negate, dir_only
+
+def _count_newlines(data, start: int = 0, end: int = None) -> int:
+    """Counts newlines in data[start:end] a megabyte at a time (mmap objects have no count())."""
+    end = len(data) if end is None else end
+    step = 1 << 20
+    return sum(data[position:min(position + step, end)].count(b"\n") for position in range(start, end, step))
+
+def _count_lines(data) -> int:
+    if not len(data):
+        return 0
+    return _count_newlines(data) + (0 if data[-1:] == b"\n" else 1)
+
+def extract_symbols(path: str, data) -> list:
+    """(name, kind, start_line, end_line) for functions and classes; ast for Python, a regex otherwise."""
+    total_lines = _count_lines(data)
+    if path.endswith(".py"):
+        try:
+            tree = ast.parse(bytes(data))
+        except (SyntaxError, ValueError):
+            tree = None
+        if tree is not None:
+            symbols = []
+            def visit(nodes, prefix):
+                for node in nodes:
+                    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                        kind = "class" if isinstance(node, ast.ClassDef) else "def"
+                        start = node.decorator_list[0].lineno if node.decorator_list else node.lineno
+                        symbols.append((prefix + node.name, kind, start, node.end_lineno or node.lineno))
+                        if isinstance(node, ast.ClassDef):
+                            visit(node.body, f"{prefix}{node.name}.")
+            visit(tree.body, "")
+            return symbols
+
+    symbols = []
+    line, offset = 1, 0
+    for match in SYMBOL_PATTERN.finditer(data):
+        line += _count_newlines(data, offset, match.start()) # Counted incrementally between matches
+        offset = match.start()
+        if symbols:
+            name, kind, start, _ = symbols[-1]
+            symbols[-1] = (name, kind, start, max(start, line - 1)) # A symbol runs up to the next one
+        symbols.append((match.group("name").decode("utf-8", "replace"), match.group("kind").decode(), line, total_lines))
+    return symbols
+
+class ProjectIndex:
+    """
+    Incremental index of a project folder: every file's size, mtime and content hash,
+    plus the functions and classes it defines. Updating only stats the files and
+    re-reads the ones whose size or mtime changed, so re-indexing after a small edit
+    is cheap even for large repositories. Stored in SQLite per project folder.
+    """
+
+    def __init__(self, root: str, db_path: str = None):
+        self.root = os.path.abspath(root)
+        key = hashlib.sha1(self.root.encode("utf-8")).hexdigest()[:16]
+        self.db_path = db_path or os.path.join(get_data_dir("projects"), f"{key}.sqlite3")
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+        self._connection.commit()
+
+    def _walk(self):
+        """Yields (relative path, stat result) for every file not excluded by .gitignore."""
+        root_rules = IgnoreRules().extended(os.path.join(self.root, ".gitignore"), "")
+        stack = [(self.root, "", root_rules)]
+        while stack:
+            directory, rel_dir, rules = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name in ALWAYS_SKIPPED_DIRS or rules.is_ignored(rel_path, True):
+                            continue
+                        sub_rules = rules.extended(os.path.join(entry.path, ".gitignore"), rel_path)
+                        stack.append((entry.path, rel_path, sub_rules))
+                    elif entry.is_file(follow_symlinks=False) and not rules.is_ignored(rel_path, False):
+                        yield rel_path, entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+
+    def _read(self, rel_path: str, size: int):
+        """Returns (hash, line count, symbols, indexed) for a changed file."""
+        path = os.path.join(self.root, rel_path)
+        if size == 0:
+            return hashlib.blake2b(b"").hexdigest(), 0, [], True
+        with open(path, "rb") as f:
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return self._analyze(rel_path, data, size)
+            return self._analyze(rel_path, f.read(), size)
+
+    def _analyze(self, rel_path: str, data, size: int):
+        digest = hashlib.blake2b(data).hexdigest()
+        if size > MAX_FILE_BYTES or b"\0" in data[:BINARY_SNIFF_BYTES]:
+            return digest, 0, [], False # Too big or binary: tracked so it isn't re-read, but not searchable
+        return digest, _count_lines(data), extract_symbols(rel_path, data), True
+
+    def update(self, on_progress=None) -> dict:
+        """
+        Brings the index up to date with the folder and returns counts and timing.
+        on_progress(done, total) is called while changed files are read.
+        """
+        start_time = time.perf_counter()
+        with self._lock:
+            known = {row[0]: row[1:] for row in self._connection.execute("SELECT path, mtime_ns, size, hash FROM files")}
+        seen = set()
+        changed = []
+        for rel_path, stat in self._walk():
+            seen.add(rel_path)
+            previous = known.get(rel_path)
+            if previous is None or previous[0] != stat.st_mtime_ns or previous[1] != stat.st_size:
+                changed.append((rel_path, stat, previous))
+        removed = [path for path in known if path not in seen]
+
+        rewritten = 0
+        with self._lock:
+            with self._connection: # One transaction
+                for path in removed:
+                    self._connection.execute("DELETE FROM files WHERE path = ?", (path,))
+                    self._connection.execute("DELETE FROM symbols WHERE path = ?", (path,))
+                for done, (rel_path, stat, previous) in enumerate(changed, start=1):
+                    if on_progress and done % 200 == 0:
+                        on_progress(done, len(changed))
+                    try:
+                        digest, lines, symbols, indexed = self._read(rel_path, stat.st_size)
+                    except (OSError, ValueError):
+                        continue
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO files(path, name, mtime_ns, size, hash, lines, indexed) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (rel_path, rel_path.rsplit("/", 1)[-1], stat.st_mtime_ns, stat.st_size, digest, lines, int(indexed))
+                    )
+                    if previous is not None and previous[2] == digest:
+                        continue # Touched but unchanged: symbols are still valid
+                    rewritten += 1
+                    self._connection.execute("DELETE FROM symbols WHERE path = ?", (rel_path,))
+                    self._connection.executemany(
+                        "INSERT INTO symbols(path, name, kind, start_line, end_line) VALUES (?, ?, ?, ?, ?)",
+                        [(rel_path, *symbol) for symbol in symbols]
+                    )
+        return {
+            "files": len(seen),
+            "changed": rewritten,
+            "removed": len(removed),
+            "seconds": time.perf_counter() - start_time
+        }
+
+    def search(self, query: str, limit: int = 100) -> list:
+        """
+        Files and symbols whose path or name contains every word of the query, best
+        matches (exact symbol names, then short names) first.
+        """
+        words = [word.lower() for word in query.split()]
+        if not words:
+            return []
+        conditions = " AND ".join("lower(path || ' ' || name) LIKE ?" for _ in words)
+        params = [f"%{word}%" for word in words]
+        last_word = words[-1]
+        sql = f"""
+            SELECT path, name, kind, start_line, end_line FROM (
+                SELECT path, name, kind, start_line, end_line FROM symbols
+                UNION ALL
+                SELECT path, name, 'file', 1, lines FROM files WHERE indexed = 1
+            )
+            WHERE {conditions}
+            ORDER BY lower(name) = ? DESC, lower(name) LIKE ? DESC, length(name), path
+            LIMIT ?
+        """
+        with self._lock:
+            rows = self._connection.execute(sql, params + [last_word, f"{last_word}%", limit]).fetchall()
+        return [{"path": row[0], "name": row[1], "kind": row[2], "start_line": row[3], "end_line": row[4]} for row in rows]
+
+    def stats(self) -> dict:
+        with self._lock:
+            files, indexed = self._connection.execute("SELECT COUNT(*), COALESCE(SUM(indexed), 0) FROM files").fetchone()
+            symbols = self._connection.execute("SELECT COUNT(*) FROM symbols").fetchone()[0]
+        return {"files": files, "indexed": indexed, "symbols": symbols}
+
+    def read_chunk(self, rel_path: str, start_line: int, end_line: int, max_chars: int = MAX_ATTACH_CHARS) -> str:
+        """
+        Reads lines start_line..end_line (1-based, inclusive) from the file as it is now.
+        Large files are sliced through mmap, so only the requested range is decoded.
+        """
+        path = os.path.join(self.root, rel_path)
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    chunk = _slice_lines(data, start_line, end_line)
+            else:
+                chunk = _slice_lines(f.read(), start_line, end_line)
+        text = chunk.decode("utf-8", errors="replace")
+        if len(text) > max_chars:
+            text = text[:max_chars] + "\n... (truncated)"
+        return text
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+def _slice_lines(data, start_line: int, end_line: int) -> bytes:
+    """Returns the bytes of lines start_line..end_line by scanning for newlines."""
+    position = 0
+    for _ in range(start_line - 1):
+        position = data.find(b"\n", position) + 1
+        if position == 0:
+            return b""
+    end = position
+    for _ in range(end_line - start_line + 1):
+        end = data.find(b"\n", end) + 1
+        if end == 0:
+            end = len(data)
+            break
+    return data[position:end]
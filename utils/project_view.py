@@ -0,0 +1,183 @@
+import os
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+
+from utils.project_index import ProjectIndex
+from utils.app_log import get_logger
+
+log = get_logger("project_view")
+
+SEARCH_LIMIT = 200 # Results shown per search
+LANGUAGES = {
+    ".py": "python", ".js": "javascript", ".ts": "typescript", ".go": "go", ".rs": "rust",
+    ".java": "java", ".c": "c", ".h": "c", ".cpp": "cpp", ".rb": "ruby", ".sh": "bash",
+    ".json": "json", ".toml": "toml", ".yaml": "yaml", ".yml": "yaml", ".md": "markdown"
+}
+
+class ProjectView:
+    """
+    Project folder browser: indexes a folder in the background (only changed files are
+    re-read), searches its files and symbols, and keeps a list of attached files or
+    symbols whose current text is added to the context of each query.
+    """
+
+    def __init__(self, parent, engine):
+        self.engine = engine # Indexing runs on the async engine's thread pool
+        self.index = None
+        self.attachments = [] # Dicts with path, name, kind, start_line, end_line
+        self._results = {} # Treeview iid -> search result
+        self._indexing = False
+
+        folder_frame = ttk.Frame(parent)
+        folder_frame.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Label(folder_frame, text="Project folder:").pack(side=tk.LEFT)
+        self.folder_var = tk.StringVar()
+        ttk.Entry(folder_frame, textvariable=self.folder_var, width=60, state="readonly").pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(folder_frame, text="Open Folder...", command=self.choose_folder).pack(side=tk.LEFT, padx=(5, 0))
+        self.reindex_button = ttk.Button(folder_frame, text="Re-index", command=self.reindex, state=tk.DISABLED)
+        self.reindex_button.pack(side=tk.LEFT, padx=(5, 0))
+        self.status_var = tk.StringVar(value="No folder open.")
+        ttk.Label(folder_frame, textvariable=self.status_var).pack(side=tk.RIGHT)
+
+        search_frame = ttk.Frame(parent)
+        search_frame.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Label(search_frame, text="Search files and symbols:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=50)
+        search_entry.pack(side=tk.LEFT, padx=(5, 0))
+        search_entry.bind("<Return>", lambda event: self.search())
+        ttk.Button(search_frame, text="Search", command=self.search).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(search_frame, text="Attach Selected", command=self.attach_selected).pack(side=tk.RIGHT)
+
+        panes = ttk.PanedWindow(parent, orient=tk.VERTICAL)
+        panes.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        results_frame = ttk.Frame(panes)
+        columns = ("path", "symbol", "kind", "lines")
+        self.results_tree = ttk.Treeview(results_frame, columns=columns, show="headings")
+        for column, heading, width in zip(columns, ("Path", "Symbol", "Kind", "Lines"), (450, 250, 80, 100)):
+            self.results_tree.heading(column, text=heading)
+            self.results_tree.column(column, width=width, stretch=(column == "path"))
+        results_scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=self.results_tree.yview)
+        self.results_tree.configure(yscrollcommand=results_scrollbar.set)
+        self.results_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        results_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.results_tree.bind("<Double-1>", lambda event: self.attach_selected())
+        panes.add(results_frame, weight=3)
+
+        attached_frame = ttk.Frame(panes)
+        attached_controls = ttk.Frame(attached_frame)
+        attached_controls.pack(fill=tk.X)
+        self.attached_count_var = tk.StringVar(value="Attached to queries: none")
+        ttk.Label(attached_controls, textvariable=self.attached_count_var).pack(side=tk.LEFT)
+        ttk.Button(attached_controls, text="Remove All", command=self.remove_all).pack(side=tk.RIGHT)
+        ttk.Button(attached_controls, text="Remove", command=self.remove_selected).pack(side=tk.RIGHT, padx=(0, 5))
+        self.attached_list = tk.Listbox(attached_frame, height=6, selectmode=tk.EXTENDED)
+        self.attached_list.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+        panes.add(attached_frame, weight=1)
+
+    def choose_folder(self):
+        folder = filedialog.askdirectory(title="Open Project Folder")
+        if folder:
+            self.open_folder(folder)
+
+    def open_folder(self, folder: str):
+        """Switches to another project folder and indexes it."""
+        if self._indexing:
+            messagebox.showinfo("Project", "Wait for the current indexing to finish.")
+            return
+        if self.index:
+            self.index.close()
+        self.index = ProjectIndex(folder)
+        self.folder_var.set(self.index.root)
+        self.results_tree.delete(*self.results_tree.get_children())
+        self._results = {}
+        self.remove_all()
+        self.reindex()
+
+    def reindex(self):
+        """Updates the index on a background thread; only files whose size or mtime changed are read."""
+        if not self.index or self._indexing:
+            return
+        self._indexing = True
+        self.reindex_button.config(state=tk.DISABLED)
+        self.status_var.set("Scanning...")
+        self.engine.submit_blocking(self._reindex_task, self.index, on_done=self._reindex_done)
+
+    def _reindex_task(self, index):
+        summary = index.update(on_progress=lambda done, total: self.engine.call_ui(
+            self.status_var.set, f"Indexing {done}/{total} changed files..."))
+        return summary, index.stats()
+
+    def _reindex_done(self, result, error):
+        self._indexing = False
+        self.reindex_button.config(state=tk.NORMAL)
+        if error is not None:
+            self.status_var.set(f"Indexing failed: {error}")
+            return
+        summary, stats = result
+        self.status_var.set(f"{stats['files']} files, {stats['symbols']} symbols "
+                            f"({summary['changed']} changed, {summary['removed']} removed in {summary['seconds']:.2f}s)")
+        if self.search_var.get().strip():
+            self.search()
+
+    def search(self):
+        if not self.index:
+            return
+        self.results_tree.delete(*self.results_tree.get_children())
+        self._results = {}
+        for result in self.index.search(self.search_var.get(), SEARCH_LIMIT):
+            symbol = "" if result["kind"] == "file" else result["name"]
+            iid = self.results_tree.insert("", tk.END, values=(
+                result["path"], symbol, result["kind"], f"{result['start_line']}-{result['end_line']}"))
+            self._results[iid] = result
+
+    def attach_selected(self):
+        """Adds the selected results to the attachments; their text is read when a query is sent."""
+        for iid in self.results_tree.selection():
+            result = self._results[iid]
+            if result not in self.attachments:
+                self.attachments.append(result)
+                self.attached_list.insert(tk.END, _describe(result))
+        self._update_attached_count()
+
+    def remove_selected(self):
+        for position in reversed(self.attached_list.curselection()):
+            self.attached_list.delete(position)
+            del self.attachments[position]
+        self._update_attached_count()
+
+    def remove_all(self):
+        self.attached_list.delete(0, tk.END)
+        self.attachments = []
+        self._update_attached_count()
+
+    def _update_attached_count(self):
+        count = len(self.attachments)
+        self.attached_count_var.set(f"Attached to queries: {count}" if count else "Attached to queries: none")
+
+    def attachments_context(self) -> str:
+        """Context section with the current text of every attachment."""
+        if not self.index or not self.attachments:
+            return ""
+        sections = []
+        for attachment in self.attachments:
+            try:
+                text = self.index.read_chunk(attachment["path"], attachment["start_line"], attachment["end_line"])
+            except OSError as e:
+                log.warning(f"Could not read attached file {attachment['path']}: {e}")
+                continue
+            language = LANGUAGES.get(os.path.splitext(attachment["path"])[1].lower(), "")
+            sections.append(f"{_describe(attachment)}\n```{language}\n{text.rstrip()}\n```")
+        return "Project files:\n\n" + "\n\n".join(sections) if sections else ""
+
+    def close(self):
+        if self.index:
+            self.index.close()
+
+def _describe(result: dict) -> str:
+    """File: path (lines a-b), with the symbol name for symbol attachments."""
+    lines = f"lines {result['start_line']}-{result['end_line']}"
+    if result["kind"] == "file":
+        return f"File: {result['path']} ({lines})"
+    return f"File: {result['path']} ({result['kind']} {result['name']}, {lines})"
@@ -0,0 +1,89 @@
+import tkinter as tk
+from tkinter import ttk
+
+REFRESH_INTERVAL_MS = 500 # Wait and run times tick while jobs are pending
+
+class QueueView:
+    """
+    Table of the prompt queue: each job's priority, model, status, time spent waiting
+    and time spent running, with controls to cancel jobs, show a job's answer in the
+    Results tab and change how many jobs run at once per server.
+    """
+
+    def __init__(self, parent, scheduler, on_show=None):
+        self.scheduler = scheduler
+        self.on_show = on_show # Called with a job to show its answer in the Results tab
+        self._after_id = None
+
+        controls = ttk.Frame(parent)
+        controls.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Label(controls, text="Parallel per server:").pack(side=tk.LEFT)
+        self.limit_var = tk.StringVar(value=str(scheduler.limit_per_server))
+        limit_spinbox = ttk.Spinbox(controls, from_=1, to=16, textvariable=self.limit_var, width=4, command=self._apply_limit)
+        limit_spinbox.pack(side=tk.LEFT, padx=(5, 0))
+        limit_spinbox.bind("<Return>", lambda event: self._apply_limit())
+        self.summary_var = tk.StringVar()
+        ttk.Label(controls, textvariable=self.summary_var).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Button(controls, text="Clear Finished", command=scheduler.clear_finished).pack(side=tk.RIGHT)
+        ttk.Button(controls, text="Cancel Selected", command=self._cancel_selected).pack(side=tk.RIGHT, padx=(0, 5))
+        ttk.Button(controls, text="Show in Results", command=self._show_selected).pack(side=tk.RIGHT, padx=(0, 5))
+
+        columns = ("id", "priority", "model", "prompt", "status", "wait", "run")
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings")
+        for column, heading, width in zip(columns, ("#", "Priority", "Model", "Prompt", "Status", "Waited", "Ran"), (40, 70, 150, 420, 80, 70, 70)):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, stretch=(column == "prompt"))
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.tree.bind("<Double-1>", lambda event: self._show_selected())
+
+    def refresh(self):
+        """Brings the table in line with the scheduler and keeps ticking while jobs are pending."""
+        if self._after_id is not None:
+            self.tree.after_cancel(self._after_id)
+            self._after_id = None
+        listed = set(self.tree.get_children())
+        current = set()
+        for job in self.scheduler.jobs:
+            iid = str(job.id)
+            current.add(iid)
+            values = (
+                job.id,
+                job.priority,
+                job.inputs["model"],
+                " ".join(job.inputs["question"].split())[:200],
+                job.status if not job.error else f"{job.status}: {job.error[:60]}",
+                f"{job.wait_time:.1f}s",
+                f"{job.run_time:.1f}s" if job.started_at else ""
+            )
+            if iid in listed:
+                self.tree.item(iid, values=values)
+            else:
+                self.tree.insert("", tk.END, iid=iid, values=values)
+        stale = listed - current
+        if stale:
+            self.tree.delete(*stale)
+
+        queued, running = len(self.scheduler.queued()), len(self.scheduler.running())
+        self.summary_var.set(f"{running} running, {queued} waiting")
+        if queued or running:
+            self._after_id = self.tree.after(REFRESH_INTERVAL_MS, self.refresh)
+
+    def _selected_jobs(self) -> list:
+        selected = set(self.tree.selection())
+        return [job for job in self.scheduler.jobs if str(job.id) in selected]
+
+    def _cancel_selected(self):
+        for job in self._selected_jobs():
+            self.scheduler.cancel(job)
+
+    def _show_selected(self):
+        jobs = self._selected_jobs()
+        if jobs and self.on_show:
+            self.on_show(jobs[0])
+
+    def _apply_limit(self):
+        try:
+            self.scheduler.set_limit(int(self.limit_var.get()))
+        except ValueError:
+            pass
+        self.refresh()
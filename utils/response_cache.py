@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from utils.app_paths import get_data_dir
+
+DEFAULT_MAX_ENTRIES = 500
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024 # 50 MB of cached responses
+INDEX_FILE = "index.json"
+
+def make_cache_key(model: str, digest: str, options: dict, messages: list) -> str:
+    """Hash of everything that determines a deterministic model answer."""
+    material = json.dumps(
+        {"model": model, "digest": digest, "options": options, "messages": messages},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """
+    On-disk cache of complete model responses with LRU eviction. Each entry is stored
+    as its own JSON file; a small index keeps sizes, model digests and access times.
+    """
+
+    def __init__(self, cache_dir: str = None, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or get_data_dir("response_cache")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    def _load_index(self) -> dict:
+        """Reads the index, dropping entries whose files have gone missing."""
+        try:
+            with open(os.path.join(self.cache_dir, INDEX_FILE), "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {key: meta for key, meta in index.items() if os.path.exists(self._entry_path(key))}
+
+    def _save_index(self):
+        """Writes the index atomically."""
+        path = os.path.join(self.cache_dir, INDEX_FILE)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(temp_path, path)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str):
+        """Returns the cached entry ({"response", "stats"}) or None, updating hit/miss counters."""
+        with self._lock:
+            meta = self._index.get(key)
+            if meta is None:
+                self.misses += 1
+                return None
+            try:
+                with open(self._entry_path(key), "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                self._remove(key)
+                self._save_index()
+                self.misses += 1
+                return None
+            meta["last_used"] = time.time()
+            self._save_index()
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, model: str, digest: str, response: str, stats: dict = None):
+        """Stores a response and evicts least recently used entries beyond the limits."""
+        entry = {"model": model, "digest": digest, "response": response, "stats": stats or {}, "created": time.time()}
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            with open(self._entry_path(key), "wb") as f:
+                f.write(data)
+            self._index[key] = {"model": model, "digest": digest, "size": len(data), "last_used": time.time()}
+            self._evict()
+            self._save_index()
+
+    def invalidate_stale(self, model_digests: dict) -> int:
+        """
+        Drops entries whose model is now reported with a different digest (it was pulled
+        again). A model missing from model_digests is kept: its server may just be down.
+        """
+        with self._lock:
+            stale = [key for key, meta in self._index.items()
+                     if meta["model"] in model_digests and model_digests[meta["model"]] != meta["digest"]]
+            for key in stale:
+                self._remove(key)
+            if stale:
+                self._save_index()
+            return len(stale)
+
+    def clear(self):
+        """Removes every cached entry."""
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+            self._save_index()
+
+    def total_bytes(self) -> int:
+        return sum(meta["size"] for meta in self._index.values())
+
+    def stats_text(self) -> str:
+        """Hit/miss counters for the status bar."""
+        return f"cache {self.hits} hits / {self.misses} misses, {len(self._index)} entries"
+
+    def _evict(self):
+        """Removes least recently used entries until both limits are met."""
+        total = self.total_bytes()
+        by_age = sorted(self._index, key=lambda key: self._index[key]["last_used"])
+        while by_age and (len(self._index) > self.max_entries or total > self.max_bytes):
+            key = by_age.pop(0)
+            total -= self._index[key]["size"]
+            self._remove(key)
+
+    def _remove(self, key: str):
+        self._index.pop(key, None)
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+np = None # NumPy, imported when the first index is opened; it costs ~0.1s at startup otherwise
+
+from utils.app_paths import get_data_dir
+from utils.code_blocks import CodeBlockParser
+from utils.app_log import get_logger
+
+log = get_logger("retrieval")
+
+DEFAULT_EMBED_MODEL = "nomic-embed-text"
+DEFAULT_TOP_K = 4
+EMBED_BATCH_SIZE = 32 # Texts per /api/embed request
+MIN_SCORE = 0.3 # Cosine similarity below which a snippet isn't worth the prompt space
+MAX_SNIPPET_CHARS = 2000 # Longer texts are cut before embedding and injecting
+VECTORS_FILE = "vectors.npy"
+SNIPPETS_FILE = "snippets.json"
+
+def _import_numpy() -> bool:
+    """Imports NumPy on first use; retrieval is unavailable without it."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def snippets_from_turn(prompt: str, response: str) -> list:
+    """
+    Splits a chat turn into retrievable snippets: one per code block (labelled with the
+    question it answered), or the question and answer when there is no code.
+    """
+    parser = CodeBlockParser()
+    parser.feed(response)
+    parser.close()
+    question = " ".join(prompt.split())[:300]
+    blocks = [block for block in parser.blocks if block.code.strip()]
+    if not blocks:
+        return [f"Q: {question}\nA: {response.strip()[:MAX_SNIPPET_CHARS]}"]
+    return [f"# {question}\n```{block.language}\n{block.code[:MAX_SNIPPET_CHARS]}\n```" for block in blocks]
+
+class SnippetIndex:
+    """
+    On-disk vector index of past snippets for one embedding model: a float32 NumPy
+    matrix of unit vectors plus a JSON list of the snippets. Snippets are keyed by
+    content hash, so nothing is embedded twice.
+    """
+
+    def __init__(self, model: str = DEFAULT_EMBED_MODEL, index_dir: str = None):
+        if not _import_numpy():
+            raise RuntimeError("Snippet retrieval needs NumPy (pip install numpy).")
+        self.model = model
+        self.index_dir = index_dir or get_data_dir("retrieval", re.sub(r"[^\w.-]", "_", model))
+        self._lock = threading.Lock()
+        self._query_cache = {} # Query hash -> vector, for repeated questions
+        self.snippets, self.vectors = self._load()
+        self._hashes = {snippet["hash"] for snippet in self.snippets}
+
+    def __len__(self) -> int:
+        return len(self.snippets)
+
+    def _load(self):
+        try:
+            with open(os.path.join(self.index_dir, SNIPPETS_FILE), "r", encoding="utf-8") as f:
+                snippets = json.load(f)
+            vectors = np.load(os.path.join(self.index_dir, VECTORS_FILE))
+            if len(snippets) == len(vectors):
+                return snippets, vectors
+            log.warning("Snippet index is inconsistent; starting a new one.")
+        except (OSError, ValueError):
+            pass
+        return [], None
+
+    def _save(self):
+        """Writes both files atomically (vectors first, so a crash leaves them consistent or detectably not)."""
+        vectors_path = os.path.join(self.index_dir, VECTORS_FILE)
+        with open(vectors_path + ".tmp", "wb") as f:
+            np.save(f, self.vectors)
+        os.replace(vectors_path + ".tmp", vectors_path)
+        snippets_path = os.path.join(self.index_dir, SNIPPETS_FILE)
+        with open(snippets_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.snippets, f)
+        os.replace(snippets_path + ".tmp", snippets_path)
+
+    def _embed(self, client, texts: list):
+        """Embeds texts in batches and returns them as a matrix of unit vectors."""
+        rows = []
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            rows.extend(client.embed(self.model, texts[start:start + EMBED_BATCH_SIZE]))
+        matrix = np.asarray(rows, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12) # Unit vectors: cosine similarity is a dot product
+
+    def add(self, client, texts: list) -> int:
+        """Embeds and stores the texts not already in the index; returns how many were added."""
+        with self._lock:
+            new = {}
+            for text in texts:
+                key = content_hash(text)
+                if key not in self._hashes and key not in new:
+                    new[key] = text
+        if not new:
+            return 0
+        vectors = self._embed(client, list(new.values())) # Network call outside the lock
+        with self._lock:
+            now = time.time()
+            keys = list(new)
+            keep = [i for i, key in enumerate(keys) if key not in self._hashes] # Another thread may have added some
+            for i in keep:
+                self.snippets.append({"hash": keys[i], "text": new[keys[i]], "created": now})
+                self._hashes.add(keys[i])
+            if not keep:
+                return 0
+            vectors = vectors[keep]
+            self.vectors = vectors if self.vectors is None else np.vstack([self.vectors, vectors])
+            self._save()
+            return len(keep)
+
+    def search(self, client, query: str, k: int = DEFAULT_TOP_K, min_score: float = MIN_SCORE) -> list:
+        """Returns up to k (score, text) pairs most similar to the query, best first."""
+        with self._lock:
+            if self.vectors is None or not len(self.snippets):
+                return []
+        key = content_hash(query)
+        query_vector = self._query_cache.get(key)
+        if query_vector is None:
+            query_vector = self._embed(client, [query])[0]
+            self._query_cache[key] = query_vector
+        with self._lock:
+            scores = self.vectors @ query_vector
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k] # Partial sort: only the k best are ordered
+            top = top[np.argsort(-scores[top])]
+            return [(float(scores[i]), self.snippets[i]["text"]) for i in top if scores[i] >= min_score]
+
+def format_snippets(results: list) -> str:
+    """Context section listing the retrieved snippets."""
+    return "Relevant snippets from earlier conversations:\n\n" + "\n\n".join(text for _, text in results)
+
+def get_snippet_index(gui_instance, model: str) -> SnippetIndex:
+    """Returns the GUI's snippet index for the embedding model, loading it on first use."""
+    with gui_instance.snippet_index_lock:
+        index = gui_instance.snippet_index
+        if index is None or index.model != model:
+            index = SnippetIndex(model)
+            gui_instance.snippet_index = index
+        return index
+
+def index_turn(gui_instance, client, model: str, prompt: str, response: str):
+    """Background task: embeds the snippets of a finished turn."""
+    try:
+        get_snippet_index(gui_instance, model).add(client, snippets_from_turn(prompt, response))
+    except Exception as e:
+        log.warning(f"Could not index the answer for retrieval: {e}")
@@ -0,0 +1,128 @@
+import tkinter as tk
+from tkinter import ttk, scrolledtext
+
+from utils.stream_renderer import OutputRenderer
+
+STATS_INTERVAL_MS = 1000 # Elapsed time and memory of running programs tick at this rate
+STATUS_MARKS = {"queued": "…", "running": "▶", "done": "✓", "failed": "✗", "stopped": "■"}
+
+class RunTab:
+    """
+    One output tab: a read-only text pane with its OutputRenderer and a status line.
+    A tab shows either a CodeRun or another engine operation (e.g. a test session).
+    """
+
+    def __init__(self, notebook, root, title: str, run=None):
+        self.run = run
+        self.operation = None # Engine operation stopped by Stop Code, for tabs without a run
+        self.title = title
+        self.frame = ttk.Frame(notebook)
+        self.status_var = tk.StringVar()
+        ttk.Label(self.frame, textvariable=self.status_var).pack(fill=tk.X, padx=5, pady=(5, 0))
+        self.text = scrolledtext.ScrolledText(self.frame, width=110, height=10)
+        self.text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.text.tag_config("stderr", foreground="red")
+        self.text.config(state=tk.DISABLED) # Make it read-only
+        self.renderer = OutputRenderer(root, self.text) # Batched, size-capped output with spill file
+        self.renderer.start()
+        notebook.add(self.frame, text=title)
+
+class RunView:
+    """
+    Code Execution Output as a notebook with one tab per run, so several programs
+    (or candidate solutions) can run and be compared side by side. Each tab shows the
+    run's output, its state, elapsed time and memory while it runs, and its resource
+    report once it has ended.
+    """
+
+    def __init__(self, parent, root):
+        self.root = root
+        self.tabs = [] # RunTab objects in tab order
+        self._after_id = None
+        self.notebook = ttk.Notebook(parent)
+        self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+    def add_tab(self, title: str, run=None) -> RunTab:
+        """Opens a tab and selects it."""
+        tab = RunTab(self.notebook, self.root, title, run)
+        self.tabs.append(tab)
+        self.notebook.select(tab.frame)
+        return tab
+
+    def add_run(self, run) -> RunTab:
+        """Opens a tab for the run and routes the run's output to it."""
+        tab = self.add_tab(run.title, run)
+        run.renderer = tab.renderer
+        return tab
+
+    def add_output(self, title: str, stdout: str, stderr: str, status: str) -> RunTab:
+        """Opens a tab with the output of a program that was run elsewhere (e.g. by auto-fix)."""
+        tab = self.add_tab(title)
+        tab.renderer.push(stdout)
+        tab.renderer.push(stderr, "stderr")
+        tab.renderer.finish()
+        tab.status_var.set(status)
+        return tab
+
+    def selected(self) -> RunTab:
+        """The tab on top, or None when there are no tabs."""
+        if not self.tabs:
+            return None
+        current = self.notebook.select()
+        return next((tab for tab in self.tabs if str(tab.frame) == current), None)
+
+    def selected_run(self):
+        tab = self.selected()
+        return tab.run if tab is not None else None
+
+    def selected_renderer(self):
+        tab = self.selected()
+        return tab.renderer if tab is not None else None
+
+    def close(self, tab: RunTab):
+        """Removes a tab and deletes its output spill file."""
+        tab.renderer.cancel() # Output of a program still being stopped is dropped
+        tab.renderer.close()
+        self.notebook.forget(tab.frame)
+        tab.frame.destroy()
+        self.tabs.remove(tab)
+
+    def close_all(self):
+        for tab in list(self.tabs):
+            self.close(tab)
+
+    def update_run(self, run):
+        """Redraws a run's tab title and status line, opening a tab for a new run; keeps ticking while runs are active."""
+        tab = next((tab for tab in self.tabs if tab.run is run), None)
+        if tab is None:
+            if run.is_finished():
+                return # Its tab was closed
+            tab = self.add_run(run)
+        self.notebook.tab(tab.frame, text=f"{STATUS_MARKS.get(run.status, '')} {tab.title}")
+        tab.status_var.set(_describe(run))
+        if run.is_finished():
+            tab.renderer.finish()
+        if self._after_id is None and any(tab.run is not None and not tab.run.is_finished() for tab in self.tabs):
+            self._after_id = self.root.after(STATS_INTERVAL_MS, self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        for tab in self.tabs:
+            if tab.run is not None and not tab.run.is_finished():
+                self.update_run(tab.run)
+
+def _describe(run) -> str:
+    """Status line of a run: its state and live figures, or its report once it has ended."""
+    if run.status == "queued":
+        return "Waiting for a free slot..."
+    if run.status == "running":
+        text = f"Running for {run.elapsed():.0f}s"
+        memory = run.resident_memory_mb()
+        if memory is not None:
+            text += f", {memory:.1f} MB resident"
+        return text
+    if run.report is not None:
+        return f"{run.status.capitalize()} | {run.report.summary()} | {run.renderer.summary()}"
+    if run.error:
+        return f"Failed: {run.error}"
+    return run.status.capitalize()
@@ -0,0 +1,141 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+
+try:
+    import resource # POSIX only
+except ImportError:
+    resource = None
+
+TERMINATE_GRACE_SECONDS = 5 # Time between SIGTERM and SIGKILL
+
+# Run as `python -c LAUNCHER cpu_seconds memory_bytes program args...`: sets the rlimits and
+# execs the program in the same process, so nothing runs in the app's forked child (the
+# app has threads, which makes preexec_fn unsafe)
+LAUNCHER = """
+import os, resource, sys
+cpu_time, memory = int(sys.argv[1]), int(sys.argv[2])
+if cpu_time:
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_time, cpu_time + 1))
+if memory:
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+os.execv(sys.argv[3], sys.argv[3:])
+"""
+
+class SandboxLimits:
+    """Resource caps for one run of generated code. A value of 0 disables that cap."""
+
+    def __init__(self, wall_time: float = 30, cpu_time: int = 20, memory_mb: int = 2048, output_kb: int = 1024):
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        self.memory_mb = memory_mb
+        self.output_kb = output_kb
+
+    def command(self, argv: list) -> list:
+        """argv wrapped in the launcher that applies the CPU and memory limits, where the OS supports them."""
+        if resource is None or not (self.cpu_time or self.memory_mb):
+            return argv
+        return [sys.executable, "-c", LAUNCHER, str(int(self.cpu_time)), str(int(self.memory_mb) * 1024 * 1024), *argv]
+
+    def popen_kwargs(self) -> dict:
+        """Extra subprocess.Popen arguments: a new session, so a stop reaches the program's children too."""
+        if os.name != "posix":
+            return {}
+        return {"start_new_session": True}
+
+class OutputLimit:
+    """Shared output counter for the stdout and stderr readers of one run."""
+
+    def __init__(self, limit_chars: int = 0):
+        self.limit_chars = limit_chars
+        self.used_chars = 0
+        self.exceeded = False
+        self._lock = threading.Lock()
+
+    def consume(self, count: int) -> bool:
+        """Records count characters of output; returns False once the cap has been passed."""
+        with self._lock:
+            self.used_chars += count
+            if self.limit_chars and self.used_chars > self.limit_chars:
+                self.exceeded = True
+            return not self.exceeded
+
+class RunReport:
+    """Resource usage and exit reason of a finished run."""
+
+    def __init__(self):
+        self.exit_reason = ""
+        self.stop_reason = None # Set when the user or a limit stopped the program
+        self.returncode = None
+        self.was_warm = False # Ran on a pre-started worker from the pool
+        self.wall_time = 0.0
+        self.cpu_time = None
+        self.peak_rss_mb = None
+
+    def summary(self) -> str:
+        parts = [f"Exit: {self.exit_reason}", f"wall {self.wall_time:.2f}s"]
+        if self.cpu_time is not None:
+            parts.append(f"CPU {self.cpu_time:.2f}s")
+        if self.peak_rss_mb is not None:
+            parts.append(f"peak RSS {self.peak_rss_mb:.1f} MB")
+        return " | ".join(parts)
+
+def reap(process: subprocess.Popen):
+    """
+    Non-blocking check for process exit. Returns (finished, rusage); on POSIX the child is
+    reaped with wait4 so its CPU time and peak RSS are available, elsewhere rusage is None.
+    """
+    if os.name != "posix" or process.returncode is not None:
+        return process.poll() is not None, None
+    try:
+        pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+    except ChildProcessError:
+        return process.poll() is not None, None
+    if pid == 0:
+        return False, None
+    process.returncode = os.waitstatus_to_exitcode(status) # Keep Popen consistent with our reaping
+    return True, usage
+
+def fill_usage(report: RunReport, usage):
+    """Copies CPU time and peak RSS from a wait4 rusage into the report."""
+    if usage is None:
+        return
+    report.cpu_time = usage.ru_utime + usage.ru_stime
+    report.peak_rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024) # Bytes on macOS, KB on Linux
+
+def is_memory_error(stderr: str) -> bool:
+    """True when the program's stderr ends with a MemoryError traceback."""
+    lines = stderr.rstrip().splitlines()
+    return bool(lines) and lines[-1].startswith("MemoryError")
+
+def describe_exit(returncode: int, reason: str = None) -> str:
+    """Human readable exit reason, preferring the reason we terminated the process for."""
+    if reason:
+        return reason
+    if returncode == 0:
+        return "finished normally"
+    if returncode is not None and returncode < 0:
+        signal_number = -returncode
+        if hasattr(signal, "SIGXCPU") and signal_number == signal.SIGXCPU:
+            return "CPU time limit exceeded"
+        try:
+            return f"killed by {signal.Signals(signal_number).name}"
+        except ValueError:
+            return f"killed by signal {signal_number}"
+    return f"exited with code {returncode}"
+
+def send_signal(process: subprocess.Popen, force: bool = False):
+    """Sends SIGTERM (or SIGKILL with force) to the process and, for sandboxed runs, its whole session."""
+    if process.returncode is not None:
+        return
+    try:
+        if os.name == "posix" and os.getpgid(process.pid) == process.pid:
+            os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+        elif force:
+            process.kill()
+        else:
+            process.terminate()
+    except (ProcessLookupError, PermissionError):
+        pass
@@ -0,0 +1,136 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from utils.app_paths import get_data_dir
+
+DB_FILE = "history.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    created REAL NOT NULL,
+    model TEXT NOT NULL DEFAULT '',
+    prompt TEXT NOT NULL,
+    response TEXT NOT NULL,
+    code TEXT NOT NULL DEFAULT '',
+    options TEXT NOT NULL DEFAULT '{}',
+    stats TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS turns_by_session ON turns(session_id, id);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(
+    prompt, response, code, content='turns', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS turns_fts_insert AFTER INSERT ON turns BEGIN
+    INSERT INTO turns_fts(rowid, prompt, response, code) VALUES (new.id, new.prompt, new.response, new.code);
+END;
+CREATE TRIGGER IF NOT EXISTS turns_fts_delete AFTER DELETE ON turns BEGIN
+    INSERT INTO turns_fts(turns_fts, rowid, prompt, response, code) VALUES ('delete', old.id, old.prompt, old.response, old.code);
+END;
+"""
+
+class SessionStore:
+    """
+    SQLite store of chat sessions and their turns (prompt, response, extracted code,
+    model, options and timings) with full-text search. Listing is paged so the
+    history view only ever loads what is on screen.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.path.join(get_data_dir(), DB_FILE)
+        self._lock = threading.Lock() # One connection shared by the GUI and query threads
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL") # Cheap commits, readers don't block the writer
+        self._connection.execute("PRAGMA foreign_keys=ON")
+        self._connection.executescript(SCHEMA)
+        try:
+            self._connection.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError: # SQLite built without FTS5; search falls back to LIKE
+            self.has_fts = False
+        self._connection.commit()
+
+    def new_session(self, title: str = "") -> int:
+        now = time.time()
+        with self._lock:
+            cursor = self._connection.execute("INSERT INTO sessions(title, created, updated) VALUES (?, ?, ?)", (title, now, now))
+            self._connection.commit()
+            return cursor.lastrowid
+
+    def add_turn(self, session_id: int, prompt: str, response: str, model: str = "", code: str = "",
+                 options: dict = None, stats: dict = None) -> int:
+        """Stores one prompt/response pair; the session is titled after its first prompt."""
+        now = time.time()
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO turns(session_id, created, model, prompt, response, code, options, stats) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (session_id, now, model, prompt, response, code, json.dumps(options or {}), json.dumps(stats or {}, default=str))
+            )
+            self._connection.execute(
+                "UPDATE sessions SET updated = ?, title = CASE WHEN title = '' THEN ? ELSE title END WHERE id = ?",
+                (now, prompt.strip().splitlines()[0][:80] if prompt.strip() else "", session_id)
+            )
+            self._connection.commit()
+            return cursor.lastrowid
+
+    def count_turns(self, query: str = "") -> int:
+        where, params = self._search_clause(query)
+        with self._lock:
+            return self._connection.execute(f"SELECT COUNT(*) FROM turns {where}", params).fetchone()[0]
+
+    def list_turns(self, offset: int = 0, limit: int = 200, query: str = "") -> list:
+        """One page of turns, newest first, with only the columns the list shows."""
+        where, params = self._search_clause(query)
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT id, session_id, created, model, substr(prompt, 1, 200) AS prompt FROM turns {where} "
+                "ORDER BY id DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_turn(self, turn_id: int) -> dict:
+        with self._lock:
+            row = self._connection.execute("SELECT * FROM turns WHERE id = ?", (turn_id,)).fetchone()
+        return self._decode(row) if row else None
+
+    def session_turns(self, session_id: int) -> list:
+        """All turns of a session in order, e.g. to continue it."""
+        with self._lock:
+            rows = self._connection.execute("SELECT * FROM turns WHERE session_id = ? ORDER BY id", (session_id,)).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _search_clause(self, query: str):
+        """WHERE clause and parameters for a search; every word must match (as a prefix)."""
+        words = re.findall(r"\w+", query or "")
+        if not words:
+            return "", []
+        if self.has_fts:
+            match = " ".join(f'"{word}"*' for word in words)
+            return "WHERE id IN (SELECT rowid FROM turns_fts WHERE turns_fts MATCH ?)", [match]
+        conditions = " AND ".join("(prompt LIKE ? OR response LIKE ? OR code LIKE ?)" for _ in words)
+        return f"WHERE {conditions}", [f"%{word}%" for word in words for _ in range(3)]
+
+    def _decode(self, row) -> dict:
+        turn = dict(row)
+        turn["options"] = json.loads(turn["options"])
+        turn["stats"] = json.loads(turn["stats"])
+        return turn
@@ -0,0 +1,35 @@
+import json
+import os
+
+from utils.app_paths import get_data_dir
+from utils.app_log import get_logger
+
+log = get_logger("settings")
+
+SETTINGS_FILE = "settings.json"
+
+def settings_path() -> str:
+    return os.path.join(get_data_dir(), SETTINGS_FILE)
+
+def load_settings() -> dict:
+    """
+    The settings saved when the app last closed: server URLs, the chosen model, the
+    last known model list (shown before the servers have answered), query options
+    and the last startup time. Empty when there are none or the file is unreadable.
+    """
+    try:
+        with open(settings_path(), "r", encoding="utf-8") as f:
+            settings = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return settings if isinstance(settings, dict) else {}
+
+def save_settings(settings: dict):
+    """Writes the settings atomically, so a crash never leaves a half-written file."""
+    path = settings_path()
+    try:
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(settings, f, indent=2)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        log.warning(f"Could not save the settings: {e}")
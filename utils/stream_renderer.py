@@ -0,0 +1,229 @@
+import os
+import queue
+import tempfile
+import threading
+import time
+import tkinter as tk
+
+RENDER_INTERVAL_MS = 25 # Drain cadence for the Tk main loop (~40 frames per second)
+OUTPUT_RENDER_INTERVAL_MS = 50 # Program output doesn't need to be as smooth as token streaming
+DEFAULT_MAX_OUTPUT_LINES = 5000 # Lines of program output kept in the widget
+
+class StreamRenderer:
+    """
+    Buffers streamed text chunks pushed from worker threads and inserts them into
+    a Tk text widget in coalesced batches on a fixed cadence driven by root.after.
+    """
+
+    def __init__(self, root, widget, interval_ms: int = RENDER_INTERVAL_MS):
+        self.root = root
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.on_finished = None # Optional callback run on the main thread after the final flush
+        self._buffer = queue.SimpleQueue() # Thread-safe buffer of (enqueue_time, text, tag)
+        self._finished = threading.Event() # Set by the worker once the stream has ended
+        self._after_id = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Resets the throughput and render-lag counters."""
+        self.chunks_received = 0
+        self.chars_received = 0
+        self.chunks_rendered = 0
+        self.frames_rendered = 0
+        self.first_chunk_time = None
+        self.last_chunk_time = None
+        self.last_render_lag = 0.0
+        self.max_render_lag = 0.0
+        self.total_render_lag = 0.0
+
+    def start(self):
+        """Starts a new rendering session. Must be called from the Tk main thread."""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._drain_pending()
+        self._finished.clear()
+        self.reset_stats()
+        self._after_id = self.root.after(self.interval_ms, self._drain)
+
+    def cancel(self):
+        """Stops drawing and drops anything still buffered, e.g. before the widget is destroyed."""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._drain_pending()
+
+    def push(self, text: str, tag: str = None, count_as_token: bool = True):
+        """Queues text for insertion. Safe to call from any thread."""
+        if not text:
+            return
+        now = time.perf_counter()
+        if count_as_token:
+            if self.first_chunk_time is None:
+                self.first_chunk_time = now
+            self.last_chunk_time = now
+            self.chunks_received += 1
+            self.chars_received += len(text)
+        self._buffer.put((now, text, tag))
+
+    def finish(self):
+        """Signals that no more chunks will be pushed. Safe to call from any thread."""
+        self._finished.set()
+
+    def is_active(self) -> bool:
+        """Returns True while the drain loop is scheduled."""
+        return self._after_id is not None
+
+    def tokens_per_second(self) -> float:
+        """Returns the streaming rate in chunks (tokens) per second as received from the worker."""
+        if self.first_chunk_time is None or self.last_chunk_time is None or self.chunks_received < 2:
+            return 0.0
+        elapsed = self.last_chunk_time - self.first_chunk_time
+        return (self.chunks_received - 1) / elapsed if elapsed > 0 else 0.0
+
+    def average_render_lag(self) -> float:
+        """Returns the mean delay in seconds between a chunk arriving and being drawn."""
+        return self.total_render_lag / self.frames_rendered if self.frames_rendered else 0.0
+
+    def summary(self) -> str:
+        """Returns a one-line description of the counters for the status bar."""
+        return (f"{self.tokens_per_second():.1f} tok/s, "
+                f"render lag avg {self.average_render_lag() * 1000:.0f} ms / max {self.max_render_lag * 1000:.0f} ms")
+
+    def _drain_pending(self) -> list:
+        """Removes and returns everything currently buffered."""
+        items = []
+        while True:
+            try:
+                items.append(self._buffer.get_nowait())
+            except queue.Empty:
+                return items
+
+    def _drain(self):
+        """Inserts all buffered chunks as a single batch and reschedules itself."""
+        self._after_id = None
+        finished = self._finished.is_set() # Read before draining so no late chunk is lost
+        items = self._drain_pending()
+        if items:
+            self._render(items)
+        if finished and self._buffer.empty():
+            if self.on_finished:
+                self.on_finished()
+            return
+        self._after_id = self.root.after(self.interval_ms, self._drain)
+
+    def _render(self, items: list):
+        """Coalesces consecutive chunks sharing a tag and inserts them into the widget."""
+        segments = []
+        for _, text, tag in items:
+            if segments and segments[-1][1] == tag:
+                segments[-1][0].append(text)
+            else:
+                segments.append(([text], tag))
+
+        readonly = str(self.widget.cget("state")) == tk.DISABLED
+        if readonly:
+            self.widget.config(state=tk.NORMAL)
+        for parts, tag in segments:
+            if tag:
+                self.widget.insert(tk.END, "".join(parts), tag)
+            else:
+                self.widget.insert(tk.END, "".join(parts))
+        self._trim()
+        self.widget.see(tk.END)
+        if readonly:
+            self.widget.config(state=tk.DISABLED)
+
+        lag = time.perf_counter() - items[0][0]
+        self.last_render_lag = lag
+        self.max_render_lag = max(self.max_render_lag, lag)
+        self.total_render_lag += lag
+        self.frames_rendered += 1
+        self.chunks_rendered += len(items)
+
+    def _trim(self):
+        """Hook for subclasses to limit the widget size; called while the widget is writable."""
+        pass
+
+class OutputRenderer(StreamRenderer):
+    """
+    StreamRenderer for program output. The widget only keeps the most recent
+    max_lines lines, while the full stream is written to a temp file that can be
+    viewed or saved on demand.
+    """
+
+    def __init__(self, root, widget, max_lines: int = DEFAULT_MAX_OUTPUT_LINES, interval_ms: int = OUTPUT_RENDER_INTERVAL_MS):
+        super().__init__(root, widget, interval_ms)
+        self.max_lines = max_lines
+        self.spill_path = None
+        self.total_lines = 0
+        self.trimmed_lines = 0
+        self._spill_file = None
+        self._spill_lock = threading.Lock() # Keeps the spill file in the same order as the widget
+
+    def start(self):
+        """Starts a new run with an empty spill file."""
+        with self._spill_lock:
+            self._remove_spill_file()
+            fd, self.spill_path = tempfile.mkstemp(prefix="ollama_output_", suffix=".txt")
+            self._spill_file = os.fdopen(fd, "w", encoding="utf-8")
+            self.total_lines = 0
+            self.trimmed_lines = 0
+        super().start()
+
+    def push(self, text: str, tag: str = None, count_as_token: bool = False):
+        """Queues text for the widget and appends it to the spill file. Safe to call from any thread."""
+        if not text:
+            return
+        with self._spill_lock:
+            if self._spill_file is not None:
+                self._spill_file.write(text)
+            self.total_lines += text.count("\n")
+            super().push(text, tag, count_as_token)
+
+    def finish(self):
+        """Flushes the spill file so it can be opened while the last batch is drawn."""
+        with self._spill_lock:
+            if self._spill_file is not None:
+                self._spill_file.flush()
+        super().finish()
+
+    def flush_spill_file(self) -> str:
+        """Flushes pending output to disk and returns the spill file path."""
+        with self._spill_lock:
+            if self._spill_file is not None:
+                self._spill_file.flush()
+        return self.spill_path
+
+    def summary(self) -> str:
+        """Describes how much of the output is visible in the widget."""
+        if self.trimmed_lines:
+            return f"output {self.total_lines} lines, last {self.max_lines} shown"
+        return f"output {self.total_lines} lines"
+
+    def close(self):
+        """Deletes the spill file; used when the application exits."""
+        with self._spill_lock:
+            self._remove_spill_file()
+
+    def _remove_spill_file(self):
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+        if self.spill_path and os.path.exists(self.spill_path):
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
+        self.spill_path = None
+
+    def _trim(self):
+        """Deletes the oldest lines beyond max_lines."""
+        if not self.max_lines:
+            return
+        line_count = int(self.widget.index("end-1c").split(".")[0])
+        excess = line_count - self.max_lines
+        if excess > 0:
+            self.widget.delete("1.0", f"{excess + 1}.0")
+            self.trimmed_lines += excess
@@ -0,0 +1,97 @@
+import csv
+import json
+import os
+import time
+
+from utils.app_paths import get_data_dir
+from utils.app_log import get_logger
+
+log = get_logger("telemetry")
+
+METRICS_FILE = "metrics.jsonl"
+MAX_RECORDS = 2000 # Older records are dropped from the file when it is loaded
+
+# Column order of the CSV export; every record has these keys (None when unknown)
+FIELDS = [
+    "timestamp", "source", "model", "endpoint", "cache_hit",
+    "prompt_eval_count", "eval_count",
+    "load_duration", "prompt_eval_duration", "eval_duration", "total_duration",
+    "time_to_first_token", "total_time",
+    "prompt_tokens_per_second", "tokens_per_second",
+    "render_lag_avg", "render_lag_max"
+]
+
+def make_record(source: str, model: str, stats: dict, renderer=None) -> dict:
+    """
+    One query's timings: Ollama's own (load, prompt evaluation and generation, in
+    seconds) from the final chunk, the client-side time to first token and total time,
+    and, if the answer was drawn by a StreamRenderer, its render lag.
+    """
+    def rate(count, seconds):
+        return count / seconds if count and seconds else None
+
+    record = {field: stats.get(field) for field in FIELDS}
+    record.update(
+        timestamp=time.time(),
+        source=source,
+        model=model,
+        cache_hit=bool(stats.get("cache_hit")),
+        prompt_tokens_per_second=rate(stats.get("prompt_eval_count"), stats.get("prompt_eval_duration")),
+        tokens_per_second=rate(stats.get("eval_count"), stats.get("eval_duration"))
+    )
+    if renderer is not None and renderer.frames_rendered:
+        record["render_lag_avg"] = renderer.average_render_lag()
+        record["render_lag_max"] = renderer.max_render_lag
+    return record
+
+class MetricsLog:
+    """Per-query timing records, kept in memory and appended to a JSONL file so the history survives restarts."""
+
+    def __init__(self, path: str = None, max_records: int = MAX_RECORDS):
+        self.path = path or os.path.join(get_data_dir(), METRICS_FILE)
+        self.max_records = max_records
+        self.records = self._load()
+
+    def _load(self) -> list:
+        records = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue # A line cut short by a crash
+        except OSError:
+            return []
+        if len(records) > self.max_records:
+            records = records[-self.max_records:]
+            self._write(self.path, records)
+        return records
+
+    def add(self, record: dict):
+        self.records.append(record)
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            log.warning(f"Could not save the query metrics: {e}")
+
+    def clear(self):
+        self.records = []
+        self._write(self.path, [])
+
+    def export_jsonl(self, path: str, records: list = None):
+        self._write(path, self.records if records is None else records)
+
+    def export_csv(self, path: str, records: list = None):
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for record in self.records if records is None else records:
+                writer.writerow(dict(record, timestamp=time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record["timestamp"]))))
+
+    @staticmethod
+    def _write(path: str, records: list):
+        with open(path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
@@ -0,0 +1,280 @@
+import ast
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import textwrap
+import time
+
+from utils.app_paths import get_data_dir
+from utils.core import run_code_async
+from utils.sandbox import SandboxLimits
+from utils.app_log import get_logger
+
+log = get_logger("test_harness")
+
+DEFAULT_TEST_TIMEOUT = 10 # Seconds each test may take before its process is stopped
+MAX_CACHED_REPORTS = 200 # Oldest cached reports are deleted beyond this
+RESULT_MARKER = "@@ollama-coder-test-result@@" # Prefix of the line a test process reports its result on
+MODULE_ASSERTS = "test_module_asserts" # Top-level asserts are collected into one test of this name
+OUTCOME_LABELS = {"passed": "PASSED", "failed": "FAILED", "error": "ERROR", "timeout": "TIMEOUT", "skipped": "SKIPPED"}
+
+# Appended to the module for each test; runs one test and prints its result as JSON
+RUNNER_TEMPLATE = '''
+
+def _ollama_coder_run_test(name):
+    import json, time, traceback, unittest
+    outcome, message = "passed", ""
+    start = time.perf_counter()
+    try:
+        if "." in name: # unittest.TestCase method
+            class_name, method_name = name.split(".", 1)
+            result = unittest.TestResult()
+            globals()[class_name](method_name).run(result)
+            if result.skipped:
+                outcome, message = "skipped", result.skipped[0][1]
+            elif result.failures:
+                outcome, message = "failed", result.failures[0][1]
+            elif result.errors:
+                outcome, message = "error", result.errors[0][1]
+        else:
+            globals()[name]()
+    except AssertionError:
+        outcome, message = "failed", traceback.format_exc()
+    except BaseException as e:
+        if type(e).__name__ in ("Skipped", "SkipTest"): # pytest.skip() or unittest.SkipTest
+            outcome, message = "skipped", str(e)
+        else:
+            outcome, message = "error", traceback.format_exc()
+    duration = time.perf_counter() - start
+    print("\\n" + {marker!r} + json.dumps({{"outcome": outcome, "message": message, "duration": duration}}), flush=True)
+
+_ollama_coder_run_test({name!r})
+'''
+
+class TestResult:
+    """Outcome of one test: passed, failed, error, timeout or skipped."""
+
+    def __init__(self, name: str, outcome: str, duration: float = 0.0, message: str = "", output: str = ""):
+        self.name = name
+        self.outcome = outcome
+        self.duration = duration
+        self.message = message
+        self.output = output # The test process's own output, kept for failures
+
+    def line(self) -> str:
+        return f"{self.name} {OUTCOME_LABELS.get(self.outcome, self.outcome.upper())} ({self.duration:.2f}s)"
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "outcome": self.outcome, "duration": self.duration, "message": self.message, "output": self.output}
+
+class TestReport:
+    """Results of one test session, in the order the tests were defined."""
+
+    def __init__(self, results: list, wall_time: float, workers: int, timeout: float, implementation_lines: int, cached: bool = False):
+        self.results = results
+        self.wall_time = wall_time
+        self.workers = workers
+        self.timeout = timeout
+        self.implementation_lines = implementation_lines
+        self.cached = cached
+
+    def counts(self) -> dict:
+        counts = {}
+        for result in self.results:
+            counts[result.outcome] = counts.get(result.outcome, 0) + 1
+        return counts
+
+    def passed(self) -> bool:
+        return all(result.outcome in ("passed", "skipped") for result in self.results)
+
+    def summary(self) -> str:
+        counts = ", ".join(f"{count} {outcome}" for outcome, count in self.counts().items())
+        text = f"{counts} in {self.wall_time:.2f}s"
+        return text + " (cached)" if self.cached else text
+
+    def format(self) -> str:
+        """pytest-style report: one line per test, the failure details, then the totals."""
+        lines = [f" {len(self.results)} tests of {self.implementation_lines} lines of code, {self.workers} workers, {self.timeout:g}s timeout each ".center(79, "=")]
+        lines += [result.line() for result in self.results]
+        problems = [result for result in self.results if result.outcome in ("failed", "error", "timeout")]
+        if problems:
+            lines.append(" FAILURES ".center(79, "="))
+            for result in problems:
+                lines.append(f" {result.name} ".center(79, "_"))
+                lines.append((result.message or result.output or "(no details)").rstrip())
+        lines.append(f" {self.summary()} ".center(79, "="))
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict:
+        return {
+            "results": [result.to_dict() for result in self.results],
+            "wall_time": self.wall_time,
+            "workers": self.workers,
+            "timeout": self.timeout,
+            "implementation_lines": self.implementation_lines
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TestReport":
+        return cls([TestResult(**result) for result in data["results"]], data["wall_time"], data["workers"],
+                   data["timeout"], data["implementation_lines"], cached=True)
+
+def split_tests(code: str):
+    """
+    Separates model-written tests from the implementation. Returns (module, tests):
+    the module source without the `if __name__ == "__main__":` block and without
+    top-level asserts and calls that run the tests (those asserts become one test,
+    MODULE_ASSERTS), and the test names in definition order: test_* functions taking
+    no arguments and "Class.test_*" for unittest.TestCase classes. Raises SyntaxError
+    for code that doesn't parse.
+    """
+    tree = ast.parse(code)
+    lines = code.splitlines()
+    drop = set() # Line numbers removed from the module
+    asserts = []
+    tests = []
+    for node in tree.body:
+        span = range(node.lineno, node.end_lineno + 1)
+        if isinstance(node, ast.If) and _is_main_guard(node.test):
+            drop.update(span)
+        elif isinstance(node, ast.Assert):
+            asserts.append(ast.get_source_segment(code, node))
+            drop.update(span)
+        elif isinstance(node, ast.Expr) and _is_test_call(node.value):
+            drop.update(span)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test"):
+            if isinstance(node, ast.FunctionDef) and not (node.args.args or node.args.posonlyargs or node.args.kwonlyargs):
+                tests.append(node.name) # Functions needing pytest fixtures are left out
+        elif isinstance(node, ast.ClassDef) and node.name.startswith("Test"):
+            tests.extend(f"{node.name}.{item.name}" for item in node.body
+                         if isinstance(item, ast.FunctionDef) and item.name.startswith("test"))
+    module = "\n".join(line for number, line in enumerate(lines, 1) if number not in drop)
+    if asserts:
+        module += f"\n\ndef {MODULE_ASSERTS}():\n" + textwrap.indent("\n".join(asserts), "    ") + "\n"
+        tests.append(MODULE_ASSERTS)
+    return module, tests
+
+def _is_main_guard(test) -> bool:
+    return (isinstance(test, ast.Compare) and isinstance(test.left, ast.Name) and test.left.id == "__name__"
+            and any(isinstance(value, ast.Constant) and value.value == "__main__" for value in test.comparators))
+
+def _is_test_call(value) -> bool:
+    """test_x(), unittest.main() or pytest.main() at the top level."""
+    if not isinstance(value, ast.Call):
+        return False
+    function = value.func
+    if isinstance(function, ast.Name):
+        return function.id.startswith("test")
+    return isinstance(function, ast.Attribute) and function.attr == "main" and isinstance(function.value, ast.Name) \
+        and function.value.id in ("unittest", "pytest")
+
+def build_test_script(module: str, name: str) -> str:
+    """The module followed by a runner for one test."""
+    return module + RUNNER_TEMPLATE.format(marker=RESULT_MARKER, name=name)
+
+def make_test_key(module: str, tests: list, timeout: float, limits=None) -> str:
+    """Hash of everything that determines the results, so unchanged code can reuse them."""
+    material = json.dumps({
+        "module": module,
+        "tests": tests,
+        "timeout": timeout,
+        "limits": vars(limits) if limits else None,
+        "python": sys.version
+    }, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+class TestResultCache:
+    """Test reports on disk, one JSON file per code hash."""
+
+    def __init__(self, cache_dir: str = None, max_entries: int = MAX_CACHED_REPORTS):
+        self.cache_dir = cache_dir or get_data_dir("test_results")
+        self.max_entries = max_entries
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return TestReport.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def put(self, key: str, report: TestReport):
+        try:
+            with open(self._path(key) + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(report.to_dict(), f)
+            os.replace(self._path(key) + ".tmp", self._path(key))
+            self._prune()
+        except OSError as e:
+            log.warning(f"Could not cache the test results: {e}")
+
+    def _prune(self):
+        paths = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith(".json")]
+        if len(paths) > self.max_entries:
+            paths.sort(key=os.path.getmtime)
+            for path in paths[:len(paths) - self.max_entries]:
+                os.remove(path)
+
+async def run_tests(code: str, timeout: float = DEFAULT_TEST_TIMEOUT, workers: int = 2, limits=None, on_result=None, cache=None) -> TestReport:
+    """
+    Runs every test found in the code, each in its own process in its own temp
+    directory, at most `workers` at a time. A test still running after `timeout`
+    seconds is stopped and reported as a timeout. limits (a SandboxLimits) also caps
+    CPU, memory and output; its wall-clock limit is replaced by the timeout.
+    on_result(result) is called (on the engine's thread) as each test finishes. With a
+    cache, results of unchanged code and tests are returned without running anything.
+    Raises SyntaxError for code that doesn't parse and ValueError when it has no tests.
+    """
+    module, tests = split_tests(code)
+    if not tests:
+        raise ValueError("No tests found: define test_* functions, unittest.TestCase classes or top-level asserts.")
+    implementation_lines = len(module.splitlines())
+    key = make_test_key(module, tests, timeout, limits)
+    report = cache.get(key) if cache is not None else None
+    if report is not None:
+        for result in report.results:
+            if on_result is not None:
+                on_result(result)
+        return report
+
+    base = limits or SandboxLimits(cpu_time=0, memory_mb=0)
+    test_limits = SandboxLimits(wall_time=timeout, cpu_time=base.cpu_time, memory_mb=base.memory_mb, output_kb=base.output_kb)
+    slots = asyncio.Semaphore(max(1, workers))
+    start = time.perf_counter()
+
+    async def run_one(name: str) -> TestResult:
+        async with slots:
+            output = []
+            run_report = await run_code_async(
+                build_test_script(module, name),
+                on_output=lambda text, tag: output.append(text),
+                limits=test_limits,
+                stdin_text="" # A test waiting for input() gets EOF instead of hanging
+            )
+        result = _parse_result(name, "".join(output), run_report)
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    results = await asyncio.gather(*(run_one(name) for name in tests))
+    report = TestReport(list(results), time.perf_counter() - start, max(1, workers), timeout, implementation_lines)
+    if cache is not None:
+        cache.put(key, report)
+    return report
+
+def _parse_result(name: str, output: str, run_report) -> TestResult:
+    """Reads the result line printed by the runner; without one, the process died or was stopped."""
+    for line in reversed(output.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            data = json.loads(line[len(RESULT_MARKER):])
+            result = TestResult(name, data["outcome"], data["duration"], data["message"])
+            if result.outcome != "passed":
+                result.output = output.split(RESULT_MARKER)[0][-2000:]
+            return result
+    tail = output[-2000:]
+    if run_report.stop_reason and "wall-clock" in run_report.stop_reason:
+        return TestResult(name, "timeout", run_report.wall_time, f"Stopped: {run_report.stop_reason}.", tail)
+    return TestResult(name, "error", run_report.wall_time, f"The test process ended without a result ({run_report.exit_reason}).\n{tail}", tail)
@@ -0,0 +1,259 @@
+import json
+import os
+import tempfile
+import tkinter as tk
+from array import array
+from tkinter import ttk
+
+MEMORY_LINES = 20000 # Lines kept in memory; older ones are spilled to a temp file
+WINDOW_LINES = 400 # Lines materialized in the Text widget at a time
+MARGIN_LINES = 100 # Lines kept above the top of the view so small scrolls don't redraw
+EDGE_LINES = 40 # Redraw the window once the view gets this close to its edge
+
+class TranscriptStore:
+    """
+    The lines of a transcript. A line is a str, or a tuple of (text, tag) segments
+    when part of it is tagged. The newest lines are kept in a list; once there are
+    more than `memory_lines`, the oldest half is appended to a temp file as JSON lines
+    and read back by offset when scrolled to.
+    """
+
+    def __init__(self, memory_lines: int = MEMORY_LINES):
+        self.memory_lines = memory_lines
+        self.path = None
+        self._file = None
+        self._offsets = array("Q") # Start of each spilled line in the file
+        self._lines = [""] # In memory; the last line is still open
+        self.chars = 0
+
+    def __len__(self) -> int:
+        return len(self._offsets) + len(self._lines)
+
+    def append(self, text: str, tag: str = None):
+        """Adds text to the end of the transcript, starting new lines at each newline."""
+        if not text:
+            return
+        self.chars += len(text)
+        pieces = text.split("\n")
+        self._lines[-1] = _join(self._lines[-1], pieces[0], tag)
+        self._lines.extend(_join("", piece, tag) for piece in pieces[1:])
+        if len(self._lines) > self.memory_lines:
+            self._spill(len(self._lines) // 2)
+
+    def line(self, index: int):
+        """The line at `index` as a str or a tuple of (text, tag) segments."""
+        spilled = len(self._offsets)
+        if index >= spilled:
+            return self._lines[index - spilled]
+        self._file.flush()
+        self._file.seek(self._offsets[index])
+        value = json.loads(self._file.readline())
+        return value if isinstance(value, str) else tuple(tuple(segment) for segment in value)
+
+    def lines(self, start: int, end: int) -> list:
+        return [self.line(index) for index in range(max(0, start), min(end, len(self)))]
+
+    def text(self) -> str:
+        """The whole transcript as plain text."""
+        return "\n".join(_plain(line) for line in self.lines(0, len(self)))
+
+    def clear(self):
+        self._close_file()
+        self._offsets = array("Q")
+        self._lines = [""]
+        self.chars = 0
+
+    def close(self):
+        """Deletes the spill file; used when the application exits."""
+        self._close_file()
+
+    def _spill(self, count: int):
+        if self._file is None:
+            fd, self.path = tempfile.mkstemp(prefix="ollama_transcript_", suffix=".jsonl")
+            self._file = os.fdopen(fd, "w+", encoding="utf-8")
+        self._file.seek(0, os.SEEK_END)
+        for line in self._lines[:count]:
+            self._offsets.append(self._file.tell())
+            self._file.write(json.dumps(line) + "\n")
+        del self._lines[:count]
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path and os.path.exists(self.path):
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+        self.path = None
+
+def _join(line, text: str, tag: str = None):
+    """Appends text to a line, keeping the line a plain str while nothing in it is tagged."""
+    if not text:
+        return line
+    if tag is None and isinstance(line, str):
+        return line + text
+    segments = ((line, None),) if isinstance(line, str) and line else (() if isinstance(line, str) else line)
+    if segments and segments[-1][1] == tag:
+        return segments[:-1] + ((segments[-1][0] + text, tag),)
+    return segments + ((text, tag),)
+
+def _plain(line) -> str:
+    return line if isinstance(line, str) else "".join(text for text, _ in line)
+
+class TranscriptView:
+    """
+    Read-only text pane for long transcripts. The text lives in a TranscriptStore and
+    the Text widget only holds a window of lines around what is on screen, redrawn as
+    it is scrolled, so inserting and scrolling stay fast however long the transcript
+    gets. Offers the subset of the Text interface StreamRenderer uses (insert at END,
+    delete everything, see END), so it can be drawn into like a ScrolledText.
+    """
+
+    def __init__(self, parent, store: TranscriptStore = None, **text_options):
+        self.store = store or TranscriptStore()
+        self.first = 0 # Store index of the first line in the widget
+        self.count = 1 # Lines in the widget
+        self.follow = True # Keep the end in view while text is added
+        self._redrawing = False
+        self._redraw_pending = False
+
+        self.frame = ttk.Frame(parent)
+        self.text = tk.Text(self.frame, **text_options)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.text.configure(yscrollcommand=self._on_text_scrolled, state=tk.DISABLED)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+    def pack(self, **options):
+        self.frame.pack(**options)
+
+    def tag_config(self, tag: str, **options):
+        self.text.tag_config(tag, **options)
+
+    def cget(self, option: str):
+        # The widget is made writable only while this class draws into it
+        return tk.NORMAL if option == "state" else self.text.cget(option)
+
+    def config(self, **options):
+        options.pop("state", None)
+        if options:
+            self.text.config(**options)
+
+    def get(self, *_) -> str:
+        """The whole transcript, including the lines not currently in the widget."""
+        return self.store.text()
+
+    def insert(self, index, text: str, tag: str = None):
+        """Appends text; only inserting at the end is supported."""
+        if index != tk.END:
+            raise ValueError("TranscriptView only appends at the end")
+        at_end = self.first + self.count >= len(self.store)
+        self.store.append(text, tag)
+        if not at_end:
+            self._update_scrollbar() # Drawn when scrolled to
+            return
+        self._write(tk.END, text, tag)
+        self.count = len(self.store) - self.first
+        excess = self.count - WINDOW_LINES
+        if self.follow and excess > MARGIN_LINES: # Drop lines that scrolled out of the window
+            self._write_state(lambda: self.text.delete("1.0", f"{excess + 1}.0"))
+            self.first += excess
+            self.count -= excess
+
+    def delete(self, *_):
+        """Clears the transcript."""
+        self.store.clear()
+        self.first = 0
+        self.count = 1
+        self.follow = True
+        self._write_state(lambda: self.text.delete("1.0", tk.END))
+        self._update_scrollbar()
+
+    def see(self, index):
+        """Scrolls to the end, unless the user has scrolled away from it."""
+        if index == tk.END and self.follow:
+            if self.first + self.count < len(self.store):
+                self._redraw(len(self.store) - 1)
+            self.text.see(tk.END)
+
+    def close(self):
+        self.store.close()
+
+    def _write(self, index, text: str, tag: str = None):
+        if tag:
+            self._write_state(lambda: self.text.insert(index, text, tag))
+        else:
+            self._write_state(lambda: self.text.insert(index, text))
+
+    def _write_state(self, action):
+        self.text.config(state=tk.NORMAL)
+        action()
+        self.text.config(state=tk.DISABLED)
+
+    def _top_line(self, fraction: float) -> float:
+        """Store line at a fraction of the widget's contents."""
+        return self.first + fraction * self.count
+
+    def _redraw(self, top: int):
+        """Fills the widget with the window of lines around store line `top` and scrolls it there."""
+        total = len(self.store)
+        top = max(0, min(int(top), total - 1))
+        first = max(0, top - MARGIN_LINES)
+        end = min(total, first + WINDOW_LINES + MARGIN_LINES)
+        self._redrawing = True
+        try:
+            self.text.config(state=tk.NORMAL)
+            self.text.delete("1.0", tk.END)
+            for offset, line in enumerate(self.store.lines(first, end)):
+                if offset:
+                    self.text.insert(tk.END, "\n")
+                if isinstance(line, str):
+                    self.text.insert(tk.END, line)
+                else:
+                    for text, tag in line:
+                        self.text.insert(tk.END, text, *((tag,) if tag else ()))
+            self.text.config(state=tk.DISABLED)
+            self.first = first
+            self.count = end - first
+            self.text.yview(f"{top - first + 1}.0")
+        finally:
+            self._redrawing = False
+        self._update_scrollbar()
+
+    def _redraw_scrolled(self):
+        self._redraw_pending = False
+        self._redraw(self._top_line(self.text.yview()[0]))
+
+    def _on_text_scrolled(self, low: str, high: str):
+        """The widget scrolled (wheel, keys, selection drag): map to the whole transcript, redrawing near the window's edges."""
+        low, high = float(low), float(high)
+        total = len(self.store)
+        self.follow = high >= 1.0 and self.first + self.count >= total
+        if not self._redrawing:
+            top = self._top_line(low)
+            bottom = self._top_line(high)
+            if (self.first > 0 and top - self.first < EDGE_LINES) or (self.first + self.count < total and self.first + self.count - bottom < EDGE_LINES):
+                if not self._redraw_pending:
+                    self._redraw_pending = True
+                    self.text.after_idle(self._redraw_scrolled)
+                return
+        self._set_scrollbar(low, high)
+
+    def _update_scrollbar(self):
+        low, high = self.text.yview()
+        self._set_scrollbar(low, high)
+
+    def _set_scrollbar(self, low: float, high: float):
+        total = max(1, len(self.store))
+        self.scrollbar.set(self._top_line(low) / total, self._top_line(high) / total)
+
+    def _on_scrollbar(self, action, *args):
+        """The scrollbar moved: jump through the whole transcript or scroll within the window."""
+        if action == "moveto":
+            self._redraw(float(args[0]) * len(self.store))
+            if float(args[0]) >= 1.0:
+                self.text.see(tk.END)
+        else:
+            self.text.yview(action, *args)
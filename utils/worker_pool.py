@@ -0,0 +1,104 @@
+import os
+import subprocess
+import sys
+import threading
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pool_worker.py")
+DEFAULT_POOL_SIZE = 2
+DEFAULT_PRELOAD_MODULES = [] # Nothing by default: preloading e.g. numpy costs memory in every worker
+
+class WarmWorkerPool:
+    """
+    Keeps a few Python interpreters started ahead of time, with the chosen modules
+    already imported, so running generated code doesn't pay interpreter startup and
+    import time. Nothing is started until the first run (or fill()); each worker runs
+    exactly one script and is then replaced, so every run starts from a clean interpreter.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, preload_modules: list = None):
+        self.size = size
+        self.preload_modules = list(DEFAULT_PRELOAD_MODULES if preload_modules is None else preload_modules)
+        self._idle = [] # Started workers waiting for a script
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _spawn(self) -> subprocess.Popen:
+        """Starts one worker interpreter with the preload modules."""
+        return subprocess.Popen(
+            [sys.executable, "-u", WORKER_SCRIPT, *self.preload_modules],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1
+        )
+
+    def fill(self):
+        """Tops the pool up to its size. Blocks only for process creation, not for preloading."""
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) >= self.size:
+                    return
+                preload = list(self.preload_modules)
+            worker = self._spawn()
+            with self._lock:
+                if self._closed or preload != self.preload_modules:
+                    _kill(worker) # Configuration changed while spawning
+                    continue
+                self._idle.append(worker)
+
+    def fill_in_background(self):
+        """Tops the pool up without blocking the caller."""
+        threading.Thread(target=self.fill, daemon=True).start()
+
+    def set_preload_modules(self, modules: list):
+        """Changes the preloaded modules, replacing idle workers that were started with the old list."""
+        modules = list(modules)
+        with self._lock:
+            if modules == self.preload_modules:
+                return
+            self.preload_modules = modules
+            stale, self._idle = self._idle, []
+        for worker in stale:
+            _kill(worker)
+
+    def run(self, script_path: str):
+        """
+        Starts script_path on a warm worker, falling back to a freshly started one when
+        the pool is empty. Returns (process, was_warm).
+        """
+        worker = None
+        with self._lock:
+            while self._idle and worker is None:
+                candidate = self._idle.pop(0)
+                if candidate.poll() is None:
+                    worker = candidate
+        was_warm = worker is not None
+        if worker is None:
+            worker = self._spawn()
+        worker.stdin.write(os.path.abspath(script_path) + "\n")
+        worker.stdin.flush()
+        self.fill_in_background() # Replace the worker we just used
+        return worker, was_warm
+
+    def shutdown(self):
+        """Stops all idle workers."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            _kill(worker)
+
+def _kill(worker: subprocess.Popen):
+    """Terminates an idle worker and releases its pipes."""
+    try:
+        worker.kill()
+        worker.wait(timeout=1)
+    except Exception:
+        pass
+    for stream in (worker.stdin, worker.stdout, worker.stderr):
+        try:
+            stream.close()
+        except Exception:
+            pass